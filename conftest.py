@@ -0,0 +1,2 @@
+# conftest.py
+# Makes the game modules importable by the tests in tests/ (pytest puts the directory of this file on sys.path)
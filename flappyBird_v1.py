@@ -3,70 +3,90 @@
 # Date: 15/04/2020
 # TODO: remove unnecessary comments
 # ===================  IMPORTS  ===================+
-import tkinter as tk
-import random
+import argparse
+import os
 import time
+import tkinter as tk
+from collections import deque
+from itertools import islice
+
+import flappy_assets
+import flappy_clock
+import flappy_input
+import flappy_profiler
+import flappy_replay
+import flappy_scores
+import flappy_snapshot
+import flappy_solver
+import flappy_world
+
+try:
+    import numpy as np
+    import flappy_ghosts
+except ImportError:  # Only ghost racing needs numpy
+    np = flappy_ghosts = None
+
+
+# =================  GAME CONSTANTS  =================+
+# Number of pipe pairs of the daily challenge course which are checked to be survivable before it is played
+_DAILY_CHECKED_PIPES = 30
+# Largest number of recorded sessions raced against as ghosts (the best scoring ones are kept)
+_MAX_GHOSTS = 256
 
 
 # ==================  CLASS CODE  ==================+
 class Bird:
     """"
     This class is responsible for creating the player (bird) object on the main canvas window
-    and managing its motion (jumping and falling)
+    and drawing its motion (jumping and falling) as simulated by the game world
     """
-    # Private variable to store the file path for the player image
-    _PLAYER_IMAGE_FILE = "sprites/bird.png"
-    # Private attribute to store the maximum downward falling speed of the player
-    _GRAVITY_Y_SPEED = 3
-    # Private attribute to store the maximum upward jump speed of the player (directly proportional to the jump height)
-    _JUMP_Y_SPEED = -5
-    # Private attribute to store the y-coordinate of the upper window boundary which the bird must not cross
-    _UPPER_WINDOW_BOUNDARY = 20
-    # Private attribute to store the deceleration speed, which visually simulates the weight of the bird
-    _DOWNWARD_ACCELERATION = 0.25
-
-    def __init__(self, root, canvas, window_width, window_height):
+    # Private variable to store the file name of the player image (resolved by the asset manager)
+    _PLAYER_IMAGE_FILE = flappy_assets.BIRD_SPRITE
+
+    def __init__(self, root, canvas, world, sprites):
         """
         Constructor function of the Bird class
         :param root: the Tkinter root window
         :param canvas: the Tkinter canvas class
-        :param window_width: width of the Canvas window
-        :param window_height: height of the Canvas window
+        :param world: the GameWorld instance which simulates the player's motion
+        :param sprites: the SpriteCache which provides the (pre-rotated) player sprites
         """
         self._root = root
         self._canvas = canvas
-        self._window_width = window_width
-        self._window_height = window_height
-        # Variable to store the x-coordinate of the center of the window derived from its width
-        self.window_center_x = self._window_width/2
-        # Variable to store the y-coordinate of the center of the window derived from its height
-        self.window_center_y = self._window_height/2
-        # Tkinter private image attribute to store the player sprite
-        self._player_sprite = tk.PhotoImage(file=self._PLAYER_IMAGE_FILE)
+        self._world = world
+        self._sprites = sprites
+        # Private integer-type variable to store the tilt of the sprite currently shown
+        self._tilt = flappy_assets.bird_tilt(self._world.bird_y_speed)
         # Initialize player object (bird) from the canvas class and store it in a private attribute self._player
-        self._player = self._canvas.create_image(self.window_center_x, self.window_center_y,
-                                                 image=self._player_sprite, anchor="c", tag="player")
-        # Private attribute to store the player's current vertical (y) speed
-        self._y_speed = self._GRAVITY_Y_SPEED
-        # Private attribute to store the player's current horizontal (x) speed
-        self._x_speed = 0
+        self._player = self._canvas.create_image(self._world.bird_x, self._world.bird_y,
+                                                 image=self._sprites.photo(self._PLAYER_IMAGE_FILE, self._tilt),
+                                                 anchor="c", tag="player")
+
+    @classmethod
+    def tilt_variants(cls):
+        """
+        Public method which lists every pre-rotated sprite variant the player can use
+        :return: a list of (sprite name, degrees, scale) tuples for SpriteCache.warm_up
+        """
+        return [(cls._PLAYER_IMAGE_FILE, tilt, 1) for tilt in flappy_assets.bird_tilts()]
 
     def player_fall(self):
         """
-        Public method which makes the player move downward (fall)
+        Public method which moves the player to the position it has fallen (or jumped) to in the game world
+        and tilts it according to its vertical speed
         """
-        # If the player hits the upper window boundary, make it bounce back down (the index of 1 indicates the y-coord)
-        if self.get_player_x_y_coords()[1] < self._UPPER_WINDOW_BOUNDARY:
-            self._y_speed = self._GRAVITY_Y_SPEED
-        # Make the payer move downward (fall)
-        self._canvas.move(self._player, self._x_speed, self._y_speed)
-        self._y_speed += self._DOWNWARD_ACCELERATION
+        self._canvas.coords(self._player, self._world.bird_x, self._world.bird_y)
+        tilt = flappy_assets.bird_tilt(self._world.bird_y_speed)
+        # Only swap the sprite when the tilt crosses into another pre-rotated variant
+        if tilt != self._tilt:
+            self._tilt = tilt
+            self._canvas.itemconfigure(self._player, image=self._sprites.photo(self._PLAYER_IMAGE_FILE, tilt))
 
     def player_jump(self):
         """
         Public method which makes the player jump upward
         """
-        self._y_speed = self._JUMP_Y_SPEED
+        self._world.jump()
 
     def get_player_x_y_coords(self):
         """
@@ -78,99 +98,150 @@ class Bird:
 class Pipe:
     """
     This class is responsible for creating the pipe objects on the main canvas window
-    and managing their motion (moving sideways)
+    and drawing their motion (moving sideways) as simulated by the game world
     """
-    # Private attribute to store an integer-type variable for the width constant for each pipe
-    _PIPE_WIDTH = 85
-    # Private attribute to store an integer-type variable for the vertical separation constant for each pipe
-    _PIPE_SEPARATION_Y = 120  # 160
-    # Private attribute to store a float-type variable for the maximum horizontal speed constant for each pipe
-    _MAX_X_SPEED = -2.6  # -2
-    # Private variable to store a float-type variable for the frequency of generation of each pipe
-    _PIPE_SPAWN_INTERVAL = 2.5  # only n-0.5 (where n = Whole num) i.e. 1.5; 2.5; 3.5
-    # Private int-type variable for the maximum offset distance from the top and bottom window boundaries
-    _PIPE_Y_OFFSET = 90
     # Private variable to store a string-type for the color of each pipe
-    _PIPE_COLOR = "lime green"
+    _PIPE_COLOR = flappy_assets.PIPE_COLOR
+    # Private int-type variable for the number of pipe pairs whose canvas widgets are pre-allocated
+    _POOL_SIZE = 4
 
-    def __init__(self, root, canvas, window_width, window_height):
+    def __init__(self, root, canvas, world):
         """
         Constructor function of the Pipe class
         :param root: the Tkinter root window
         :param canvas: the Tkinter canvas class
-        :param window_width: width of the Canvas window
-        :param window_height: height of the Canvas window
+        :param world: the GameWorld instance which simulates the pipes
         """
         self._root = root
         self._canvas = canvas
-        self._window_width = window_width
-        self._window_height = window_height
-
-        # Private variable to store the bottom pipe widget
-        self._pipe_bottom = None
-        # Private variable to store the top pipe widget
-        self._pipe_top = None
-        # Private integer-type variable to store the x-coordinate of the spawn origin of each pipe
-        self._origin_x = self._window_width
-        # Private integer-type variable to store the y-coordinate of the spawn origin of each upper pipe
-        self.top_pipe_origin_y = 0
-        # Private boolean-type variable to indicate whenever a new pipe is drawn to allow for time-regulated generation
-        self._pipe_drawn = False
-        # Private integer-type variable to store a constant for the horizontal speed of each pipe
-        self._x_speed = self._MAX_X_SPEED
-        # Private integer-type variable to store a constant for the vertical speed of each pipe
-        self._y_speed = 0
-        # Private integer-type variable to store a constant the number of dp that the game run-time is rounded to
-        self._pipe_generator_time_dp = 1
-        # Private integer-type variable to store a derived constant for the smallest length of a pipe from the top
-        self._min_length_from_top = self._PIPE_Y_OFFSET
-        # Private integer-type variable to store a derived constant for the biggest length of a pipe from the top
-        self._max_length_from_top = self._window_height - self._PIPE_Y_OFFSET - self._PIPE_SEPARATION_Y
+        self._world = world
+        # Private deque of (PipePair, top widget, bottom widget) records kept in the same order as the world's pipes
+        self._pipe_widgets = deque()
+        # Private list of hidden (top widget, bottom widget) pairs which are recycled for new pipe pairs
+        self._free_widgets = [self._create_pipe_widgets() for _ in range(self._POOL_SIZE)]
 
     def pipe_generator(self):
         """
-        This public method controls the initialisation process of new pipe objects at pre-defined
-        time intervals (calls the pipe generator method when appropriate)
+        This public method draws the pipe pairs that the game world has generated since the last frame
+        and removes the widgets of pipe pairs that have left the game world
+        """
+        pipes = self._world.pipes
+        # The world only drops pairs from the front of its buffer, so remove widgets until the front pairs match
+        while self._pipe_widgets and (not pipes or self._pipe_widgets[0][0] is not pipes[0]):
+            self._release_pipe_widgets(self._pipe_widgets.popleft())
+        # The world only adds pairs to the back of its buffer, so draw the pairs beyond the drawn ones
+        for pipe_pair in islice(pipes, len(self._pipe_widgets), None):
+            self._draw_pipe_on_canvas(pipe_pair)
+
+    def _create_pipe_widgets(self):
+        """
+        This private method creates the (hidden) canvas widgets for a single pipe pair
+        :return: a tuple of the top and the bottom pipe widget
         """
-        # Private float-type variable to store the time elapse since the start of the game instance
-        time_elapsed = round(time.time(), self._pipe_generator_time_dp)
+        pipe_top = self._canvas.create_rectangle(0, 0, 0, 0, fill=self._PIPE_COLOR, state="hidden",
+                                                 tags=("pipe", "top_pipe"))
+        pipe_bottom = self._canvas.create_rectangle(0, 0, 0, 0, fill=self._PIPE_COLOR, state="hidden",
+                                                    tags=("pipe", "bottom_pipe"))
+        return pipe_top, pipe_bottom
+
+    def _release_pipe_widgets(self, pipe_record):
         """
-        An if statement that checks if the time elapsed since the last pipe creation divided by the value of the set
-        generation interval leaves no remained (output is 0), which implies that the pipe spawn time interval has 
-        passed and a new pipe should be spawned
+        This private method hides the widgets of a pipe pair and returns them to the pool
+        :param pipe_record: the (PipePair, top widget, bottom widget) record of the pair
         """
-        if time_elapsed % self._PIPE_SPAWN_INTERVAL == 0:
-            # If a new pipe hasn't been drawn after the interval, generate a new pipe
-            if not self._pipe_drawn:
-                self._draw_pipe_on_canvas()
-                self._pipe_drawn = True
-        # If the time interval since the last pipe generated is not met, set the _pipe_drawn attribute to False
-        else:
-            self._pipe_drawn = False
+        _, pipe_top, pipe_bottom = pipe_record
+        self._canvas.itemconfigure(pipe_top, state="hidden")
+        self._canvas.itemconfigure(pipe_bottom, state="hidden")
+        self._free_widgets.append((pipe_top, pipe_bottom))
 
-    def _draw_pipe_on_canvas(self):
+    def _draw_pipe_on_canvas(self, pipe_pair):
         """
-        This private method creates and draws new pipe objects on the canvas
+        This private method draws a new pipe pair on the canvas, recycling pooled widgets whenever possible
+        :param pipe_pair: the PipePair of the world to draw
         """
-        # Private integer-type variable to store a randomly-generated height-from-top of the top pipe
-        top_pipe_len_from_top = random.randrange(self._min_length_from_top, self._max_length_from_top)
-        # Private integer-type variable to store the height-from-top for the bottom pipe derived from the previous var
-        bottom_pipe_len_from_top = top_pipe_len_from_top + self._PIPE_SEPARATION_Y
-        # Initialize bottom pipe object as a rectangle from the canvas class and store it in a private attribute
-        self._pipe_bottom = self._canvas.create_rectangle(self._origin_x, bottom_pipe_len_from_top,
-                                                          self._origin_x + self._PIPE_WIDTH, self._window_height,
-                                                          fill=self._PIPE_COLOR, tags=("pipe", "bottom_pipe"))
-        # Initialize top pipe object as a rectangle from the canvas class and store it in a private attribute
-        self._pipe_top = self._canvas.create_rectangle(self._origin_x, self.top_pipe_origin_y,
-                                                       self._origin_x + self._PIPE_WIDTH, top_pipe_len_from_top,
-                                                       fill=self._PIPE_COLOR, tags=("pipe", "top_pipe"))
+        # Take a hidden pair of widgets from the pool (only create new ones if the pool has run out)
+        pipe_top, pipe_bottom = self._free_widgets.pop() if self._free_widgets else self._create_pipe_widgets()
+        self._canvas.coords(pipe_top, *pipe_pair.top_rect())
+        self._canvas.coords(pipe_bottom, *pipe_pair.bottom_rect(self._world.window_height))
+        self._canvas.itemconfigure(pipe_top, state="normal")
+        self._canvas.itemconfigure(pipe_bottom, state="normal")
+        self._pipe_widgets.append((pipe_pair, pipe_top, pipe_bottom))
 
     def move_pipe(self):
         """
-        Public method which makes both of the generated pipes (combined with a common tag)
-        move horizontally with a pre-set speed
+        Public method which moves both pipes of every pair to their current position in the game world
+        """
+        for pipe_pair, pipe_top, pipe_bottom in self._pipe_widgets:
+            self._canvas.coords(pipe_top, *pipe_pair.top_rect())
+            self._canvas.coords(pipe_bottom, *pipe_pair.bottom_rect(self._world.window_height))
+
+    def clear(self):
+        """
+        Public method which hides the widgets of all pipe pairs and returns them to the pool
+        """
+        while self._pipe_widgets:
+            self._release_pipe_widgets(self._pipe_widgets.popleft())
+
+
+class Ghosts:
+    """
+    This class draws the birds of a GhostRace as semi-transparent ghosts flying alongside the player. Every ghost
+    shares the player's x-coordinate, so the whole population is moved (and the newly collided ghosts are hidden)
+    by a single Tcl command per frame
+    """
+    # Private variable to store the file name of the ghost image (resolved by the asset manager)
+    _GHOST_IMAGE_FILE = flappy_assets.BIRD_SPRITE
+    # Private variables to store the name and the body of the Tcl procedure which draws the ghosts of a frame
+    _DRAW_PROC = "flappy_draw_ghosts"
+    _DRAW_PROC_BODY = ("foreach id $ids y $ys { $canvas coords $id $x $y }\n"
+                       "foreach id $culled { $canvas itemconfigure $id -state hidden }")
+
+    def __init__(self, root, canvas, race, sprites):
+        """
+        Constructor function of the Ghosts class
+        :param root: the Tkinter root window
+        :param canvas: the Tkinter canvas class
+        :param race: the GhostRace which simulates the ghosts
+        :param sprites: the SpriteCache which provides the ghost sprite
         """
-        self._canvas.move("pipe", self._x_speed, self._y_speed)
+        self._root = root
+        self._canvas = canvas
+        self._race = race
+        self._root.tk.call("proc", self._DRAW_PROC, "canvas x ids ys culled", self._DRAW_PROC_BODY)
+        world = self._race.world
+        photo = sprites.photo(self._GHOST_IMAGE_FILE, ghost=True)
+        # Private array of the (initially hidden) canvas image widget of every ghost
+        self._ghosts = np.array(
+            [self._canvas.create_image(world.bird_x, 0, image=photo, anchor="c", state="hidden", tag="ghost")
+             for _ in range(world.n_birds)])
+        # Private boolean array of the ghosts currently shown and the Tcl list of their widgets
+        self._visible = world.alive.copy()
+        self._visible_ids = ""
+
+    def show(self):
+        """
+        Public method which shows every ghost at its current position (at the start of a game session)
+        """
+        self._canvas.itemconfigure("ghost", state="normal")
+        self._visible[:] = True
+        self._visible_ids = " ".join(map(str, self._ghosts.tolist()))
+        self.move_ghosts()
+
+    def move_ghosts(self):
+        """
+        Public method which moves the ghosts to their current position in the race and hides (culls) the ghosts
+        which have collided since the previous frame
+        """
+        world = self._race.world
+        visible = self._visible
+        culled = visible & ~world.alive
+        culled_ids = ""
+        if culled.any():
+            culled_ids = " ".join(map(str, self._ghosts[culled].tolist()))
+            visible &= world.alive
+            self._visible_ids = " ".join(map(str, self._ghosts[visible].tolist()))
+        ys = " ".join(map(str, world.bird_y[visible].round(1).tolist()))
+        self._root.tk.call(self._DRAW_PROC, str(self._canvas), world.bird_x, self._visible_ids, ys, culled_ids)
 
 
 class MainApplication:
@@ -182,22 +253,43 @@ class MainApplication:
     _NEW_GAME = False
     # Private boolean-type variable to indicate whether the current game process has ended
     _GAME_OVER = False
-    # Private variable to store the file path for the game background image
-    _BACKGROUND_IMAGE_FILE = "sprites/background.png"
-
-    def __init__(self):
+    # Private variable to store the file name of the game background image (resolved by the asset manager)
+    _BACKGROUND_IMAGE_FILE = flappy_assets.BACKGROUND_SPRITE
+    # Private tuple to store the names of the phases of a frame timed by the profiler (in the order of _main)
+    _PROFILED_PHASES = ("world_step", "pipe_generator", "overlap_detection", "player_fall", "move_pipe",
+                        "move_ghosts")
+    # Private int-type variable to store the number of frames between two updates of the profiler overlay
+    _PROFILER_HUD_INTERVAL = 10
+    # Private int-type variable to store the number of frames rewound by a single <BackSpace> press (one second)
+    _REWIND_STEP_FRAMES = round(1000 / flappy_world.FRAME_INTERVAL_MS)
+
+    def __init__(self, replay_directory=None, profile_path=None, seed=None, score_path=None, player="player",
+                 autopilot=False, ghost_paths=None, rewind_seconds=0):
         """
         Constructor function of the MainApplication class
-        """
+        :param replay_directory: directory in which a replay of every game session is saved (no replays if None)
+        :param profile_path: .json or .csv path to which the frame profile of every session is exported
+                             (the profiler is disabled if None)
+        :param seed: seed of the pipe course played by every game session (a new course per session if None)
+        :param score_path: path of the SQLite leaderboard in which every game session is saved (in memory if None)
+        :param player: name under which the game sessions are saved to the leaderboard
+        :param autopilot: whether the bird is flown by the perfect-play autopilot instead of the player
+        :param ghost_paths: replay files and directories whose sessions are raced against as ghosts (every game
+                            session then plays their course)
+        :param rewind_seconds: number of seconds of every game session which can be rewound with <BackSpace>
+                               (practice mode, disabled if 0)
+        """
+        # Private float-type variable to store the time at which the construction of the game started
+        construction_started = time.perf_counter()
         # Tkinter root window of the game
         self.root = tk.Tk()
         # Title of the game
         self.root.title("FlappyBird_v1")
 
         # Private integer-type variable to store the width of the game window
-        self._width = 485
+        self._width = flappy_world.WINDOW_WIDTH
         # Private integer-type variable to store the height of the game window
-        self._height = 640
+        self._height = flappy_world.WINDOW_HEIGHT
         # Variable to store the x-coordinate of the center of the window derived from its width
         self.window_center_x = self._width / 2
         # Variable to store the y-coordinate of the center of the window derived from its height
@@ -210,19 +302,62 @@ class MainApplication:
         # Place the canvas widget within the tkinter Root window
         self._canvas.grid(row=0, column=0)
 
+        # Private variable to store the cache which decodes every sprite (and sprite variant) only once
+        self._sprites = flappy_assets.SpriteCache(self.root)
         # Tkinter private image attribute to store the game background PhotoImage
-        self._background_image = tk.PhotoImage(file=self._BACKGROUND_IMAGE_FILE)
+        self._background_image = self._sprites.photo(self._BACKGROUND_IMAGE_FILE)
         # Initialize the background image widget from the canvas class
         self._canvas.create_image(self.window_center_x, self.window_center_y,
                                   image=self._background_image, anchor="c", tag="background")
 
+        # Private variable to store the headless game world which simulates every game session
+        self._world = flappy_world.GameWorld(self._width, self._height)
+        # Private variable to store the seed of the pipe course of every game session (e.g. a daily challenge)
+        self._seed = seed
+        # Private variables to store the race of recorded sessions shown as ghosts and their widgets (None if unused)
+        self._ghost_race = None
+        self._ghosts = None
+        if ghost_paths:
+            if flappy_ghosts is None:
+                raise RuntimeError("ghost racing requires numpy")
+            ghost_seed, ghost_replays = flappy_ghosts.load_ghost_replays(ghost_paths, seed, _MAX_GHOSTS)
+            if ghost_replays:
+                self._seed = ghost_seed
+                self._ghost_race = flappy_ghosts.GhostRace(ghost_replays, self._width, self._height)
+        # Private variable to store the ring buffer of the last frames of the session (None if rewinding is disabled)
+        self._snapshots = None
+        if rewind_seconds:
+            self._snapshots = flappy_snapshot.SnapshotRing(
+                round(rewind_seconds * 1000 / flappy_world.FRAME_INTERVAL_MS) + 1, self._width)
+        # Private boolean-type variable to indicate whether the current game session has been rewound
+        self._rewound = False
+        # Private variable to store the fixed-timestep clock which paces the game loop
+        self._clock = flappy_clock.FrameClock()
+        # Private variable to store the perfect-play autopilot flying the bird (None when the player flies it)
+        self._autopilot = flappy_solver.PerfectAutopilot() if autopilot else None
+        # Private variable to store the queue of time-stamped jump inputs, applied at the start of the next frame
+        self._inputs = flappy_input.InputQueue()
+        # Private variable to store the directory in which the replays of the game sessions are saved
+        self._replay_directory = replay_directory
+        if self._replay_directory:
+            os.makedirs(self._replay_directory, exist_ok=True)
+        # Private variables to store the opt-in frame profiler, its export path and its overlay widget
+        self._profile_path = profile_path
+        self._profiler = flappy_profiler.FrameProfiler(self._PROFILED_PHASES) if profile_path else None
+        if self._profiler:
+            # Report how long inputs wait for their frame and how long until the bird's jump is drawn
+            self._profiler.histograms["input_wait"] = self._inputs.wait_histogram
+            self._profiler.histograms["input_to_motion"] = self._inputs.motion_histogram
+        self._profiler_hud = None
+        # Private integer-type variable to count the profiled game sessions (numbers the exported files)
+        self._profiled_sessions = 0
+        # Private dictionary to store the latest startup and restart latencies (in milliseconds)
+        self._latencies_ms = {}
         # Private variable to store an instance of the Bird class (player)
         self._player = None
 
         # Initialise an instance of the Pipe class and store in a private variable _pipe
-        self._pipe = Pipe(self.root, self._canvas, self._width, self._height)
-        # Private list to store the id of the last pipe pair (bottom pipe) that the user has passed through
-        self._scored_pipes = []
+        self._pipe = Pipe(self.root, self._canvas, self._world)
 
         # Binding input from a user (keypress) to a private method _user_input_handler
         self._canvas.bind("<KeyPress>", self._user_input_handler)
@@ -231,12 +366,23 @@ class MainApplication:
         # Setting keyboard focus to the main canvas window
         self._canvas.focus_set()
 
+        # Private variables to store the persistent leaderboard (written in the background) and the player's name
+        self._scores = flappy_scores.ScoreStore(score_path) if score_path else None
+        self._player_name = player
         # Private integer-type variable to store the user's best scores
-        self._best_score = 0
+        self._best_score = self._scores.best_score(player) if self._scores else 0
         # Private integer-type variable to store the user's current score (within a single game session)
         self._player_score = 0
         # Private variable to store the score counter widget
         self._score_counter_text = None
+        # Private variables to store the "game over" menu widgets (created once and then shown or hidden)
+        self._game_over_widgets = None
+        self._game_over_score_text = None
+        self._game_over_best_text = None
+        self._game_over_leaderboard_text = None
+
+        # Commit the pending leaderboard writes when the game window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self._close)
 
         # Center the Tkinter root window on the user's screen
         self.root.eval('tk::PlaceWindow . center')
@@ -245,9 +391,35 @@ class MainApplication:
 
         # Call to the initialisation of the game
         self._start()
+        # Measure the time until the intro menu has been drawn
+        self.root.after_idle(self._record_latency, "startup", construction_started)
+        # Pre-rotate the player sprites while the intro menu is shown
+        self._sprites.warm_up(Bird.tilt_variants())
+
+    def _record_latency(self, name, started):
+        """
+        This private method records the time elapsed since a startup or restart was initiated
+        :param name: name of the measured latency ("startup" or "restart")
+        :param started: perf_counter time at which the startup or restart was initiated
+        """
+        self._latencies_ms[name] = (time.perf_counter() - started) * 1000
+        if self._profiler:
+            self._profiler.record_latency(name, self._latencies_ms[name])
 
+    def run(self):
+        """
+        Public method which hands control over to the Tkinter main loop until the game window is closed
+        """
         self.root.mainloop()
 
+    def _close(self):
+        """
+        This private method closes the game window, waiting for the leaderboard writer to commit pending sessions
+        """
+        if self._scores:
+            self._scores.close()
+        self.root.destroy()
+
     def _intro_menu(self):
         """
         This private method generates the main user menu containing the start button and an instructions page
@@ -302,14 +474,27 @@ class MainApplication:
         key_press = event.keysym
         # This private variable stores the name of the mouse button pressed by the user
         button_press = event.num
+        # Toggle the profiler overlay (if the profiler is enabled)
+        if key_press == "F3" and self._profiler_hud:
+            hud_state = "hidden" if self._canvas.itemcget(self._profiler_hud, "state") == "normal" else "normal"
+            self._canvas.itemconfigure(self._profiler_hud, state=hud_state)
+            return
+        # Rewind the game session (if rewinding is enabled)
+        if key_press == "BackSpace":
+            self._rewind()
+            return
         if key_press in ("space", "Up") or button_press == 1:
             # If a new game has just een started, treat the user input as a call to start a new game process
             if self._NEW_GAME:
                 self._NEW_GAME = False
                 # Set the keyboard focus on the canvas window
                 self._canvas.focus_set()
-                self._player.player_jump()
-                # Initiate the game flow
+                # The starting press is the first jump, unless the autopilot (which has planned from the un-jumped
+                # state) flies the bird
+                if not self._autopilot:
+                    self._inputs.push()
+                # Initiate the game flow, with the first frame due immediately
+                self._clock.start()
                 self._main()
 
             # If a game session has ended, treat the user input as a call to start a new game session (restart)
@@ -318,122 +503,209 @@ class MainApplication:
 
             # If a game session is currently running, treat the user input as calls for in-game mechanics (jumping)
             else:
-                # If the player exists, make it jump up
-                if self._player:
-                    self._player.player_jump()
+                # If the player exists, queue a jump (applied at the start of the next frame rather than in between)
+                if self._player and not self._GAME_OVER and not self._autopilot:
+                    self._inputs.push()
 
     def _initialise_game_layout(self):
         """
         This function initialises the main game layout before each game session
         """
-        # Remove all widgets present on the canvas
-        self._canvas.delete("all")
-        self._canvas.create_image(self.window_center_x, self.window_center_y,
-                                  image=self._background_image, anchor="c", tag="background")
-        # Initialise an instance of the Bird class and store in a private variable _player
-        self._player = Bird(self.root, self._canvas, self._width, self._height)
+        # Remove the main menu widgets (the background, bird, pipe and score widgets are reused between sessions)
+        self._canvas.delete("menu_window", "intro_menu_widget", "start_button", "instructions_menu_widget")
+        # Hide the widgets of the previous game session
+        self._pipe.clear()
+        if self._game_over_widgets:
+            self._set_widgets_state(self._game_over_widgets, "hidden")
+        # Put the game world back into its initial state and drop the inputs of the previous session
+        self._world.reset(self._seed)
+        self._inputs.clear()
+        self._rewound = False
+        if self._snapshots is not None:
+            self._snapshots.clear()
+            self._snapshots.capture(self._world)
+        if self._ghost_race:
+            self._ghost_race.reset()
+        if self._autopilot:
+            # Make the autopilot's first (and only unspread) plan of the session behind the start screen
+            self._autopilot(self._world)
+        if self._profiler:
+            self._profiler.reset()
+        if self._player is None:
+            if self._ghost_race:
+                # Initialise the ghost widgets below the player
+                self._ghosts = Ghosts(self.root, self._canvas, self._ghost_race, self._sprites)
+            # Initialise an instance of the Bird class and store in a private variable _player
+            self._player = Bird(self.root, self._canvas, self._world, self._sprites)
+            # Initialize the (hidden) score counter widget above the bird and the pipes
+            self._score_counter_text = self._canvas.create_text(self.window_center_x, 120, text="0", fill="white",
+                                                                font=("Arial", 50), justify="center",
+                                                                state="hidden", tag="score_counter")
+            if self._profiler:
+                # Initialize the profiler overlay widget in the top-left corner (toggled with <F3>)
+                self._profiler_hud = self._canvas.create_text(8, 8, text="", fill="white", anchor="nw",
+                                                              font=("Courier", 9), tag="profiler_hud")
+        else:
+            # Move the existing player back to its starting position
+            self._player.player_fall()
+            self._canvas.itemconfigure(self._score_counter_text, state="hidden")
+        if self._ghosts:
+            self._ghosts.show()
         # Indicate that a new game session has been initiated
         self._NEW_GAME = True
 
     def _overlap_detection(self):
         """
-        This private method detects when a collision or an overlap occurs within the game between the player
-        and other specified widgets
+        This private method reflects the collisions and overlaps detected by the game world between the player
+        and the pipes or the floor on the canvas (updates the score board when the player passes a pipe pair)
         :return: a boolean indicating whether a collision has occurred between the player and a pipe object or the floor
         """
-        # A private tuple containing IDs of canvas widgets under the "pipe" tag present on the screen
-        pipe_objects = self._canvas.find_withtag("pipe")
-        # A private list containing the coordinates of the player (bird) on the canvas
-        player_coords = self._player.get_player_x_y_coords()
-        # A private int-type variable containing the x coordinate of the player on the canvas
-        player_x = player_coords[0]
-        # A private int-type variable containing the y coordinate of the player on the canvas
-        player_y = player_coords[1]
-        # A tuple containing the IDs of canvas widgets that overlap with the player (bird) widget
-        overlapping_objects = self._canvas.find_overlapping(player_x - 18, player_y - 18, player_x + 22,
-                                                            player_y + 20)
-        for pipe in pipe_objects:
-            # Remove pipes that have left the canvas window to maximise performance
-            if self._canvas.coords(pipe)[2] < 0:
-                # Check whether the current pipe object's id is in the _scored_pipes list
-                if pipe in self._scored_pipes:
-                    # Remove the redundant widget ID from the list
-                    self._scored_pipes.remove(pipe)
-                self._canvas.delete(pipe)
-            # Check whether the chosen pipe object is a bottom pipe
-            if "bottom_pipe" in self._canvas.gettags(pipe):
-                # Check if the player has flown above the specified pipe without colliding with it (through the gap)
-                if self._canvas.coords(pipe)[0] < player_x:
-                    # Check that the player hasn't yet been scored for passing through the given pipe pair
-                    if pipe not in self._scored_pipes:
-                        # If not, assign the given pipe to _scored_pipe
-                        self._scored_pipes.append(pipe)
-                        # Give the player 1 point and update the score board
-                        self._player_score += 1
-                        self._update_score()
-            # If, however, the player has physically collided with the given pipe or the floor, return True
-            if pipe in overlapping_objects:
-                # Indicates a collision between the bird and a pipe, so a game over call should be made
-                return True
-        # Indicates that a collision between the bird and the ground, so a game over call should be made
-        if self._player.get_player_x_y_coords()[1] > self._height - 31:
-            return True
-        else:
-            # Return False to indicate that no collision had occurred
-            return False
+        # Check whether the player has passed through a new pipe pair during the last frame
+        if self._world.score != self._player_score:
+            # If so, update the player's score and the score board
+            self._player_score = self._world.score
+            self._update_score()
+        return self._world.game_over
 
     def _update_score(self):
         """
         This private method updates the game score text every time the user scores
         """
-        # Clear the scoring board (if exists)
-        self._canvas.delete("score_counter")
-        # Initialize a new game score counter widget and store it in the private attribute _score_counter_text
-        self._score_counter_text = self._canvas.create_text(self.window_center_x, 120,
-                                                            text="{}".format(self._player_score), fill="white",
-                                                            font=("Arial", 50), justify="center", tag="score_counter")
+        # Update the text of the existing score counter widget in place and make sure it is shown
+        self._canvas.itemconfigure(self._score_counter_text, text="{}".format(self._player_score), state="normal")
 
     def _game_over_menu(self):
         """
         This private method generates the "game over" menu with the user's end scores
         """
         self._GAME_OVER = True
-        self._canvas.delete("score_counter")
+        self._canvas.itemconfigure(self._score_counter_text, state="hidden")
         # Check whether the user had reached a new high score
         if self._player_score > self._best_score:
             # If so, set the new high score
             self._best_score = self._player_score
+        # Queue the game session for the leaderboard (written by a background thread, so this never blocks)
+        # unless it has been rewound in practice mode
+        if self._scores and not self._rewound:
+            self._scores.record(self._player_name, self._player_score, self._world.frame, self._world.seed)
+        # Save a replay of the game session if recording is enabled
+        if self._replay_directory:
+            replay_file = "{}_{}{}".format(time.time_ns(), self._world.seed, flappy_replay.REPLAY_EXTENSION)
+            flappy_replay.save_replay(flappy_replay.Replay.from_world(self._world),
+                                      os.path.join(self._replay_directory, replay_file))
+        # Export the frame profile of the game session if the profiler is enabled
+        if self._profiler:
+            self._profiled_sessions += 1
+            profile_stem, profile_extension = os.path.splitext(self._profile_path)
+            self._profiler.export("{}-{}{}".format(profile_stem, self._profiled_sessions, profile_extension or ".json"))
+        if self._game_over_widgets is None:
+            self._create_game_over_menu()
+        # Update the score texts of the existing menu in place and show the menu
+        self._canvas.itemconfigure(self._game_over_score_text, text=f"{self._player_score}")
+        self._canvas.itemconfigure(self._game_over_best_text, text=f"{self._best_score}")
+        if self._scores:
+            # The leaderboard and the percentile are read from the store's in-memory cache
+            lines = ["Better than {:.0%} of {} games".format(self._scores.percentile(self._player_score),
+                                                              self._scores.sessions)]
+            for rank, (name, score) in enumerate(self._scores.top(5), start=1):
+                lines.append("{}. {} {}".format(rank, name, score))
+            self._canvas.itemconfigure(self._game_over_leaderboard_text, text="\n".join(lines))
+        self._set_widgets_state(self._game_over_widgets, "normal")
+
+    def _create_game_over_menu(self):
+        """
+        This private method creates the (hidden) widgets of the "game over" menu the first time it is needed
+        """
         # Create a canvas rectangle widget to serve as the menu's background
-        self._canvas.create_rectangle(self.window_center_x - 50, self.window_center_y - 135, self.window_center_x + 50,
-                                      self.window_center_y + 10, fill="yellow", tag="game_over_t")
+        background = self._canvas.create_rectangle(self.window_center_x - 50, self.window_center_y - 135,
+                                                   self.window_center_x + 50, self.window_center_y + 10,
+                                                   fill="yellow", state="hidden", tag="game_over_t")
         # Create a canvas text widget to store and display the word "Score"
-        self._canvas.create_text(self.window_center_x, self.window_center_y - 110, text="Score", fill="black",
-                                 font=("Arial", 20), justify="center", tag="game_over_t")
+        score_label = self._canvas.create_text(self.window_center_x, self.window_center_y - 110, text="Score",
+                                               fill="black", font=("Arial", 20), justify="center", state="hidden",
+                                               tag="game_over_t")
         # Create a canvas text widget to store and display the user's current score
-        self._canvas.create_text(self.window_center_x, self.window_center_y - 80, text=f"{self._player_score}", fill="red",
-                                 font=("Arial", 20), justify="center", tag="game_over_t")
+        self._game_over_score_text = self._canvas.create_text(self.window_center_x, self.window_center_y - 80,
+                                                              text="", fill="red", font=("Arial", 20),
+                                                              justify="center", state="hidden", tag="game_over_t")
         # Create a canvas text widget to store and display the word "Best score"
-        self._canvas.create_text(self.window_center_x, self.window_center_y - 45, text="Best", fill="black",
-                                 font=("Arial", 20), justify="center", tag="game_over_t")
+        best_label = self._canvas.create_text(self.window_center_x, self.window_center_y - 45, text="Best",
+                                              fill="black", font=("Arial", 20), justify="center", state="hidden",
+                                              tag="game_over_t")
         # Create a canvas text widget to store and display the user's best score
-        self._canvas.create_text(self.window_center_x, self.window_center_y - 15, text=f"{self._best_score}", fill="red",
-                                 font=("Arial", 20), justify="center", tag="game_over_t")
+        self._game_over_best_text = self._canvas.create_text(self.window_center_x, self.window_center_y - 15,
+                                                             text="", fill="red", font=("Arial", 20),
+                                                             justify="center", state="hidden", tag="game_over_t")
         # Create a canvas button widget to act as the "restart" button
         button_restart = tk.Button(self._canvas, text="Restart", anchor='c', font=("ROBOTO", 12, "bold"),
                                    command=self._restart_game)
         button_restart.configure(width=20, background="orange")
         # Create a canvas window widget to host the "restart" button
-        self._canvas.create_window(self.window_center_x, self.window_center_y + 50, window=button_restart, tag="game_over_t")
+        restart_window = self._canvas.create_window(self.window_center_x, self.window_center_y + 50,
+                                                    window=button_restart, state="hidden", tag="game_over_t")
+        self._game_over_widgets = (background, score_label, self._game_over_score_text, best_label,
+                                   self._game_over_best_text, restart_window)
+        if self._scores:
+            # Create a canvas text widget to display the top scores of the leaderboard below the "restart" button
+            self._game_over_leaderboard_text = self._canvas.create_text(
+                self.window_center_x, self.window_center_y + 80, text="", fill="white", font=("Arial", 14),
+                justify="center", anchor="n", state="hidden", tag="game_over_t")
+            self._game_over_widgets += (self._game_over_leaderboard_text,)
+
+    def _rewind(self):
+        """
+        This private method rewinds the game session by up to a second (practice mode) and redraws the canvas from
+        the restored snapshot in one pass. A session rewound after "game over" resumes with the next jump
+        (or the next press, when the autopilot flies the bird)
+        """
+        if self._snapshots is None or not self._snapshots.count or self._player is None:
+            return
+        age = min(self._REWIND_STEP_FRAMES, self._snapshots.count - 1)
+        self._snapshots.restore(self._world, age)
+        # Restoring the most recent snapshot (before the first frame of a session) leaves the session untouched
+        if age:
+            self._rewound = True
+        self._inputs.clear()
+        # Redraw the pipe pairs (the restored pairs replace every drawn one), the player and the score
+        self._pipe.pipe_generator()
+        self._player.player_fall()
+        self._player_score = self._world.score
+        if self._player_score:
+            self._update_score()
+        else:
+            self._canvas.itemconfigure(self._score_counter_text, state="hidden")
+        if self._ghosts:
+            self._ghost_race.seek(self._world.frame)
+            self._ghosts.show()
+        if self._autopilot:
+            # Plan from the restored state now rather than inside the next frame
+            self._autopilot(self._world)
+        if self._GAME_OVER:
+            # Wait for the player's next jump to resume the session
+            self._GAME_OVER = False
+            self._set_widgets_state(self._game_over_widgets, "hidden")
+            self._NEW_GAME = True
+
+    def _set_widgets_state(self, widgets, state):
+        """
+        This private method shows or hides a group of canvas widgets
+        :param widgets: the IDs of the canvas widgets
+        :param state: "normal" to show the widgets or "hidden" to hide them
+        """
+        for widget in widgets:
+            self._canvas.itemconfigure(widget, state=state)
 
     def _restart_game(self):
         """
         This private method clears the main canvas window and restarts the game
         """
-        self._canvas.delete("all")
+        restart_started = time.perf_counter()
         self._GAME_OVER = False
         self._player_score = 0
         self._NEW_GAME = False
         self._initialise_game_layout()
+        # Measure the time until the new game layout has been drawn
+        self.root.after_idle(self._record_latency, "restart", restart_started)
 
     def _start(self):
         """
@@ -445,23 +717,97 @@ class MainApplication:
         """
         This function carries out the primary game flow (logic within a single game session)
         """
-        # Raise the score text widget above the pipe widgets (if exists)
-        if self._score_counter_text:
-            self._canvas.tag_raise(self._score_counter_text)
-        # Generate a new pipe pair on the screen if appropriate
+        profiler = self._profiler
+        if profiler:
+            profiler.begin_frame()
+        # Advance the game world by every fixed-length frame that is due (catching up after a late callback)
+        steps = self._clock.advance()
+        # Apply the inputs queued since the previous frame to the first step of this frame
+        if steps and self._inputs.consume():
+            self._player.player_jump()
+        for _ in range(steps):
+            # Advance the ghosts in lockstep with the player
+            if self._ghost_race:
+                self._ghost_race.step()
+            game_over = self._world.step(self._autopilot(self._world) if self._autopilot else False)
+            if self._snapshots is not None:
+                self._snapshots.capture(self._world)
+            if game_over:
+                break
+        if profiler:
+            profiler.mark()
+        # Draw the pipe pairs generated (and remove those culled) by the game world
         self._pipe.pipe_generator()
-        # Check the game window for collisions or overlaps between the existing widgets
+        if profiler:
+            profiler.mark()
+        # Check the game world for collisions and newly passed pipe pairs
         collision = self._overlap_detection()
+        if profiler:
+            profiler.mark()
         # Make the player move downward (fall due to gravity)
         self._player.player_fall()
+        self._inputs.motion_drawn()
+        if profiler:
+            profiler.mark()
         # Move the pipe objects towards the player
         self._pipe.move_pipe()
+        if profiler:
+            profiler.mark()
+        # Move the ghosts alongside the player
+        if self._ghosts:
+            self._ghosts.move_ghosts()
+        if profiler:
+            profiler.mark()
         # If no collision has been detected, repeat the process
         if not collision:
-            self.root.after(15, self._main)
+            delay = self._clock.delay_ms()
+            if profiler:
+                profiler.end_frame(steps, delay)
+                if profiler.frames % self._PROFILER_HUD_INTERVAL == 0:
+                    self._canvas.itemconfigure(self._profiler_hud, text=profiler.hud_text())
+            self.root.after(delay, self._main)
         # If the player has collided with a pipe or the floor, initiate "game over" scene (menu)
         else:
+            if profiler:
+                profiler.end_frame(steps, 0)
             self._game_over_menu()
 
 
-MainApplication()
+# ================  FUNCTION CODE  =================+
+def _seed_argument(text):
+    """
+    This private function parses the seed of a pipe course given on the command line
+    :param text: the command-line argument
+    :return: the seed as an integer between 0 and flappy_world.SEED_LIMIT - 1
+    """
+    seed = int(text)
+    if not 0 <= seed < flappy_world.SEED_LIMIT:
+        raise argparse.ArgumentTypeError("seeds range from 0 to {}".format(flappy_world.SEED_LIMIT - 1))
+    return seed
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Play FloppyBird.")
+    argument_parser.add_argument("--record", metavar="DIRECTORY", help="save a replay of every game session")
+    argument_parser.add_argument("--profile", metavar="FILE",
+                                 help="time every frame and export each session to FILE-<n>.json or .csv "
+                                      "(<F3> toggles the overlay)")
+    argument_parser.add_argument("--scores", metavar="FILE", help="save every game session to this SQLite leaderboard")
+    argument_parser.add_argument("--player", default="player", help="name under which the sessions are saved")
+    course_arguments = argument_parser.add_mutually_exclusive_group()
+    course_arguments.add_argument("--seed", type=_seed_argument, help="play the pipe course of this seed in every session")
+    course_arguments.add_argument("--daily", action="store_true", help="play today's daily challenge course")
+    argument_parser.add_argument("--autopilot", action="store_true", help="let the perfect-play autopilot fly the bird")
+    argument_parser.add_argument("--ghosts", nargs="+", metavar="PATH",
+                                 help="race against the recorded sessions of these replay files or directories")
+    argument_parser.add_argument("--rewind", type=float, default=0, metavar="SECONDS",
+                                 help="practice mode: keep the last SECONDS of every session, <BackSpace> rewinds "
+                                      "one second")
+    arguments = argument_parser.parse_args()
+    course_seed = arguments.seed
+    if arguments.daily:
+        # Skip to the next seed if the first pipe pairs of today's course cannot be survived
+        course_seed = flappy_solver.survivable_seed(flappy_world.daily_seed(), _DAILY_CHECKED_PIPES)
+    MainApplication(replay_directory=arguments.record, profile_path=arguments.profile, seed=course_seed,
+                    score_path=arguments.scores, player=arguments.player, autopilot=arguments.autopilot,
+                    ghost_paths=arguments.ghosts, rewind_seconds=arguments.rewind).run()
@@ -0,0 +1,358 @@
+# flappy_assets.py
+# Asset manager: resolves sprite paths, decodes every sprite once per process and caches its scaled/rotated variants
+# ===================  IMPORTS  ===================+
+import base64
+import functools
+import math
+import os
+import struct
+import zlib
+
+try:
+    import tkinter as tk
+except ImportError:  # The pixel-level functions below do not need tkinter
+    tk = None
+
+
+# =================  ASSET CONSTANTS  =================+
+# Directory holding the sprites, resolved relative to this module (so it does not depend on the working directory)
+ASSET_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Sprites")
+# File names of the game's sprites
+BIRD_SPRITE = "bird.png"
+BACKGROUND_SPRITE = "background.png"
+# Tk color name of the pipes and its RGB value (for renderers which do not go through Tk)
+PIPE_COLOR = "lime green"
+PIPE_RGB = (50, 205, 50)
+
+# Clockwise tilt of the bird sprite (in degrees) per unit of vertical speed
+TILT_DEGREES_PER_Y_SPEED = 6
+# Smallest and biggest tilt of the bird sprite, and the step between two pre-rotated bird sprites
+MIN_TILT = -30
+MAX_TILT = 60
+TILT_STEP = 10
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+# ==================  CLASS CODE  ==================+
+class RGBAImage:
+    """
+    This class stores a decoded image as a flat bytearray of 8-bit RGBA pixels (row by row)
+    """
+    __slots__ = ("width", "height", "pixels")
+
+    def __init__(self, width, height, pixels=None):
+        """
+        Constructor function of the RGBAImage class
+        :param width: width of the image in pixels
+        :param height: height of the image in pixels
+        :param pixels: bytearray of width * height * 4 bytes (a fully transparent image if None)
+        """
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height * 4) if pixels is None else pixels
+
+
+class SpriteCache:
+    """
+    This class hands out the Tk PhotoImages of the sprites. Every sprite file is decoded and every variant (scale
+    and rotation) is computed once per process, so creating a new game session never touches the disk, and a new
+    cache (e.g. of a new game window) only has to hand the computed variants over to Tk
+    """
+
+    def __init__(self, master=None):
+        """
+        Constructor function of the SpriteCache class
+        :param master: the Tkinter root window owning the images (the default root if None)
+        """
+        self._master = master
+        # Private dictionary mapping (sprite name, rotation in degrees, scale, ghost) to a PhotoImage
+        self._photos = {}
+
+    def photo(self, name, degrees=0, scale=1, ghost=False):
+        """
+        Public method which returns a (shared) PhotoImage of a sprite
+        :param name: file name of the sprite within ASSET_DIRECTORY
+        :param degrees: clockwise rotation of the sprite (about its center)
+        :param scale: integer scale factor of the sprite
+        :param ghost: whether to return the semi-transparent (ghost) variant of the sprite
+        :return: a tk.PhotoImage
+        """
+        key = (name, degrees, scale, ghost)
+        photo = self._photos.get(key)
+        if photo is None:
+            if degrees == 0 and scale == 1 and not ghost:
+                # Let Tk decode the unmodified sprite straight from its file
+                photo = tk.PhotoImage(master=self._master, file=asset_path(name))
+            else:
+                photo = tk.PhotoImage(master=self._master, data=variant_data(name, degrees, scale, ghost))
+            self._photos[key] = photo
+        return photo
+
+    def warm_up(self, variants):
+        """
+        Public method which computes a list of variants one at a time whenever Tk is idle (e.g. behind a menu)
+        :param variants: list of (sprite name, degrees, scale) tuples
+        """
+        pending = list(variants)
+        master = self._master if self._master is not None else tk._get_default_root("warm up sprites")
+
+        def compute_next():
+            if pending:
+                self.photo(*pending.pop(0))
+                master.after_idle(compute_next)
+
+        master.after_idle(compute_next)
+
+
+# ================  FUNCTION CODE  =================+
+def bird_tilt(y_speed):
+    """
+    This function returns the tilt of the bird sprite matching a vertical speed (snapped to a pre-rotated variant)
+    :param y_speed: the vertical speed of the bird
+    :return: the clockwise tilt in degrees
+    """
+    tilt = round(y_speed * TILT_DEGREES_PER_Y_SPEED / TILT_STEP) * TILT_STEP
+    return min(MAX_TILT, max(MIN_TILT, tilt))
+
+
+def bird_tilts():
+    """
+    This function lists every tilt of the pre-rotated bird sprites
+    :return: a list of tilts in degrees
+    """
+    return list(range(MIN_TILT, MAX_TILT + 1, TILT_STEP))
+
+
+def asset_path(name):
+    """
+    This function returns the absolute path of a sprite
+    :param name: file name of the sprite within ASSET_DIRECTORY
+    :return: the absolute path of the sprite file
+    """
+    return os.path.join(ASSET_DIRECTORY, name)
+
+
+@functools.lru_cache(maxsize=None)
+def load_image(name):
+    """
+    This function decodes a sprite (once per process)
+    :param name: file name of the sprite within ASSET_DIRECTORY
+    :return: the decoded RGBAImage (shared, so it must not be modified)
+    """
+    with open(asset_path(name), "rb") as png_file:
+        return decode_png(png_file.read())
+
+
+@functools.lru_cache(maxsize=None)
+def variant_data(name, degrees=0, scale=1, ghost=False):
+    """
+    This function computes a variant of a sprite (once per process)
+    :param name: file name of the sprite within ASSET_DIRECTORY
+    :param degrees: clockwise rotation of the sprite (about its center)
+    :param scale: integer scale factor of the sprite
+    :param ghost: whether to make the sprite semi-transparent (ghost)
+    :return: the variant as base64-encoded PNG data (as taken by tk.PhotoImage)
+    """
+    image = load_image(name)
+    if scale != 1:
+        image = scale_image(image, scale)
+    if degrees:
+        image = rotate_image(image, degrees)
+    if ghost:
+        image = ghost_image(image)
+    return base64.b64encode(encode_png(image)).decode("ascii")
+
+
+def decode_png(data):
+    """
+    This function decodes an 8-bit, non-interlaced RGB or RGBA PNG image
+    :param data: bytes of the PNG file
+    :return: the decoded RGBAImage
+    """
+    if data[:8] != _PNG_SIGNATURE:
+        raise ValueError("not a PNG image")
+    position = 8
+    compressed = bytearray()
+    header = None
+    while position < len(data):
+        length, chunk_type = struct.unpack_from(">I4s", data, position)
+        chunk = data[position + 8:position + 8 + length]
+        if chunk_type == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif chunk_type == b"IDAT":
+            compressed += chunk
+        elif chunk_type == b"IEND":
+            break
+        position += 12 + length
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if bit_depth != 8 or color_type not in (2, 6) or interlace:
+        raise ValueError("only 8-bit non-interlaced RGB and RGBA PNG images are supported")
+    channels = 4 if color_type == 6 else 3
+    stride = width * channels
+    raw = zlib.decompress(bytes(compressed))
+    pixels = bytearray(height * stride)
+    previous = bytearray(stride)
+    for y in range(height):
+        line = bytearray(raw[y * (stride + 1) + 1:(y + 1) * (stride + 1)])
+        _unfilter_line(raw[y * (stride + 1)], line, previous, channels)
+        pixels[y * stride:(y + 1) * stride] = line
+        previous = line
+    if channels == 3:
+        rgba = bytearray(width * height * 4)
+        for channel in range(3):
+            rgba[channel::4] = pixels[channel::3]
+        rgba[3::4] = b"\xff" * (width * height)
+        pixels = rgba
+    return RGBAImage(width, height, pixels)
+
+
+def _unfilter_line(filter_type, line, previous, bpp):
+    """
+    This private function reverses the PNG filter of a single scanline in place
+    :param filter_type: the PNG filter type of the scanline (0 to 4)
+    :param line: bytearray of the filtered scanline
+    :param previous: bytearray of the previous (already unfiltered) scanline
+    :param bpp: number of bytes per pixel
+    """
+    if filter_type == 1:
+        for i in range(bpp, len(line)):
+            line[i] = (line[i] + line[i - bpp]) & 0xFF
+    elif filter_type == 2:
+        for i in range(len(line)):
+            line[i] = (line[i] + previous[i]) & 0xFF
+    elif filter_type == 3:
+        for i in range(len(line)):
+            left = line[i - bpp] if i >= bpp else 0
+            line[i] = (line[i] + ((left + previous[i]) >> 1)) & 0xFF
+    elif filter_type == 4:
+        for i in range(len(line)):
+            left = line[i - bpp] if i >= bpp else 0
+            up_left = previous[i - bpp] if i >= bpp else 0
+            up = previous[i]
+            estimate = left + up - up_left
+            distance_left = abs(estimate - left)
+            distance_up = abs(estimate - up)
+            distance_up_left = abs(estimate - up_left)
+            if distance_left <= distance_up and distance_left <= distance_up_left:
+                predictor = left
+            elif distance_up <= distance_up_left:
+                predictor = up
+            else:
+                predictor = up_left
+            line[i] = (line[i] + predictor) & 0xFF
+    elif filter_type != 0:
+        raise ValueError("unknown PNG filter type {}".format(filter_type))
+
+
+def encode_png(image):
+    """
+    This function encodes an image as an (unfiltered) 8-bit RGBA PNG
+    :param image: the RGBAImage to encode
+    :return: bytes of the PNG file
+    """
+    stride = image.width * 4
+    raw = bytearray()
+    for y in range(image.height):
+        raw.append(0)
+        raw += image.pixels[y * stride:(y + 1) * stride]
+
+    def chunk(chunk_type, body):
+        return struct.pack(">I", len(body)) + chunk_type + body + struct.pack(">I", zlib.crc32(chunk_type + body))
+
+    return (_PNG_SIGNATURE + chunk(b"IHDR", struct.pack(">IIBBBBB", image.width, image.height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(bytes(raw))) + chunk(b"IEND", b""))
+
+
+def opaque_bounds(image):
+    """
+    This function returns the bounding box of the non-transparent pixels of an image
+    :param image: the RGBAImage
+    :return: a tuple (x1, y1, x2, y2) of the inclusive-exclusive bounds, or None if the image is fully transparent
+    """
+    xs = []
+    ys = []
+    alpha = image.pixels[3::4]
+    for y in range(image.height):
+        row = alpha[y * image.width:(y + 1) * image.width]
+        if any(row):
+            ys.append(y)
+            xs.append(next(x for x in range(image.width) if row[x]))
+            xs.append(next(x for x in reversed(range(image.width)) if row[x]))
+    if not ys:
+        return None
+    return min(xs), ys[0], max(xs) + 1, ys[-1] + 1
+
+
+def rotate_image(image, degrees):
+    """
+    This function rotates an image clockwise about its center (nearest neighbour), keeping its size. Only the square
+    around the center which can hold the rotated opaque pixels is computed
+    :param image: the RGBAImage to rotate
+    :param degrees: clockwise rotation in degrees
+    :return: a new RGBAImage
+    """
+    width, height = image.width, image.height
+    rotated = RGBAImage(width, height)
+    bounds = opaque_bounds(image)
+    if bounds is None:
+        return rotated
+    center_x = width / 2
+    center_y = height / 2
+    # Radius of the circle around the center which holds every opaque pixel
+    radius = max(math.hypot(x - center_x, y - center_y) for x in (bounds[0], bounds[2]) for y in (bounds[1], bounds[3]))
+    cos_angle = math.cos(math.radians(degrees))
+    sin_angle = math.sin(math.radians(degrees))
+    source = image.pixels
+    target = rotated.pixels
+    for y in range(max(0, int(center_y - radius)), min(height, int(center_y + radius) + 1)):
+        dy = y + 0.5 - center_y
+        for x in range(max(0, int(center_x - radius)), min(width, int(center_x + radius) + 1)):
+            dx = x + 0.5 - center_x
+            # Map the target pixel back into the source image (rotation by -degrees)
+            source_x = int(math.floor(center_x + dx * cos_angle + dy * sin_angle))
+            source_y = int(math.floor(center_y - dx * sin_angle + dy * cos_angle))
+            if 0 <= source_x < width and 0 <= source_y < height:
+                source_index = (source_y * width + source_x) * 4
+                target_index = (y * width + x) * 4
+                target[target_index:target_index + 4] = source[source_index:source_index + 4]
+    return rotated
+
+
+def ghost_image(image):
+    """
+    This function makes an image semi-transparent by clearing the alpha of every other pixel (a checkerboard), which
+    Tk draws the same way on every platform, unlike partial alpha
+    :param image: the RGBAImage to fade
+    :return: a new RGBAImage
+    """
+    width = image.width
+    ghost = RGBAImage(width, image.height, bytearray(image.pixels))
+    for y in range(image.height):
+        # Alpha channel of the first cleared pixel of the row, then of every second pixel
+        start = (y * width + y % 2) * 4 + 3
+        end = (y + 1) * width * 4
+        ghost.pixels[start:end:8] = bytes(len(range(start, end, 8)))
+    return ghost
+
+
+def scale_image(image, factor):
+    """
+    This function scales an image by an integer factor (nearest neighbour)
+    :param image: the RGBAImage to scale
+    :param factor: positive integer scale factor
+    :return: a new RGBAImage
+    """
+    width = image.width * factor
+    scaled = RGBAImage(width, image.height * factor)
+    stride = image.width * 4
+    for y in range(image.height):
+        row = image.pixels[y * stride:(y + 1) * stride]
+        scaled_row = bytearray(width * 4)
+        for offset in range(factor):
+            for channel in range(4):
+                scaled_row[offset * 4 + channel::factor * 4] = row[channel::4]
+        for repeat in range(factor):
+            start = ((y * factor + repeat) * width) * 4
+            scaled.pixels[start:start + width * 4] = scaled_row
+    return scaled
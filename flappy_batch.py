@@ -0,0 +1,152 @@
+# flappy_batch.py
+# NumPy-vectorized simulator which steps a whole population of birds through one shared pipe course
+# ===================  IMPORTS  ===================+
+import numpy as np
+
+from flappy_world import (WINDOW_WIDTH, WINDOW_HEIGHT, GRAVITY_Y_SPEED, JUMP_Y_SPEED, UPPER_WINDOW_BOUNDARY,
+                          DOWNWARD_ACCELERATION, FLOOR_OFFSET, BIRD_HITBOX, PipeTrack, new_seed)
+
+
+# ==================  CLASS CODE  ==================+
+class BatchWorld:
+    """
+    This class simulates many birds at once with the same rules as GameWorld. The y-positions, y-speeds,
+    alive flags and scores of the birds are stored in NumPy arrays and updated in place, while the pipe
+    course is shared by the whole population
+    """
+
+    def __init__(self, n_birds, window_width=WINDOW_WIDTH, window_height=WINDOW_HEIGHT, seed=None):
+        """
+        Constructor function of the BatchWorld class
+        :param n_birds: number of birds simulated side by side
+        :param window_width: width of the simulated game window
+        :param window_height: height of the simulated game window
+        :param seed: seed of the shared random pipe course (a new seed is drawn if None)
+        """
+        self.n_birds = n_birds
+        self.window_width = window_width
+        self.window_height = window_height
+        # The pipe pairs of the shared course which are currently on the screen
+        self.track = PipeTrack(self.window_width, self.window_height)
+        # Ring buffer of the shared PipePair objects, ordered from the oldest (left-most) to the newest
+        self.pipes = self.track.pipes
+
+        # Per-bird state arrays
+        self.bird_y = np.empty(n_birds, dtype=np.float64)
+        self.bird_y_speed = np.empty(n_birds, dtype=np.float64)
+        self.alive = np.empty(n_birds, dtype=bool)
+        self.scores = np.empty(n_birds, dtype=np.int64)
+        # Number of frames each bird has survived (equal to GameWorld.frame at the moment of its game over)
+        self.frames_alive = np.empty(n_birds, dtype=np.int64)
+        # Pre-allocated scratch arrays so that a step does not allocate per-bird temporaries
+        self._active = np.empty(n_birds, dtype=bool)
+        self._collision = np.empty(n_birds, dtype=bool)
+        self._mask = np.empty(n_birds, dtype=bool)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """
+        Public method which puts every bird and the pipe course back into the state at the start of a game session
+        :param seed: seed of the shared random pipe course (a new seed is drawn if None)
+        """
+        self.seed = new_seed() if seed is None else seed
+        self.track.reset(self.seed)
+        # The birds are horizontally fixed at the center of the window
+        self.bird_x = self.window_width / 2
+        self.bird_y.fill(self.window_height / 2)
+        self.bird_y_speed.fill(GRAVITY_Y_SPEED)
+        self.alive.fill(True)
+        self.scores.fill(0)
+        self.frames_alive.fill(0)
+        self.frame = 0
+
+    @property
+    def game_over(self):
+        """
+        Public property which indicates whether every bird of the population has collided
+        """
+        return not self.alive.any()
+
+    def next_gap(self):
+        """
+        Public method which returns the pipe pair the birds have to fly through next
+        :return: the nearest PipePair whose right edge has not yet been passed by the birds' hitbox, or None
+        """
+        return self.track.next_pipe(self.bird_x - BIRD_HITBOX[0])
+
+    def step(self, jumps=False):
+        """
+        Public method which advances every bird that is still alive by a single frame
+        :param jumps: a boolean (or an array of n_birds booleans) stating which birds jump at the start of this frame
+        :return: a boolean indicating whether every bird has collided
+        """
+        active = self._active
+        np.copyto(active, self.alive)
+        if not active.any():
+            return True
+        # Apply the jump impulses of the birds which are still alive
+        np.logical_and(jumps, active, out=self._mask)
+        np.copyto(self.bird_y_speed, JUMP_Y_SPEED, where=self._mask)
+        self.track.spawn()
+        self._detect_overlaps(active)
+        self._birds_fall(active)
+        self.track.move()
+        self.frame += 1
+        self.frames_alive += active
+        # Birds which collided during this frame stop being simulated
+        np.logical_and(active, np.logical_not(self._collision, out=self._mask), out=self.alive)
+        return not self.alive.any()
+
+    def run(self, policy, max_frames=None):
+        """
+        Public method which plays the whole population until every bird has collided
+        :param policy: a function which takes this BatchWorld and returns an array of n_birds jump decisions
+        :param max_frames: optional number of frames after which the run is stopped
+        :return: the array of final scores
+        """
+        while not self.step(policy(self)):
+            if max_frames is not None and self.frame >= max_frames:
+                break
+        return self.scores
+
+    def _detect_overlaps(self, active):
+        """
+        This private method removes pipes that have left the window, scores the birds which passed a pipe pair
+        and fills the collision array for the birds hitting a pipe or the floor
+        :param active: boolean array of the birds which are alive at the start of this frame
+        """
+        collision = self._collision
+        mask = self._mask
+        # Check whether the birds have hit the floor
+        np.greater(self.bird_y, self.window_height - FLOOR_OFFSET, out=collision)
+        track = self.track
+        track.cull()
+        # Score the pairs the birds have flown past for every active bird
+        scored = track.score(self.bird_x)
+        if scored:
+            np.add(self.scores, scored, out=self.scores, where=active)
+        # Check the birds' hitboxes against the nearest pipe pairs which share their x-range
+        bird_left = self.bird_x - BIRD_HITBOX[0]
+        bird_right = self.bird_x + BIRD_HITBOX[2]
+        pipes = track.pipes
+        index = track.nearest(bird_left)
+        while index < len(pipes) and pipes[index].x <= bird_right:
+            pipe = pipes[index]
+            np.less_equal(self.bird_y, pipe.gap_top + BIRD_HITBOX[1], out=mask)
+            collision |= mask
+            np.greater_equal(self.bird_y, pipe.gap_bottom - BIRD_HITBOX[3], out=mask)
+            collision |= mask
+            index += 1
+        collision &= active
+
+    def _birds_fall(self, active):
+        """
+        This private method makes the active birds move downward (fall), bouncing them back down off the upper boundary
+        :param active: boolean array of the birds which are alive at the start of this frame
+        """
+        mask = self._mask
+        np.less(self.bird_y, UPPER_WINDOW_BOUNDARY, out=mask)
+        mask &= active
+        np.copyto(self.bird_y_speed, GRAVITY_Y_SPEED, where=mask)
+        np.add(self.bird_y, self.bird_y_speed, out=self.bird_y, where=active)
+        np.add(self.bird_y_speed, DOWNWARD_ACCELERATION, out=self.bird_y_speed, where=active)
@@ -0,0 +1,458 @@
+# flappy_bench.py
+# Benchmark suite for the per-frame hot path of the game, headless and (under an X display) through tkinter
+# ===================  IMPORTS  ===================+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+from flappy_profiler import percentile
+from flappy_replay import Replay, save_replay
+from flappy_world import PIPE_WIDTH, PIPE_SEPARATION_Y, GameWorld, PipePair
+
+try:
+    import flappy_ghosts
+except ImportError:  # The ghost scenarios need numpy
+    flappy_ghosts = None
+
+
+# =================  BENCH CONSTANTS  =================+
+# Top of the gap used for every pipe pair of the fixed pipe count scenarios
+_BENCH_GAP_TOP = 260
+# Spawn timer that keeps the world from generating pipe pairs itself in fixed pipe count scenarios
+_NO_SPAWN = 10 ** 9
+# Number of recorded sessions raced against in the ghost scenarios (the game races against at most 256 ghosts)
+_BENCH_GHOSTS = 256
+
+
+# ==================  CLASS CODE  ==================+
+class _AllocationMeter:
+    """
+    This private class measures the memory allocated by the measured code of every frame with tracemalloc. A frame
+    counts the peak of the traced memory above its level at the start of the frame, so memory allocated and freed
+    within the frame is counted too and a frame never counts less than zero. Tracing slows the measured code down,
+    so a scenario is run once to be timed and once more to be measured by a meter
+    """
+
+    def __init__(self):
+        """
+        Constructor function of the _AllocationMeter class
+        """
+        self.frames = 0
+        self.total_bytes = 0
+        self.max_bytes = 0
+        self._start = 0
+
+    def begin(self):
+        """
+        Public method which starts measuring a frame (tracemalloc must be tracing)
+        """
+        self._start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def end(self):
+        """
+        Public method which finishes measuring a frame
+        """
+        allocated = tracemalloc.get_traced_memory()[1] - self._start
+        self.frames += 1
+        self.total_bytes += allocated
+        self.max_bytes = max(self.max_bytes, allocated)
+
+    def summary(self):
+        """
+        Public method which summarises the measured frames
+        :return: a dictionary with the mean and the largest number of bytes allocated by a frame
+        """
+        return {"alloc_bytes_per_frame": self.total_bytes / max(1, self.frames), "alloc_max_bytes": self.max_bytes}
+
+
+# ================  FUNCTION CODE  =================+
+def _autopilot(world, margin=35):
+    """
+    This private function keeps the bird inside the next gap (so that scenarios are not cut short by a collision)
+    :param world: the GameWorld of the scenario
+    :param margin: height above the bottom of the gap below which the bird jumps
+    :return: a boolean indicating whether the bird should jump
+    """
+    pipe = world.next_pipe()
+    target_y = (pipe.gap_bottom if pipe else _BENCH_GAP_TOP + PIPE_SEPARATION_Y) - margin
+    return world.bird_y > target_y and world.bird_y_speed > 0
+
+
+def _ghost_replays(n_ghosts, n_frames):
+    """
+    This private function records the sessions raced against in the ghost scenarios. The ghosts fly the first
+    course with different margins of the autopilot, so they stay on the screen at different heights
+    :param n_ghosts: number of sessions to record
+    :param n_frames: number of frames of every session
+    :return: a list of Replay objects
+    """
+    replays = []
+    for index in range(n_ghosts):
+        world = GameWorld(seed=0)
+        margin = 30 + index % 16
+        while world.frame < n_frames and not world.step(_autopilot(world, margin)):
+            pass
+        replays.append(Replay.from_world(world))
+    return replays
+
+
+def _fix_pipe_count(world, n_pipes):
+    """
+    This private function keeps exactly n_pipes pipe pairs (with the same gap) spread over the screen. Only the
+    spawn timer is pushed back (it is reset with the world), so the scenarios sharing the world afterwards keep the
+    regular pipe spawning
+    :param world: the GameWorld of the scenario
+    :param n_pipes: number of pipe pairs to keep on the screen
+    """
+    track = world.track
+    # Only push the timer back when it runs low (its set-up cost would otherwise show up in every frame)
+    if track.spawn_timer <= 1:
+        track.spawn_timer = _NO_SPAWN
+    spacing = (world.window_width + PIPE_WIDTH) / n_pipes
+    if not track.pipes:
+        for index in reversed(range(n_pipes)):
+            track.pipes.append(PipePair(world.window_width - index * spacing, _BENCH_GAP_TOP,
+                                        _BENCH_GAP_TOP + PIPE_SEPARATION_Y))
+    while len(track.pipes) < n_pipes:
+        x = max(world.window_width, track.pipes[-1].x + spacing) if track.pipes else world.window_width
+        track.pipes.append(PipePair(x, _BENCH_GAP_TOP, _BENCH_GAP_TOP + PIPE_SEPARATION_Y))
+
+
+def _summarise(name, frame_times, phase_times):
+    """
+    This private function summarises the frame times of a scenario
+    :param name: name of the scenario
+    :param frame_times: array of the duration of every frame in seconds
+    :param phase_times: dictionary mapping phase names to their total duration in seconds
+    :return: a dictionary of summary statistics (times in milliseconds)
+    """
+    frames = len(frame_times)
+    ordered = sorted(frame_times)
+    return {
+        "scenario": name,
+        "frames": frames,
+        "mean_ms": sum(frame_times) / frames * 1000,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "phases_mean_ms": {phase: total / frames * 1000 for phase, total in phase_times.items()},
+    }
+
+
+def _measure(bench, *args):
+    """
+    This private function runs a scenario twice: once to time it, and once more with tracemalloc tracing to measure
+    the memory allocated by its measured code (not by the scenario's own set-up, such as _fix_pipe_count)
+    :param bench: the scenario function (taking a meter keyword argument)
+    :param args: the arguments of the scenario function
+    :return: the summary of the timed run, with the allocations of the traced run
+    """
+    summary = bench(*args)
+    meter = _AllocationMeter()
+    tracemalloc.start()
+    try:
+        bench(*args, meter=meter)
+    finally:
+        tracemalloc.stop()
+    summary.update(meter.summary())
+    return summary
+
+
+def bench_world_frames(name, n_frames, n_pipes=None, meter=None):
+    """
+    This function times every phase of GameWorld.step (the headless model of the frame loop)
+    :param name: name of the scenario
+    :param n_frames: number of frames to simulate
+    :param n_pipes: number of pipe pairs kept on the screen (the regular pipe spawning if None)
+    :param meter: _AllocationMeter measuring every frame (None to only time the frames)
+    :return: the summary of the scenario
+    """
+    world = GameWorld(seed=0)
+    track = world.track
+    phases = {"spawn_pipes": 0.0, "detect_overlaps": 0.0, "bird_fall": 0.0, "move_pipes": 0.0}
+    # Pre-allocated so that recording the frame times does not count as an allocation of the frame loop
+    frame_times = array("d", bytes(8 * n_frames))
+    timer = time.perf_counter
+    for frame in range(n_frames):
+        if n_pipes is not None:
+            _fix_pipe_count(world, n_pipes)
+        if _autopilot(world):
+            world.jump()
+        # The phases below mirror GameWorld.step
+        if meter:
+            meter.begin()
+        start = timer()
+        track.spawn()
+        after_spawn = timer()
+        collision = world._detect_overlaps()
+        after_overlaps = timer()
+        world._bird_fall()
+        after_fall = timer()
+        track.move()
+        end = timer()
+        if meter:
+            meter.end()
+        world.frame += 1
+        phases["spawn_pipes"] += after_spawn - start
+        phases["detect_overlaps"] += after_overlaps - after_spawn
+        phases["bird_fall"] += after_fall - after_overlaps
+        phases["move_pipes"] += end - after_fall
+        frame_times[frame] = end - start
+        if collision:
+            # Keep the scenario going from the start of a new session
+            world.reset(world.seed)
+    return _summarise(name, frame_times, phases)
+
+
+def bench_world_restarts(name, n_restarts, meter=None):
+    """
+    This function times restarting a headless game session
+    :param name: name of the scenario
+    :param n_restarts: number of restarts to time
+    :param meter: _AllocationMeter measuring every restart (None to only time the restarts)
+    :return: the summary of the scenario
+    """
+    world = GameWorld(seed=0)
+    restart_times = array("d", bytes(8 * n_restarts))
+    timer = time.perf_counter
+    for restart in range(n_restarts):
+        for _ in range(200):
+            world.step(_autopilot(world))
+        if meter:
+            meter.begin()
+        start = timer()
+        world.reset(world.seed)
+        restart_times[restart] = timer() - start
+        if meter:
+            meter.end()
+    return _summarise(name, restart_times, {"reset": sum(restart_times)})
+
+
+def bench_world_ghosts(name, n_frames, replays, meter=None):
+    """
+    This function times GhostRace.step, which moves every ghost of a race by one frame
+    :param name: name of the scenario
+    :param n_frames: number of frames to simulate
+    :param replays: list of the Replay objects raced against
+    :param meter: _AllocationMeter measuring every frame (None to only time the frames)
+    :return: the summary of the scenario
+    """
+    race = flappy_ghosts.GhostRace(replays)
+    frame_times = array("d", bytes(8 * n_frames))
+    timer = time.perf_counter
+    for frame in range(n_frames):
+        if meter:
+            meter.begin()
+        start = timer()
+        over = race.step()
+        frame_times[frame] = timer() - start
+        if meter:
+            meter.end()
+        if over:
+            race.reset()
+    return _summarise(name, frame_times, {"ghost_step": sum(frame_times)})
+
+
+def bench_tk_frames(app, name, n_frames, n_pipes=None, meter=None):
+    """
+    This function times every phase of MainApplication._main on a real Tk canvas
+    :param app: a MainApplication whose game layout has been initialised (with or without ghosts)
+    :param name: name of the scenario
+    :param n_frames: number of frames to draw
+    :param n_pipes: number of pipe pairs kept on the screen (the regular pipe spawning if None)
+    :param meter: _AllocationMeter measuring every frame (None to only time the frames)
+    :return: the summary of the scenario
+    """
+    world = app._world
+    race = app._ghost_race
+    phases = {"world_step": 0.0, "pipe_generator": 0.0, "overlap_detection": 0.0, "player_fall": 0.0,
+              "move_pipe": 0.0, "move_ghosts": 0.0, "redraw": 0.0}
+    # Pre-allocated so that recording the frame times does not count as an allocation of the frame loop
+    frame_times = array("d", bytes(8 * n_frames))
+    timer = time.perf_counter
+    for frame in range(n_frames):
+        if n_pipes is not None:
+            _fix_pipe_count(world, n_pipes)
+        # The phases below mirror MainApplication._main (with exactly one world step per frame)
+        if meter:
+            meter.begin()
+        start = timer()
+        if race:
+            race.step()
+        world.step(_autopilot(world))
+        after_step = timer()
+        app._pipe.pipe_generator()
+        after_generator = timer()
+        collision = app._overlap_detection()
+        after_overlaps = timer()
+        app._player.player_fall()
+        after_fall = timer()
+        app._pipe.move_pipe()
+        after_move = timer()
+        if race:
+            app._ghosts.move_ghosts()
+        after_ghosts = timer()
+        app.root.update_idletasks()
+        end = timer()
+        if meter:
+            meter.end()
+        phases["world_step"] += after_step - start
+        phases["pipe_generator"] += after_generator - after_step
+        phases["overlap_detection"] += after_overlaps - after_generator
+        phases["player_fall"] += after_fall - after_overlaps
+        phases["move_pipe"] += after_move - after_fall
+        phases["move_ghosts"] += after_ghosts - after_move
+        phases["redraw"] += end - after_ghosts
+        frame_times[frame] = end - start
+        if collision:
+            # Keep the scenario going from the start of a new session
+            app._restart_game()
+    return _summarise(name, frame_times, phases)
+
+
+def bench_tk_restarts(app, name, n_restarts, meter=None):
+    """
+    This function times MainApplication._restart_game (including the redraw of the canvas)
+    :param app: a MainApplication whose game layout has been initialised
+    :param name: name of the scenario
+    :param n_restarts: number of restarts to time
+    :param meter: _AllocationMeter measuring every restart (None to only time the restarts)
+    :return: the summary of the scenario
+    """
+    restart_times = array("d", bytes(8 * n_restarts))
+    timer = time.perf_counter
+    for restart in range(n_restarts):
+        for _ in range(200):
+            app._world.step(_autopilot(app._world))
+        app._game_over_menu()
+        if meter:
+            meter.begin()
+        start = timer()
+        app._restart_game()
+        app.root.update_idletasks()
+        restart_times[restart] = timer() - start
+        if meter:
+            meter.end()
+    return _summarise(name, restart_times, {"restart_game": sum(restart_times)})
+
+
+def bench_tk_startup(name, n_startups, meter=None):
+    """
+    This function times the startup of the game window up to its first drawn frame, including the pre-rotation of
+    the player sprites while the intro menu is idle (with warm asset caches after the first startup, as the decoded
+    sprites and their variants are shared within the process, and only the Tk images are created again)
+    :param name: name of the scenario
+    :param n_startups: number of startups to time
+    :param meter: _AllocationMeter measuring every startup (None to only time the startups)
+    :return: the summary of the scenario
+    """
+    import flappyBird_v1
+    startup_times = array("d", bytes(8 * n_startups))
+    timer = time.perf_counter
+    for startup in range(n_startups):
+        if meter:
+            meter.begin()
+        start = timer()
+        app = flappyBird_v1.MainApplication()
+        app._initialise_game_layout()
+        app.root.update_idletasks()
+        startup_times[startup] = timer() - start
+        if meter:
+            meter.end()
+        app.root.destroy()
+    return _summarise(name, startup_times, {"startup": sum(startup_times)})
+
+
+def run_suite(n_frames, n_restarts, use_tk):
+    """
+    This function runs every benchmark scenario
+    :param n_frames: number of frames of each frame loop scenario (long-session scenarios run 10 times as many)
+    :param n_restarts: number of restarts of each restart scenario
+    :param use_tk: whether to also run the scenarios through tkinter (requires an X display)
+    :return: a list of scenario summaries
+    """
+    results = []
+    for n_pipes in (1, 10, 100):
+        results.append(_measure(bench_world_frames, "world/pipes={}".format(n_pipes), n_frames, n_pipes))
+    results.append(_measure(bench_world_frames, "world/long_session", n_frames * 10))
+    results.append(_measure(bench_world_restarts, "world/restart", n_restarts))
+    ghost_replays = _ghost_replays(_BENCH_GHOSTS, n_frames) if flappy_ghosts else None
+    if ghost_replays:
+        results.append(_measure(bench_world_ghosts, "world/ghosts={}".format(_BENCH_GHOSTS), n_frames, ghost_replays))
+    if use_tk:
+        # Import tkinter (through the game module) only when a display is going to be used
+        import flappyBird_v1
+        results.append(_measure(bench_tk_startup, "tk/startup", max(1, n_restarts // 20)))
+        app = flappyBird_v1.MainApplication()
+        app._initialise_game_layout()
+        app._NEW_GAME = False
+        for n_pipes in (1, 10, 100):
+            results.append(_measure(bench_tk_frames, app, "tk/pipes={}".format(n_pipes), n_frames, n_pipes))
+            app._restart_game()
+        results.append(_measure(bench_tk_frames, app, "tk/long_session", n_frames * 10))
+        results.append(_measure(bench_tk_restarts, app, "tk/restart", n_restarts))
+        app.root.destroy()
+        if ghost_replays:
+            # Race against the recorded sessions the way the game does, loading them from a replay file
+            with tempfile.TemporaryDirectory() as ghost_directory:
+                ghost_path = os.path.join(ghost_directory, "ghosts.flpr")
+                for replay in ghost_replays:
+                    save_replay(replay, ghost_path)
+                app = flappyBird_v1.MainApplication(ghost_paths=[ghost_path])
+            app._initialise_game_layout()
+            app._NEW_GAME = False
+            results.append(_measure(bench_tk_frames, app, "tk/ghosts={}".format(_BENCH_GHOSTS), n_frames))
+            app.root.destroy()
+    return results
+
+
+def compare(results, baseline):
+    """
+    This function prints the change of the mean and p99 frame times relative to a baseline run
+    :param results: list of scenario summaries of this run
+    :param baseline: list of scenario summaries of the baseline run
+    """
+    baseline_by_name = {result["scenario"]: result for result in baseline}
+    for result in results:
+        previous = baseline_by_name.get(result["scenario"])
+        if not previous:
+            continue
+        print("{:<22} mean {:+7.1%}  p99 {:+7.1%}".format(
+            result["scenario"], result["mean_ms"] / previous["mean_ms"] - 1, result["p99_ms"] / previous["p99_ms"] - 1))
+
+
+def main(argv=None):
+    """
+    This function runs the benchmark suite from the command line and prints (or saves) its JSON results
+    :param argv: list of command-line arguments (sys.argv if None)
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the FloppyBird frame loop.")
+    parser.add_argument("--frames", type=int, default=2000, help="frames per scenario (long sessions run 10x)")
+    parser.add_argument("--restarts", type=int, default=200, help="restarts per restart scenario")
+    parser.add_argument("--tk", choices=("auto", "yes", "no"), default="auto",
+                        help="run the tkinter scenarios (auto: only if $DISPLAY is set, e.g. under xvfb-run)")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of a previous run to compare against")
+    args = parser.parse_args(argv)
+
+    use_tk = args.tk == "yes" or (args.tk == "auto" and bool(os.environ.get("DISPLAY")))
+    results = run_suite(args.frames, args.restarts, use_tk)
+    report = json.dumps({"python": sys.version.split()[0], "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report)
+    else:
+        print(report)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(results, json.load(baseline_file)["results"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
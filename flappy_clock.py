@@ -0,0 +1,62 @@
+# flappy_clock.py
+# Fixed-timestep frame clock which paces the game loop independently of scheduler jitter
+# ===================  IMPORTS  ===================+
+import math
+import time
+
+from flappy_world import FRAME_INTERVAL_MS
+
+
+# ==================  CLASS CODE  ==================+
+class FrameClock:
+    """
+    This class decides how many fixed-length simulation steps are due at every callback of the game loop.
+    The deadline of each step is kept on an absolute perf_counter timeline, so a late callback is made up for
+    by catching up on the missed steps, and an early one does not make the game run faster
+    """
+
+    def __init__(self, step_ms=FRAME_INTERVAL_MS, max_catch_up=5, timer=time.perf_counter):
+        """
+        Constructor function of the FrameClock class
+        :param step_ms: length of a single simulation step in milliseconds
+        :param max_catch_up: maximum number of steps simulated in one callback before the remaining backlog is skipped
+        :param timer: function returning the current time in seconds
+        """
+        self._step = step_ms / 1000
+        self.max_catch_up = max_catch_up
+        self._timer = timer
+        # Time (in seconds on the timer's timeline) at which the next simulation step is due
+        self._next_tick = None
+        # Total number of steps dropped because the game fell too far behind
+        self.skipped_steps = 0
+
+    def start(self):
+        """
+        Public method which makes the first simulation step due immediately
+        """
+        self._next_tick = self._timer()
+        self.skipped_steps = 0
+
+    def advance(self):
+        """
+        Public method which returns the number of simulation steps that are due now and moves the deadline on
+        :return: the number of steps the caller should simulate before drawing the next frame
+        """
+        now = self._timer()
+        if now < self._next_tick:
+            return 0
+        due = int((now - self._next_tick) // self._step) + 1
+        if due > self.max_catch_up:
+            # Too far behind to catch up: simulate what is allowed and drop the rest of the backlog (frame-skip)
+            self.skipped_steps += due - self.max_catch_up
+            self._next_tick = now + self._step
+            return self.max_catch_up
+        self._next_tick += due * self._step
+        return due
+
+    def delay_ms(self):
+        """
+        Public method which returns the number of milliseconds until the next simulation step is due
+        :return: a non-negative integer delay suitable for root.after
+        """
+        return max(0, math.ceil((self._next_tick - self._timer()) * 1000))
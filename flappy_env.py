@@ -0,0 +1,385 @@
+# flappy_env.py
+# Gym-style environment API over the headless game, with a vector wrapper stepping many environments in lockstep
+# ===================  IMPORTS  ===================+
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from flappy_world import WINDOW_WIDTH, WINDOW_HEIGHT, PIPE_SEPARATION_Y, GameWorld
+
+
+# =================  ENV CONSTANTS  =================+
+# Names of the columns of an observation
+OBSERVATION_FIELDS = ("bird_y", "bird_y_speed", "gap_distance", "gap_top", "gap_bottom")
+OBSERVATION_SIZE = len(OBSERVATION_FIELDS)
+
+
+# ==================  CLASS CODE  ==================+
+class FlappyEnv:
+    """
+    This class exposes a single game as an environment with reset(seed) and step(action). An observation holds the
+    bird's y-coordinate and y-speed, the horizontal distance from the bird to the next pipe pair and the top and
+    bottom of its gap. The reward is the number of pipe pairs passed during the step, and an episode is done when
+    the bird hits a pipe or the floor (or after max_frames frames, if given)
+    """
+
+    def __init__(self, window_width=WINDOW_WIDTH, window_height=WINDOW_HEIGHT, max_frames=None, observation=None):
+        """
+        Constructor function of the FlappyEnv class
+        :param window_width: width of the simulated game window
+        :param window_height: height of the simulated game window
+        :param max_frames: optional number of frames after which an episode is stopped
+        :param observation: optional float64 array of OBSERVATION_SIZE values to write the observations into
+                            (e.g. a row of a shared-memory array)
+        """
+        self.max_frames = max_frames
+        self.world = GameWorld(window_width, window_height, seed=0)
+        # The observation buffer returned by reset and step (reused for every step)
+        self.observation = np.zeros(OBSERVATION_SIZE, dtype=np.float64) if observation is None else observation
+        # Gap reported while there is no pipe pair ahead of the bird: centered, just beyond the right edge
+        self._empty_gap_top = (window_height - PIPE_SEPARATION_Y) / 2
+        self._renderer = None
+
+    def reset(self, seed=None):
+        """
+        Public method which starts a new episode
+        :param seed: seed of the pipe course of the episode (a new seed is drawn if None)
+        :return: the first observation (the same array every call, so copy it to keep an observation)
+        """
+        self.world.reset(seed)
+        return self._observe()
+
+    def step(self, action):
+        """
+        Public method which advances the episode by a single frame
+        :param action: a truthy value to make the bird jump at the start of this frame
+        :return: a tuple of (observation, reward, done, info) where info holds the score, the frame and whether the
+                 episode was cut short by max_frames
+        """
+        world = self.world
+        score = world.score
+        collided = world.step(bool(action))
+        truncated = not collided and self.max_frames is not None and world.frame >= self.max_frames
+        info = {"score": world.score, "frame": world.frame, "truncated": truncated}
+        return self._observe(), world.score - score, collided or truncated, info
+
+    def render(self, downscale=1, grayscale=False):
+        """
+        Public method which draws the current frame offscreen
+        :param downscale: integer factor by which the frame is smaller than the game window
+        :param grayscale: whether to render a grayscale frame
+        :return: the NumPy frame buffer of a FrameRenderer (reused for every call)
+        """
+        renderer = self._renderer
+        if renderer is None or renderer.downscale != downscale or renderer.grayscale != grayscale:
+            # Imported here so that environments which are never rendered do not load the sprites
+            from flappy_render import FrameRenderer
+            renderer = self._renderer = FrameRenderer(self.world.window_width, self.world.window_height,
+                                                      downscale, grayscale)
+        return renderer.render(self.world)
+
+    def _observe(self):
+        """
+        This private method writes the current state of the world into the observation buffer
+        :return: the observation buffer
+        """
+        world = self.world
+        observation = self.observation
+        observation[0] = world.bird_y
+        observation[1] = world.bird_y_speed
+        pipe = world.next_pipe()
+        if pipe is None:
+            observation[2] = world.window_width - world.bird_x
+            observation[3] = self._empty_gap_top
+            observation[4] = self._empty_gap_top + PIPE_SEPARATION_Y
+        else:
+            observation[2] = pipe.x - world.bird_x
+            observation[3] = pipe.gap_top
+            observation[4] = pipe.gap_bottom
+        return observation
+
+
+class VectorEnv:
+    """
+    This class steps n_envs environments in lockstep and returns their observations, rewards and done flags as
+    NumPy arrays. An environment whose episode is done is reset straight away (its final score and frame count are
+    kept in the info arrays of that step). With workers > 0 the environments are split over worker processes which
+    read the actions from and write their results straight into arrays in shared memory, so a step only sends one
+    short message to each worker. The results are then copied into arrays owned by this process, so the arrays
+    returned by reset and step never point into the shared memory and stay valid (holding the last results) after
+    close
+    """
+
+    def __init__(self, n_envs, workers=0, window_width=WINDOW_WIDTH, window_height=WINDOW_HEIGHT, max_frames=None):
+        """
+        Constructor function of the VectorEnv class
+        :param n_envs: number of environments
+        :param workers: number of worker processes (0 to step every environment in this process)
+        :param window_width: width of the simulated game windows
+        :param window_height: height of the simulated game windows
+        :param max_frames: optional number of frames after which an episode is stopped
+        """
+        self.n_envs = n_envs
+        self._shared_memory = None
+        self._connections = []
+        self._processes = []
+        self._waiting = False
+        # Views into the shared memory written by the workers (None without workers)
+        self._shared = None
+        if workers:
+            self._shared_memory = shared_memory.SharedMemory(create=True, size=_shared_size(n_envs))
+            self._shared = _shared_arrays(self._shared_memory.buf, n_envs)
+        arrays = {name: np.zeros(shape, dtype=dtype) for name, shape, dtype in _array_layout(n_envs)}
+        # Arrays holding the actions of the next step and the results of the last one
+        self.observations = arrays["observations"]
+        self.actions = arrays["actions"]
+        self.rewards = arrays["rewards"]
+        self.dones = arrays["dones"]
+        # Score and frame of each environment's episode (its final values where dones is set)
+        self.scores = arrays["scores"]
+        self.frames = arrays["frames"]
+        if workers:
+            context = multiprocessing.get_context()
+            bounds = [n_envs * worker // min(workers, n_envs) for worker in range(min(workers, n_envs) + 1)]
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                parent, child = context.Pipe()
+                process = context.Process(target=_worker, daemon=True,
+                                          args=(child, self._shared_memory.name, n_envs, start, stop, window_width,
+                                                window_height, max_frames))
+                process.start()
+                child.close()
+                self._connections.append(parent)
+                self._processes.append(process)
+            self._envs = None
+        else:
+            self._envs = _Envs(arrays, 0, n_envs, window_width, window_height, max_frames)
+
+    def reset(self, seed=None):
+        """
+        Public method which starts a new episode in every environment
+        :param seed: base seed of the pipe courses (environment i plays seed + i, then seed + i + n_envs, ...),
+                     or None to draw new seeds
+        :return: the (n_envs, OBSERVATION_SIZE) observation array (the same array every call)
+        """
+        if self._envs is not None:
+            self._envs.reset(seed)
+        else:
+            for connection in self._connections:
+                connection.send(("reset", seed))
+            self._wait()
+            self._collect()
+        return self.observations
+
+    def step_async(self, actions):
+        """
+        Public method which starts a step of every environment (the workers run it while this process carries on)
+        :param actions: array-like of n_envs jump decisions
+        """
+        self.actions[:] = actions
+        if self._envs is not None:
+            self._envs.step()
+        else:
+            self._shared["actions"][:] = self.actions
+            for connection in self._connections:
+                connection.send(("step", None))
+            self._waiting = True
+
+    def step_wait(self):
+        """
+        Public method which waits for the step started by step_async
+        :return: a tuple of the (observations, rewards, dones, info) arrays, where info maps "score" and "frame"
+                 to arrays (the same arrays every call)
+        """
+        if self._waiting:
+            self._wait()
+            self._waiting = False
+            self._collect()
+        return self.observations, self.rewards, self.dones, {"score": self.scores, "frame": self.frames}
+
+    def step(self, actions):
+        """
+        Public method which steps every environment by a single frame
+        :param actions: array-like of n_envs jump decisions
+        :return: a tuple of the (observations, rewards, dones, info) arrays (see step_wait)
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        """
+        Public method which stops the worker processes and releases the shared memory (the arrays returned by
+        reset and step are owned by this process, so they keep the results of the last step)
+        """
+        if self._waiting:
+            self._wait()
+            self._waiting = False
+        for connection in self._connections:
+            connection.send(("close", None))
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+        if self._shared_memory is not None:
+            # Drop the views into the shared memory before it is closed
+            self._shared = None
+            self._shared_memory.close()
+            self._shared_memory.unlink()
+            self._shared_memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _collect(self):
+        """
+        This private method copies the results written by the workers from the shared memory into the arrays of
+        the vector
+        """
+        shared = self._shared
+        for name in ("observations", "rewards", "dones", "scores", "frames"):
+            np.copyto(getattr(self, name), shared[name])
+
+    def _wait(self):
+        """
+        This private method waits until every worker has finished its command
+        """
+        for connection in self._connections:
+            connection.recv()
+
+
+class _Envs:
+    """
+    This private class steps a contiguous slice of the environments of a VectorEnv, writing their results into the
+    (possibly shared) arrays of the vector
+    """
+
+    def __init__(self, arrays, start, stop, window_width, window_height, max_frames):
+        """
+        Constructor function of the _Envs class
+        :param arrays: dictionary of the arrays of the VectorEnv
+        :param start: index of the first environment of the slice
+        :param stop: index after the last environment of the slice
+        :param window_width: width of the simulated game windows
+        :param window_height: height of the simulated game windows
+        :param max_frames: optional number of frames after which an episode is stopped
+        """
+        self.start = start
+        self.stop = stop
+        self._arrays = arrays
+        self._n_envs = len(arrays["actions"])
+        # Every environment writes its observations straight into its row of the observation array
+        self._envs = [FlappyEnv(window_width, window_height, max_frames, arrays["observations"][index])
+                      for index in range(start, stop)]
+        # Seed of the next episode of each environment (None to draw new seeds)
+        self._next_seeds = [None] * len(self._envs)
+
+    def reset(self, seed):
+        """
+        Public method which starts a new episode in every environment of the slice
+        :param seed: base seed of the pipe courses of the VectorEnv (or None)
+        """
+        arrays = self._arrays
+        for offset, env in enumerate(self._envs):
+            index = self.start + offset
+            env_seed = None if seed is None else seed + index
+            env.reset(env_seed)
+            self._next_seeds[offset] = None if seed is None else env_seed + self._n_envs
+            arrays["rewards"][index] = 0
+            arrays["dones"][index] = False
+            arrays["scores"][index] = 0
+            arrays["frames"][index] = 0
+
+    def step(self):
+        """
+        Public method which steps every environment of the slice, resetting the environments whose episode is done
+        """
+        arrays = self._arrays
+        actions = arrays["actions"]
+        rewards = arrays["rewards"]
+        dones = arrays["dones"]
+        scores = arrays["scores"]
+        frames = arrays["frames"]
+        for offset, env in enumerate(self._envs):
+            index = self.start + offset
+            _, reward, done, info = env.step(actions[index])
+            rewards[index] = reward
+            dones[index] = done
+            scores[index] = info["score"]
+            frames[index] = info["frame"]
+            if done:
+                seed = self._next_seeds[offset]
+                env.reset(seed)
+                if seed is not None:
+                    self._next_seeds[offset] = seed + self._n_envs
+
+
+# ================  FUNCTION CODE  =================+
+def _array_layout(n_envs):
+    """
+    This private function lists the arrays shared between a VectorEnv and its workers
+    :param n_envs: number of environments
+    :return: a list of (name, shape, dtype) tuples
+    """
+    return [("observations", (n_envs, OBSERVATION_SIZE), np.float64), ("rewards", (n_envs,), np.float64),
+            ("scores", (n_envs,), np.int64), ("frames", (n_envs,), np.int64), ("actions", (n_envs,), np.bool_),
+            ("dones", (n_envs,), np.bool_)]
+
+
+def _shared_size(n_envs):
+    """
+    This private function returns the number of bytes of shared memory needed by the arrays of n_envs environments
+    :param n_envs: number of environments
+    :return: the size in bytes
+    """
+    return sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in _array_layout(n_envs))
+
+
+def _shared_arrays(buffer, n_envs):
+    """
+    This private function lays out the arrays of n_envs environments one after the other in a shared buffer
+    (the 8-byte arrays come first, so every array is aligned)
+    :param buffer: the buffer of a SharedMemory block of at least _shared_size(n_envs) bytes
+    :param n_envs: number of environments
+    :return: a dictionary mapping array names to NumPy views into the buffer
+    """
+    arrays = {}
+    offset = 0
+    for name, shape, dtype in _array_layout(n_envs):
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        offset += arrays[name].nbytes
+    return arrays
+
+
+def _worker(connection, shared_memory_name, n_envs, start, stop, window_width, window_height, max_frames):
+    """
+    This private function runs a slice of the environments of a VectorEnv in a worker process
+    :param connection: the worker's end of the pipe to the VectorEnv
+    :param shared_memory_name: name of the SharedMemory block holding the arrays of the VectorEnv
+    :param n_envs: number of environments of the VectorEnv
+    :param start: index of the first environment of the slice
+    :param stop: index after the last environment of the slice
+    :param window_width: width of the simulated game windows
+    :param window_height: height of the simulated game windows
+    :param max_frames: optional number of frames after which an episode is stopped
+    """
+    block = shared_memory.SharedMemory(name=shared_memory_name)
+    envs = None
+    try:
+        envs = _Envs(_shared_arrays(block.buf, n_envs), start, stop, window_width, window_height, max_frames)
+        while True:
+            command, argument = connection.recv()
+            if command == "step":
+                envs.step()
+            elif command == "reset":
+                envs.reset(argument)
+            else:
+                break
+            connection.send(True)
+    finally:
+        # Drop the views into the shared memory before it is closed
+        del envs
+        block.close()
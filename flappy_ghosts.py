@@ -0,0 +1,119 @@
+# flappy_ghosts.py
+# Ghost racing: plays many recorded sessions of one pipe course side by side as a single vectorized population
+# ===================  IMPORTS  ===================+
+import logging
+from collections import Counter
+
+import numpy as np
+
+from flappy_batch import BatchWorld
+from flappy_replay import ReplayError, iter_replay_paths, iter_replays, physics_match
+from flappy_world import WINDOW_WIDTH, WINDOW_HEIGHT
+
+
+# =================  GHOST CONSTANTS  =================+
+# Logger reporting the replay files which could not be loaded
+_LOGGER = logging.getLogger(__name__)
+
+
+# ==================  CLASS CODE  ==================+
+class GhostRace:
+    """
+    This class replays the jump frames of many recorded sessions of the same pipe course at once. The ghosts are the
+    birds of a BatchWorld, so the positions of every ghost are computed by one vectorized step per frame, and the
+    jumps of a frame are looked up in a frame-sorted array of all recorded jumps
+    """
+
+    def __init__(self, replays, window_width=WINDOW_WIDTH, window_height=WINDOW_HEIGHT):
+        """
+        Constructor function of the GhostRace class
+        :param replays: non-empty list of Replay objects sharing one seed
+        :param window_width: width of the simulated game window
+        :param window_height: height of the simulated game window
+        """
+        seeds = {replay.seed for replay in replays}
+        if len(seeds) != 1:
+            raise ValueError("ghosts must share the same pipe course (seed)")
+        self.seed = seeds.pop()
+        self.replays = replays
+        self.world = BatchWorld(len(replays), window_width, window_height, seed=self.seed)
+        # Every recorded jump as (frame, ghost) pairs, sorted by frame
+        frames = np.concatenate([np.asarray(replay.jump_frames, dtype=np.int64) for replay in replays])
+        ghosts = np.concatenate([np.full(len(replay.jump_frames), index, dtype=np.int64)
+                                 for index, replay in enumerate(replays)])
+        order = np.argsort(frames, kind="stable")
+        self._jump_frames = frames[order]
+        self._jump_ghosts = ghosts[order]
+        # Pre-allocated array of the ghosts jumping in the current frame
+        self._jumps = np.zeros(len(replays), dtype=bool)
+        self.reset()
+
+    @property
+    def n_ghosts(self):
+        """
+        Public property which returns the number of ghosts in the race
+        """
+        return self.world.n_birds
+
+    def reset(self):
+        """
+        Public method which puts every ghost back at the start of the course
+        """
+        self.world.reset(self.seed)
+        # Index of the first recorded jump which has not been replayed yet
+        self._cursor = 0
+
+    def seek(self, frame):
+        """
+        Public method which brings every ghost to a frame of the race (e.g. after the player's session was rewound)
+        :param frame: the frame index to reach
+        """
+        if frame < self.world.frame:
+            self.reset()
+        while self.world.frame < frame and not self.step():
+            pass
+
+    def step(self):
+        """
+        Public method which advances every ghost by a single frame
+        :return: a boolean indicating whether every ghost has collided
+        """
+        world = self.world
+        if not world.alive.any():
+            return True
+        cursor = self._cursor
+        end = int(np.searchsorted(self._jump_frames, world.frame, side="right"))
+        jumps = self._jumps
+        if end > cursor:
+            jumps[self._jump_ghosts[cursor:end]] = True
+        self._cursor = end
+        over = world.step(jumps)
+        if end > cursor:
+            jumps.fill(False)
+        return over
+
+
+# ================  FUNCTION CODE  =================+
+def load_ghost_replays(paths, seed=None, limit=None):
+    """
+    This function loads the recorded sessions of one pipe course to race against (files which cannot be read, such
+    as missing, unreadable, truncated or corrupt ones, are reported and skipped)
+    :param paths: iterable of replay files and directories
+    :param seed: seed of the course (the seed with the most recorded sessions if None)
+    :param limit: largest number of sessions to load (the best scoring ones are kept)
+    :return: a tuple of the seed and the list of Replay objects recorded on it (with the current physics)
+    """
+    replays = []
+    for path in iter_replay_paths(paths):
+        try:
+            for replay in iter_replays(path):
+                if physics_match(replay):
+                    replays.append(replay)
+        except (ReplayError, OSError) as error:
+            # Skip the rest of the file (replays are appended, so an interrupted save can leave a truncated record)
+            _LOGGER.warning("skipped ghost replays in %s: %s", path, error)
+    if seed is None and replays:
+        seed = Counter(replay.seed for replay in replays).most_common(1)[0][0]
+    replays = [replay for replay in replays if replay.seed == seed]
+    replays.sort(key=lambda replay: -replay.score)
+    return seed, replays[:limit]
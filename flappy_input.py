@@ -0,0 +1,145 @@
+# flappy_input.py
+# Frame-stamped input queue which applies player inputs at a fixed point of the frame and measures their latency
+# ===================  IMPORTS  ===================+
+import time
+from array import array
+from collections import deque
+
+from flappy_profiler import nearest_rank
+
+
+# ==================  CLASS CODE  ==================+
+class LatencyHistogram:
+    """
+    This class counts latencies in fixed-width millisecond buckets (with a last bucket for everything beyond the
+    range), so recording a latency never allocates and percentiles are read straight from the counts
+    """
+
+    def __init__(self, bucket_ms=0.5, max_ms=100):
+        """
+        Constructor function of the LatencyHistogram class
+        :param bucket_ms: width of a bucket in milliseconds
+        :param max_ms: upper end of the last regular bucket (longer latencies go to the overflow bucket)
+        """
+        self.bucket_ms = bucket_ms
+        self.max_ms = max_ms
+        self._n_buckets = int(round(max_ms / bucket_ms))
+        self.reset()
+
+    def reset(self):
+        """
+        Public method which discards every recorded latency
+        """
+        self._counts = array("l", bytes(array("l").itemsize * (self._n_buckets + 1)))
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_seen_ms = 0.0
+
+    def record(self, milliseconds):
+        """
+        Public method which records a latency
+        :param milliseconds: the latency in milliseconds
+        """
+        self._counts[min(self._n_buckets, int(milliseconds / self.bucket_ms))] += 1
+        self.count += 1
+        self.total_ms += milliseconds
+        if milliseconds > self.max_seen_ms:
+            self.max_seen_ms = milliseconds
+
+    def percentile(self, fraction):
+        """
+        Public method which returns the upper edge of the bucket holding a percentile of the recorded latencies
+        :param fraction: the percentile as a fraction between 0 and 1
+        :return: the latency in milliseconds (0 if nothing was recorded)
+        """
+        if not self.count:
+            return 0.0
+        rank = nearest_rank(self.count, fraction)
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self.max_seen_ms, (bucket + 1) * self.bucket_ms)
+        return self.max_seen_ms
+
+    def summary(self):
+        """
+        Public method which summarises the recorded latencies
+        :return: a dictionary with the count, mean, percentiles and maximum (in milliseconds) and the non-empty
+                 buckets keyed by their lower edge ("100+" for the overflow bucket)
+        """
+        buckets = {}
+        for bucket, count in enumerate(self._counts):
+            if count:
+                label = "{}+".format(self.max_ms) if bucket == self._n_buckets else "{:g}".format(bucket * self.bucket_ms)
+                buckets[label] = count
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p90_ms": self.percentile(0.90),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_seen_ms,
+            "buckets": buckets,
+        }
+
+
+class InputQueue:
+    """
+    This class stamps every jump input with a high-resolution time when its event arrives and queues it until the
+    game loop consumes the queue at the start of a frame, before the world is stepped. It measures how long an
+    input waited for its frame and how long it took until the bird's jump was drawn (input-to-first-motion)
+    """
+
+    def __init__(self, timer=time.perf_counter):
+        """
+        Constructor function of the InputQueue class
+        :param timer: function returning the current time in seconds
+        """
+        self._timer = timer
+        # Time stamps of the inputs which have not been consumed by a frame yet
+        self._pending = deque()
+        # Time stamps of the inputs consumed by the current frame, waiting for their motion to be drawn
+        self._in_flight = deque()
+        # Latency histograms from the arrival of an input to the frame consuming it and to its first drawn motion
+        self.wait_histogram = LatencyHistogram()
+        self.motion_histogram = LatencyHistogram()
+
+    def push(self):
+        """
+        Public method which queues a jump input (called from the Tk event callback)
+        """
+        self._pending.append(self._timer())
+
+    def consume(self):
+        """
+        Public method which takes every queued input (called once per frame, before the world is stepped)
+        :return: a boolean indicating whether the bird should jump in this frame
+        """
+        pending = self._pending
+        if not pending:
+            return False
+        now = self._timer()
+        while pending:
+            stamp = pending.popleft()
+            self.wait_histogram.record((now - stamp) * 1000)
+            self._in_flight.append(stamp)
+        return True
+
+    def motion_drawn(self):
+        """
+        Public method which records the input-to-first-motion latency of the inputs consumed by this frame
+        (called once the bird has been moved on the canvas)
+        """
+        in_flight = self._in_flight
+        if in_flight:
+            now = self._timer()
+            while in_flight:
+                self.motion_histogram.record((now - in_flight.popleft()) * 1000)
+
+    def clear(self):
+        """
+        Public method which drops the queued inputs (e.g. at the end of a game session)
+        """
+        self._pending.clear()
+        self._in_flight.clear()
@@ -0,0 +1,210 @@
+# flappy_profiler.py
+# Opt-in frame profiler which times every phase of the game loop and the lateness of the Tk scheduler
+# ===================  IMPORTS  ===================+
+import csv
+import json
+import math
+import os
+import time
+from array import array
+
+
+# ==================  CLASS CODE  ==================+
+class FrameProfiler:
+    """
+    This class records, for every frame of a game session, the duration of each phase of the game loop, the number
+    of simulation steps it ran and the real interval between two root.after callbacks compared with the requested
+    delay. A callback arriving more than LATE_THRESHOLD_MS after it was due counts as a late frame
+    """
+    # Lateness (in milliseconds) past which a callback counts as a late frame
+    LATE_THRESHOLD_MS = 4
+    # Number of most recent frames summarised by the overlay text
+    HUD_WINDOW = 60
+
+    def __init__(self, phases, timer=time.perf_counter):
+        """
+        Constructor function of the FrameProfiler class
+        :param phases: ordered names of the phases of a frame
+        :param timer: function returning the current time in seconds
+        """
+        self.phases = tuple(phases)
+        self._timer = timer
+        # Dictionary of the latest startup and restart latencies in milliseconds (kept across sessions)
+        self.latencies_ms = {}
+        # Dictionary of named LatencyHistogram objects reported along with the frames (kept across sessions)
+        self.histograms = {}
+        self.reset()
+
+    def reset(self):
+        """
+        Public method which discards the frames recorded so far (at the start of a new session)
+        """
+        # One array per column, so that recording a frame only appends floats to pre-typed buffers
+        self._phase_ms = [array("d") for _ in self.phases]
+        self._total_ms = array("d")
+        self._interval_ms = array("d")
+        self._requested_ms = array("d")
+        self._lateness_ms = array("d")
+        self._steps = array("l")
+        self.late_frames = 0
+        # Time at which the previous callback started and at which the next one was requested
+        self._previous_start = None
+        self._scheduled_at = None
+        self._requested_delay_ms = 0
+        self._frame_start = None
+        self._mark = None
+        self._phase_index = 0
+
+    def record_latency(self, name, milliseconds):
+        """
+        Public method which records a latency of the game outside of the frame loop
+        :param name: name of the latency (e.g. "startup" or "restart")
+        :param milliseconds: the measured latency
+        """
+        self.latencies_ms[name] = milliseconds
+
+    @property
+    def frames(self):
+        """
+        Public property which returns the number of frames recorded in this session
+        """
+        return len(self._total_ms)
+
+    def begin_frame(self):
+        """
+        Public method which starts timing a frame (called at the start of every root.after callback)
+        """
+        now = self._timer()
+        if self._scheduled_at is None:
+            interval = lateness = 0.0
+        else:
+            interval = (now - self._previous_start) * 1000
+            lateness = (now - self._scheduled_at) * 1000 - self._requested_delay_ms
+        self._interval_ms.append(interval)
+        self._requested_ms.append(self._requested_delay_ms)
+        self._lateness_ms.append(lateness)
+        if lateness > self.LATE_THRESHOLD_MS:
+            self.late_frames += 1
+        self._previous_start = self._frame_start = self._mark = now
+        self._phase_index = 0
+
+    def mark(self):
+        """
+        Public method which ends the current phase of the frame (phases are marked in the order they were given)
+        """
+        now = self._timer()
+        self._phase_ms[self._phase_index].append((now - self._mark) * 1000)
+        self._phase_index += 1
+        self._mark = now
+
+    def end_frame(self, steps, requested_delay_ms):
+        """
+        Public method which finishes timing a frame (called just before the next callback is scheduled)
+        :param steps: number of simulation steps run by the frame
+        :param requested_delay_ms: delay requested from root.after for the next callback
+        """
+        now = self._timer()
+        # Phases which were not reached (e.g. after a game over) are recorded as taking no time
+        while self._phase_index < len(self.phases):
+            self._phase_ms[self._phase_index].append(0.0)
+            self._phase_index += 1
+        self._total_ms.append((now - self._frame_start) * 1000)
+        self._steps.append(steps)
+        self._scheduled_at = now
+        self._requested_delay_ms = requested_delay_ms
+
+    def hud_text(self):
+        """
+        Public method which summarises the most recent frames for the on-screen overlay
+        :return: a multi-line string
+        """
+        window = slice(-self.HUD_WINDOW, None)
+        recent_total = sorted(self._total_ms[window]) or [0.0]
+        recent_interval = self._interval_ms[window] or [0.0]
+        lines = ["frame {:.2f} ms  p99 {:.2f} ms".format(sum(recent_total) / len(recent_total),
+                                                         percentile(recent_total, 0.99)),
+                 "interval {:.1f} ms  late {}/{}".format(sum(recent_interval) / len(recent_interval),
+                                                         self.late_frames, self.frames)]
+        for name, values in zip(self.phases, self._phase_ms):
+            recent = values[window] or [0.0]
+            lines.append("{} {:.3f} ms".format(name, sum(recent) / len(recent)))
+        for name, histogram in self.histograms.items():
+            lines.append("{} p50 {:.1f} ms  p99 {:.1f} ms".format(name, histogram.percentile(0.50),
+                                                                   histogram.percentile(0.99)))
+        return "\n".join(lines)
+
+    def summary(self):
+        """
+        Public method which summarises the whole session
+        :return: a dictionary of summary statistics (times in milliseconds)
+        """
+        frames = max(1, self.frames)
+        total = sorted(self._total_ms) or [0.0]
+        intervals = sorted(self._interval_ms[1:]) or [0.0]
+        return {
+            "frames": self.frames,
+            "late_frames": self.late_frames,
+            "frame_mean_ms": sum(total) / frames,
+            "frame_p99_ms": percentile(total, 0.99),
+            "interval_mean_ms": sum(intervals) / len(intervals),
+            "interval_p99_ms": percentile(intervals, 0.99),
+            # Frames which had to simulate more than one step (late callbacks) or none at all (early callbacks)
+            "catch_up_frames": sum(1 for steps in self._steps if steps > 1),
+            "idle_frames": sum(1 for steps in self._steps if steps == 0),
+            "phases_mean_ms": {name: sum(values) / frames for name, values in zip(self.phases, self._phase_ms)},
+            "latencies_ms": dict(self.latencies_ms),
+            "histograms": {name: histogram.summary() for name, histogram in self.histograms.items()},
+        }
+
+    def rows(self):
+        """
+        Public method which returns one dictionary per recorded frame
+        :return: a generator of dictionaries
+        """
+        for frame in range(self.frames):
+            row = {"frame": frame, "interval_ms": self._interval_ms[frame], "requested_ms": self._requested_ms[frame],
+                   "lateness_ms": self._lateness_ms[frame], "steps": self._steps[frame],
+                   "total_ms": self._total_ms[frame]}
+            for name, values in zip(self.phases, self._phase_ms):
+                row[name + "_ms"] = values[frame]
+            yield row
+
+    def export(self, path):
+        """
+        Public method which writes the recorded frames to a JSON or CSV file (chosen by the file extension)
+        :param path: path of the .json or .csv file
+        """
+        if os.path.splitext(path)[1].lower() == ".csv":
+            with open(path, "w", newline="") as csv_file:
+                writer = None
+                for row in self.rows():
+                    if writer is None:
+                        writer = csv.DictWriter(csv_file, fieldnames=list(row))
+                        writer.writeheader()
+                    writer.writerow(row)
+        else:
+            with open(path, "w") as json_file:
+                json.dump({"summary": self.summary(), "frames": list(self.rows())}, json_file, indent=1)
+
+
+# ================  FUNCTION CODE  =================+
+def nearest_rank(count, fraction):
+    """
+    This function returns the nearest rank of a percentile, the smallest rank covering the fraction of the values
+    (the definition shared by every percentile the game reports)
+    :param count: number of values (at least 1)
+    :param fraction: the percentile as a fraction between 0 and 1
+    :return: a rank between 1 and count
+    """
+    # The tolerance absorbs float error (e.g. 0.3 * 10 is slightly above 3)
+    return min(count, max(1, math.ceil(fraction * count - 1e-9)))
+
+
+def percentile(sorted_values, fraction):
+    """
+    This function returns a percentile of already sorted values (nearest-rank)
+    :param sorted_values: non-empty sequence sorted in ascending order
+    :param fraction: the percentile as a fraction between 0 and 1
+    :return: the value at the requested percentile
+    """
+    return sorted_values[nearest_rank(len(sorted_values), fraction) - 1]
@@ -0,0 +1,172 @@
+# flappy_render.py
+# Offscreen renderer which draws the game scene into a reusable NumPy frame buffer without a display
+# ===================  IMPORTS  ===================+
+import numpy as np
+
+import flappy_assets
+from flappy_world import WINDOW_WIDTH, WINDOW_HEIGHT
+
+
+# =================  RENDER CONSTANTS  =================+
+# Weights of the red, green and blue channels in a grayscale pixel (ITU-R BT.601 luma)
+_LUMA = np.array([0.299, 0.587, 0.114])
+# Alpha value from which a sprite pixel is drawn (the few semi-transparent edge pixels are thresholded)
+_ALPHA_THRESHOLD = 128
+
+
+# ==================  CLASS CODE  ==================+
+class FrameRenderer:
+    """
+    This class draws the same scene as the Tk canvas (the background, the pipes and the tilted bird sprite) into
+    a NumPy frame buffer. The buffer is allocated once and returned by every call to render, and only the regions
+    covered by the items of the previous and the current frame are redrawn. Frames can be downscaled by an integer
+    factor and rendered in grayscale, in which case the background and the sprites are prepared at that size once
+    """
+
+    def __init__(self, window_width=WINDOW_WIDTH, window_height=WINDOW_HEIGHT, downscale=1, grayscale=False):
+        """
+        Constructor function of the FrameRenderer class
+        :param window_width: width of the game window
+        :param window_height: height of the game window
+        :param downscale: integer factor by which the frames are smaller than the game window
+        :param grayscale: whether to render (H, W) grayscale frames instead of (H, W, 3) RGB frames
+        """
+        self.window_width = window_width
+        self.window_height = window_height
+        self.downscale = downscale
+        self.grayscale = grayscale
+        self.height = -(-window_height // downscale)
+        self.width = -(-window_width // downscale)
+        # Background of the scene at the output size, used to erase the items of the previous frame
+        self.background = self._prepare(self._image_array(flappy_assets.load_image(flappy_assets.BACKGROUND_SPRITE)))
+        self.background.setflags(write=False)
+        # The frame buffer returned by render (reused for every frame)
+        self.frame = self.background.copy()
+        self._pipe_color = self._prepare(np.array(flappy_assets.PIPE_RGB, dtype=np.uint8).reshape(1, 1, 3))[0, 0]
+        # Private dictionary mapping a tilt to the prepared (pixels, mask) of the bird sprite
+        self._bird_sprites = {}
+        # Boxes (y1, y2, x1, x2) in output pixels covered by the items of the previous frame
+        self._drawn_boxes = []
+
+    def _image_array(self, image):
+        """
+        This private method wraps an RGBAImage as an (H, W, 4) array, downscaled by averaging blocks of pixels
+        :param image: the RGBAImage
+        :return: a uint8 array
+        """
+        pixels = np.frombuffer(image.pixels, dtype=np.uint8).reshape(image.height, image.width, 4)
+        scale = self.downscale
+        if scale == 1:
+            return pixels
+        height = -(-image.height // scale) * scale
+        width = -(-image.width // scale) * scale
+        # Partial blocks at the right and bottom edges are filled up by repeating the edge pixels
+        padded = np.pad(pixels, ((0, height - image.height), (0, width - image.width), (0, 0)), mode="edge")
+        blocks = padded.reshape(height // scale, scale, width // scale, scale, 4).astype(np.float64)
+        return blocks.mean(axis=(1, 3)).round().astype(np.uint8)
+
+    def _prepare(self, pixels):
+        """
+        This private method converts (H, W, 3 or 4) pixels into the output color format
+        :param pixels: a uint8 array whose last axis holds the RGB(A) channels
+        :return: a contiguous uint8 array of shape (H, W, 3), or (H, W) in grayscale mode
+        """
+        rgb = pixels[..., :3]
+        if self.grayscale:
+            return np.ascontiguousarray((rgb @ _LUMA).round().astype(np.uint8))
+        return np.ascontiguousarray(rgb)
+
+    def _bird_sprite(self, tilt):
+        """
+        This private method returns the bird sprite for a tilt, prepared (cropped, downscaled and converted) once
+        :param tilt: the tilt of the sprite in degrees
+        :return: a tuple of (pixels, mask, offset x, offset y) where the offsets place the sprite relative to the
+                 bird's center in output pixels
+        """
+        sprite = self._bird_sprites.get(tilt)
+        if sprite is None:
+            image = flappy_assets.load_image(flappy_assets.BIRD_SPRITE)
+            if tilt:
+                image = flappy_assets.rotate_image(image, tilt)
+            rgba = self._image_array(image)
+            mask = rgba[..., 3] >= _ALPHA_THRESHOLD
+            rows = np.flatnonzero(mask.any(axis=1))
+            columns = np.flatnonzero(mask.any(axis=0))
+            top, bottom, left, right = rows[0], rows[-1] + 1, columns[0], columns[-1] + 1
+            pixels = self._prepare(rgba[top:bottom, left:right])
+            mask = np.ascontiguousarray(mask[top:bottom, left:right])
+            if not self.grayscale:
+                mask = np.ascontiguousarray(np.broadcast_to(mask[..., None], pixels.shape))
+            # The sprite is anchored at its center like the Tk canvas image
+            offset_x = left - rgba.shape[1] / 2
+            offset_y = top - rgba.shape[0] / 2
+            sprite = self._bird_sprites[tilt] = (pixels, mask, offset_x, offset_y)
+        return sprite
+
+    def invalidate(self):
+        """
+        Public method which redraws the whole frame on the next render (e.g. after the buffer was modified)
+        """
+        self.frame[...] = self.background
+        self._drawn_boxes = []
+
+    def render(self, world):
+        """
+        Public method which draws the current state of a GameWorld
+        :param world: the GameWorld to draw
+        :return: the frame buffer (the same array every call, so copy it to keep a frame)
+        """
+        return self.render_state(world.bird_x, world.bird_y, world.bird_y_speed, world.pipes)
+
+    def render_state(self, bird_x, bird_y, bird_y_speed, pipes):
+        """
+        Public method which draws a scene from its raw state
+        :param bird_x: x-coordinate of the center of the bird
+        :param bird_y: y-coordinate of the center of the bird
+        :param bird_y_speed: vertical speed of the bird (which tilts its sprite)
+        :param pipes: iterable of PipePair objects
+        :return: the frame buffer (the same array every call, so copy it to keep a frame)
+        """
+        frame = self.frame
+        background = self.background
+        # Erase the items of the previous frame
+        for y1, y2, x1, x2 in self._drawn_boxes:
+            frame[y1:y2, x1:x2] = background[y1:y2, x1:x2]
+        boxes = []
+        scale = self.downscale
+        for pipe in pipes:
+            for rect in (pipe.top_rect(), pipe.bottom_rect(self.window_height)):
+                box = self._clip(int(rect[1] // scale), int(-(-rect[3] // scale)),
+                                 int(rect[0] // scale), int(-(-rect[2] // scale)))
+                if box:
+                    y1, y2, x1, x2 = box
+                    frame[y1:y2, x1:x2] = self._pipe_color
+                    if scale == 1:
+                        # Draw the 1 pixel black outline of a Tk rectangle
+                        frame[y1:y2, x1] = frame[y1:y2, x2 - 1] = 0
+                        frame[y1, x1:x2] = frame[y2 - 1, x1:x2] = 0
+                    boxes.append(box)
+        pixels, mask, offset_x, offset_y = self._bird_sprite(flappy_assets.bird_tilt(bird_y_speed))
+        left = int(round(bird_x / scale + offset_x))
+        top = int(round(bird_y / scale + offset_y))
+        box = self._clip(top, top + pixels.shape[0], left, left + pixels.shape[1])
+        if box:
+            y1, y2, x1, x2 = box
+            sprite_slice = (slice(y1 - top, y2 - top), slice(x1 - left, x2 - left))
+            np.copyto(frame[y1:y2, x1:x2], pixels[sprite_slice], where=mask[sprite_slice])
+            boxes.append(box)
+        self._drawn_boxes = boxes
+        return frame
+
+    def _clip(self, y1, y2, x1, x2):
+        """
+        This private method clips a box to the frame
+        :return: the clipped (y1, y2, x1, x2) box, or None if it lies outside of the frame
+        """
+        y1 = max(0, y1)
+        x1 = max(0, x1)
+        y2 = min(self.height, y2)
+        x2 = min(self.width, x2)
+        if y1 >= y2 or x1 >= x2:
+            return None
+        return y1, y2, x1, x2
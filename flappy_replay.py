@@ -0,0 +1,261 @@
+# flappy_replay.py
+# Compact binary replays of game sessions and a headless tool which verifies them at full CPU speed
+# ===================  IMPORTS  ===================+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+import flappy_world
+from flappy_world import GameWorld
+
+
+# =================  REPLAY FORMAT  =================+
+# File extension of replay files
+REPLAY_EXTENSION = ".flpr"
+# Magic bytes and version at the start of every replay record (version 2: courses are generated by PipeCourse)
+_MAGIC = b"FLPR"
+_VERSION = 2
+# Physics constants stored in every replay, so that a replay recorded with different rules is detected
+PHYSICS_CONSTANTS = (flappy_world.WINDOW_WIDTH, flappy_world.WINDOW_HEIGHT, flappy_world.FRAME_INTERVAL_MS,
+                     flappy_world.GRAVITY_Y_SPEED, flappy_world.JUMP_Y_SPEED, flappy_world.UPPER_WINDOW_BOUNDARY,
+                     flappy_world.DOWNWARD_ACCELERATION, flappy_world.FLOOR_OFFSET, *flappy_world.BIRD_HITBOX,
+                     flappy_world.PIPE_WIDTH, flappy_world.PIPE_SEPARATION_Y, flappy_world.PIPE_X_SPEED,
+                     flappy_world.PIPE_SPAWN_INTERVAL, flappy_world.PIPE_Y_OFFSET)
+_PHYSICS = struct.Struct("<{}f".format(len(PHYSICS_CONSTANTS)))
+# Header of a replay record: magic, version, seed, packed physics constants, score, number of frames,
+# number of jumps and the byte length of the delta-encoded jump frames which follow the header
+_HEADER = struct.Struct("<4sBQ{}sIIII".format(_PHYSICS.size))
+
+
+# ==================  CLASS CODE  ==================+
+class ReplayError(Exception):
+    """
+    This exception is raised when a replay record is truncated or was not written by this module
+    """
+
+
+class Replay:
+    """
+    This class stores everything needed to play a game session again: the seed of its pipe course, the physics
+    constants it was played with and the frame indices at which the bird jumped, along with its recorded result
+    """
+    __slots__ = ("seed", "jump_frames", "score", "frames", "physics")
+
+    def __init__(self, seed, jump_frames, score, frames, physics=None):
+        """
+        Constructor function of the Replay class
+        :param seed: seed of the session's pipe course
+        :param jump_frames: increasing list of the frame indices at which the bird jumped
+        :param score: recorded final score of the session
+        :param frames: recorded number of frames of the session
+        :param physics: packed physics constants of the session (the current constants if None)
+        """
+        self.seed = seed
+        self.jump_frames = jump_frames
+        self.score = score
+        self.frames = frames
+        self.physics = _PHYSICS.pack(*PHYSICS_CONSTANTS) if physics is None else physics
+
+    @classmethod
+    def from_world(cls, world):
+        """
+        Public method which records the session played by a GameWorld
+        :param world: the GameWorld of the session
+        :return: a new Replay
+        """
+        return cls(world.seed, list(world.jump_frames), world.score, world.frame)
+
+    def to_bytes(self):
+        """
+        Public method which encodes the replay as a binary record
+        :return: the record as bytes
+        """
+        deltas = bytearray()
+        previous = 0
+        for frame in self.jump_frames:
+            _write_varint(deltas, frame - previous)
+            previous = frame
+        header = _HEADER.pack(_MAGIC, _VERSION, self.seed, self.physics, self.score, self.frames,
+                              len(self.jump_frames), len(deltas))
+        return header + deltas
+
+    @classmethod
+    def from_buffer(cls, buffer, offset=0):
+        """
+        Public method which decodes a single binary record
+        :param buffer: a bytes-like object (such as a memory-mapped file) holding the record
+        :param offset: offset of the record within the buffer
+        :return: a tuple of the decoded Replay and the offset just past the record
+        """
+        if len(buffer) - offset < _HEADER.size:
+            raise ReplayError("truncated replay header at offset {}".format(offset))
+        magic, version, seed, physics, score, frames, n_jumps, n_bytes = _HEADER.unpack_from(buffer, offset)
+        if magic != _MAGIC or version != _VERSION:
+            raise ReplayError("not a version {} replay record at offset {}".format(_VERSION, offset))
+        position = offset + _HEADER.size
+        end = position + n_bytes
+        if end > len(buffer):
+            raise ReplayError("truncated replay record at offset {}".format(offset))
+        jump_frames = []
+        frame = 0
+        for _ in range(n_jumps):
+            delta, position = _read_varint(buffer, position, end)
+            frame += delta
+            jump_frames.append(frame)
+        return cls(seed, jump_frames, score, frames, bytes(physics)), end
+
+
+# ================  FUNCTION CODE  =================+
+def _write_varint(out, value):
+    """
+    This private function appends an unsigned integer to a bytearray as a LEB128 variable-length integer
+    :param out: the bytearray to append to
+    :param value: the non-negative integer to encode
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buffer, position, end):
+    """
+    This private function reads a LEB128 variable-length integer
+    :param buffer: the bytes-like object to read from
+    :param position: offset of the first byte of the integer
+    :param end: offset past which the integer must not extend
+    :return: a tuple of the decoded integer and the offset just past it
+    """
+    value = 0
+    shift = 0
+    while position < end:
+        byte = buffer[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+    raise ReplayError("truncated jump frames at offset {}".format(position))
+
+
+def save_replay(replay, path):
+    """
+    This function writes a replay to a file (appending it if the file already holds replays)
+    :param replay: the Replay to write
+    :param path: path of the replay file
+    """
+    with open(path, "ab") as replay_file:
+        replay_file.write(replay.to_bytes())
+
+
+def iter_replays(path):
+    """
+    This function reads every replay record of a file through a memory-mapped view of it
+    :param path: path of a file holding one or more concatenated replay records
+    :return: a generator of Replay objects
+    """
+    with open(path, "rb") as replay_file:
+        if os.fstat(replay_file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(replay_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            offset = 0
+            while offset < len(buffer):
+                replay, offset = Replay.from_buffer(buffer, offset)
+                yield replay
+
+
+def iter_replay_paths(paths):
+    """
+    This function expands replay files and directories (searched recursively) into replay file paths
+    :param paths: iterable of file and directory paths
+    :return: a generator of replay file paths
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, _, file_names in os.walk(path):
+            for file_name in sorted(file_names):
+                if file_name.endswith(REPLAY_EXTENSION):
+                    yield os.path.join(directory, file_name)
+
+
+def play_replay(replay):
+    """
+    This function plays a replay headlessly at full CPU speed
+    :param replay: the Replay to play
+    :return: the GameWorld at the end of the replayed session
+    """
+    world = GameWorld(seed=replay.seed)
+    jump_frames = replay.jump_frames
+    next_jump = 0
+    while world.frame < replay.frames and not world.game_over:
+        jump = next_jump < len(jump_frames) and jump_frames[next_jump] == world.frame
+        if jump:
+            next_jump += 1
+        world.step(jump)
+    return world
+
+
+def physics_match(replay):
+    """
+    This function checks whether a replay was recorded with the current physics constants
+    :param replay: the Replay to check
+    :return: a boolean indicating whether the replay's physics match the current ones
+    """
+    return replay.physics == _PHYSICS.pack(*PHYSICS_CONSTANTS)
+
+
+def verify_replay(replay):
+    """
+    This function checks that a replay reproduces its recorded result with the current physics
+    :param replay: the Replay to verify
+    :return: None if the replay is reproduced, otherwise a string describing the mismatch
+    """
+    if not physics_match(replay):
+        return "recorded with different physics constants"
+    world = play_replay(replay)
+    if world.score != replay.score or world.frame != replay.frames:
+        return "replayed score {} in {} frames, recorded score {} in {} frames".format(
+            world.score, world.frame, replay.score, replay.frames)
+    return None
+
+
+def main(argv=None):
+    """
+    This function verifies every replay in the given files and directories from the command line
+    :param argv: list of command-line arguments (sys.argv if None)
+    :return: the process exit status (1 if any replay fails to verify)
+    """
+    parser = argparse.ArgumentParser(description="Verify FloppyBird replays headlessly.")
+    parser.add_argument("paths", nargs="+", help="replay files or directories of {} files".format(REPLAY_EXTENSION))
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    verified = failed = frames = 0
+    for path in iter_replay_paths(args.paths):
+        try:
+            for index, replay in enumerate(iter_replays(path)):
+                problem = verify_replay(replay)
+                frames += replay.frames
+                if problem is None:
+                    verified += 1
+                else:
+                    failed += 1
+                    if not args.quiet:
+                        print("{}[{}]: {}".format(path, index, problem))
+        except ReplayError as error:
+            failed += 1
+            print("{}: {}".format(path, error))
+    elapsed = time.perf_counter() - start_time
+    print("{} verified, {} failed, {} frames in {:.2f}s ({:.0f} frames/s)".format(
+        verified, failed, frames, elapsed, frames / elapsed if elapsed else 0))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# flappy_scores.py
+# Persistent SQLite leaderboard whose writes are batched on a background thread and whose reads come from memory
+# ===================  IMPORTS  ===================+
+import bisect
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+
+# =================  STORE CONSTANTS  =================+
+# Schema of the score database: one row per player and one row per finished game session
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    score INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    seed INTEGER NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_score ON sessions (score DESC, played_at);
+CREATE INDEX IF NOT EXISTS sessions_by_player ON sessions (player_id, played_at);
+"""
+# Sentinel put on the write queue to stop the writer thread
+_STOP = object()
+# Logger reporting the batches the writer thread fails to commit
+_LOGGER = logging.getLogger(__name__)
+
+
+# ==================  CLASS CODE  ==================+
+class ScoreStore:
+    """
+    This class stores every finished game session in a SQLite database. Sessions recorded by the game are only put
+    on a queue, and a background thread commits them in batches, so the Tk main loop never waits on the disk. The
+    top scores, the best score of every player and a histogram of all scores are loaded once and kept up to date
+    in memory, so the leaderboard and percentile of a score can be read at game over without a query
+    """
+
+    def __init__(self, path, top_size=10, batch_size=256, flush_interval=0.5):
+        """
+        Constructor function of the ScoreStore class
+        :param path: path of the SQLite database file (created if it does not exist)
+        :param top_size: number of scores kept in the in-memory leaderboard
+        :param batch_size: largest number of sessions committed in one transaction
+        :param flush_interval: number of seconds the writer waits for more sessions before committing a batch
+        """
+        self.path = path
+        self.top_size = top_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        # Connection of the calling thread, used for the (rare) queries which are not answered from memory
+        self._connection = _connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._load_cache(self._connection)
+        # Queue of (player, score, frames, seed, played_at) tuples waiting to be written
+        self._queue = queue.Queue()
+        # Number of recorded sessions which could not be committed (their batch was rolled back)
+        self.failed_sessions = 0
+        self._writer = threading.Thread(target=self._write_loop, name="score-writer", daemon=True)
+        self._writer.start()
+
+    def _load_cache(self, connection):
+        """
+        This private method loads the leaderboard, the best score of every player and the score histogram
+        :param connection: the sqlite3 connection of the calling thread
+        """
+        # Sorted list of the best (score, -played_at, player) entries, highest score last
+        self._top = sorted((score, -played_at, name) for score, played_at, name in connection.execute(
+            "SELECT score, played_at, name FROM sessions JOIN players ON players.id = player_id "
+            "ORDER BY score DESC, played_at LIMIT ?", (self.top_size,)))
+        self._best = dict(connection.execute(
+            "SELECT name, MAX(score) FROM sessions JOIN players ON players.id = player_id GROUP BY player_id"))
+        # Sorted list of the distinct scores and the number of sessions which reached each of them
+        histogram = connection.execute("SELECT score, COUNT(*) FROM sessions GROUP BY score ORDER BY score").fetchall()
+        self._scores = [score for score, _ in histogram]
+        self._counts = [count for _, count in histogram]
+        self.sessions = sum(self._counts)
+
+    def record(self, player, score, frames=0, seed=0):
+        """
+        Public method which records a finished game session (the in-memory leaderboard is updated at once and the
+        session is written to the database in the background, or dropped from the leaderboard again if it cannot be)
+        :param player: name of the player
+        :param score: final score of the session
+        :param frames: number of frames the session lasted
+        :param seed: seed of the session's pipe course
+        """
+        played_at = time.time()
+        with self._lock:
+            self._cache_session(player, score, played_at)
+            # Queued under the lock, so every cached session is always either committed or still on the queue
+            self._queue.put((player, score, frames, seed, played_at))
+
+    def _cache_session(self, player, score, played_at):
+        """
+        This private method adds a session to the leaderboard, the best scores and the histogram (with the lock held)
+        :param player: name of the player
+        :param score: final score of the session
+        :param played_at: time at which the session was recorded
+        """
+        bisect.insort(self._top, (score, -played_at, player))
+        if len(self._top) > self.top_size:
+            del self._top[0]
+        if score > self._best.get(player, -1):
+            self._best[player] = score
+        index = bisect.bisect_left(self._scores, score)
+        if index < len(self._scores) and self._scores[index] == score:
+            self._counts[index] += 1
+        else:
+            self._scores.insert(index, score)
+            self._counts.insert(index, 1)
+        self.sessions += 1
+
+    def top(self, n=None):
+        """
+        Public method which returns the leaderboard from memory
+        :param n: number of entries (top_size if None)
+        :return: a list of (player, score) tuples, highest score first (earliest session first among equal scores)
+        """
+        with self._lock:
+            entries = self._top[::-1][:n or self.top_size]
+        return [(player, score) for score, _, player in entries]
+
+    def best_score(self, player):
+        """
+        Public method which returns the best score of a player from memory
+        :param player: name of the player
+        :return: the best score (0 if the player has not finished a session yet)
+        """
+        return self._best.get(player, 0)
+
+    def percentile(self, score):
+        """
+        Public method which returns the share of all sessions which scored less than a score (from memory)
+        :param score: the score to rank
+        :return: a fraction between 0 and 1
+        """
+        with self._lock:
+            if not self.sessions:
+                return 0.0
+            below = sum(self._counts[:bisect.bisect_left(self._scores, score)])
+            return below / self.sessions
+
+    def history(self, player, limit=20):
+        """
+        Public method which queries the most recent sessions of a player (waiting for pending writes first)
+        :param player: name of the player
+        :param limit: largest number of sessions to return
+        :return: a list of (score, frames, seed, played_at) tuples, most recent first
+        """
+        self.flush()
+        return self._connection.execute(
+            "SELECT score, frames, seed, played_at FROM sessions JOIN players ON players.id = player_id "
+            "WHERE name = ? ORDER BY played_at DESC LIMIT ?", (player, limit)).fetchall()
+
+    def flush(self):
+        """
+        Public method which waits until every recorded session has been committed
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Public method which commits the pending sessions and stops the writer thread
+        """
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_loop(self):
+        """
+        This private method runs on the writer thread: it gathers the queued sessions into batches and commits
+        each batch in a single transaction
+        """
+        connection = _connect(self.path)
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # Keep gathering sessions until the queue stays empty for flush_interval (or the batch is full)
+            while len(batch) < self._batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get(timeout=self._flush_interval))
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                stopping = True
+            sessions = [entry for entry in batch if entry is not _STOP]
+            try:
+                if sessions:
+                    # The connection's context manager rolls the whole batch back if any insert fails
+                    with connection:
+                        connection.executemany("INSERT OR IGNORE INTO players (name) VALUES (?)",
+                                               [(entry[0],) for entry in sessions])
+                        connection.executemany(
+                            "INSERT INTO sessions (player_id, score, frames, seed, played_at) "
+                            "SELECT id, ?, ?, ?, ? FROM players WHERE name = ?",
+                            [(score, frames, seed, played_at, player)
+                             for player, score, frames, seed, played_at in sessions])
+            except Exception:
+                # Keep the writer alive, so later sessions are still committed and flush() does not wait forever
+                self.failed_sessions += len(sessions)
+                _LOGGER.exception("could not save %d game session(s) to %s", len(sessions), self.path)
+                self._uncache_failed_batch(connection)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        connection.close()
+
+    def _uncache_failed_batch(self, connection):
+        """
+        This private method runs on the writer thread after a batch was rolled back: it reloads the in-memory cache
+        from the committed sessions and adds back the sessions still waiting on the queue, which drops the sessions
+        of the failed batch from the leaderboard, the best scores and the histogram
+        :param connection: the writer thread's sqlite3 connection
+        """
+        with self._lock:
+            self._load_cache(connection)
+            with self._queue.mutex:
+                pending = [entry for entry in self._queue.queue if entry is not _STOP]
+            for player, score, _, _, played_at in pending:
+                self._cache_session(player, score, played_at)
+
+
+# ================  FUNCTION CODE  =================+
+def _connect(path):
+    """
+    This private function opens a connection to the score database
+    :param path: path of the SQLite database file
+    :return: a sqlite3 connection
+    """
+    connection = sqlite3.connect(path)
+    # Write-ahead logging lets the game's queries read while the writer thread commits
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
@@ -0,0 +1,166 @@
+# flappy_snapshot.py
+# Pre-allocated ring buffer of game world snapshots for rewinding, save-states and search bots branching mid-game
+# ===================  IMPORTS  ===================+
+from array import array
+
+from flappy_world import FRAME_INTERVAL_MS, PIPE_SEPARATION_Y, PIPE_SPAWN_INTERVAL, PIPE_WIDTH, PIPE_X_SPEED
+from flappy_world import WINDOW_WIDTH, PipePair
+
+
+# =================  SNAPSHOT CONSTANTS  =================+
+# Scalar fields at the start of every snapshot record (followed by the x, gap top and scored flag of every pipe pair)
+_FIELDS = ("frame", "bird_y", "bird_y_speed", "score", "spawned", "spawn_timer", "game_over", "jumps", "pipes")
+_FRAME, _BIRD_Y, _BIRD_Y_SPEED, _SCORE, _SPAWNED, _SPAWN_TIMER, _GAME_OVER, _JUMPS, _PIPES = range(len(_FIELDS))
+# Number of values stored per pipe pair
+_PIPE_FIELDS = 3
+
+
+# ==================  CLASS CODE  ==================+
+class SnapshotRing:
+    """
+    This class captures the complete state of a GameWorld every frame into a ring buffer of fixed-size records in a
+    single pre-allocated array of doubles, so capturing a frame does not allocate (apart from logging a jump) and
+    the last capacity frames can be restored at any time. The state is the bird's y and y-speed, the pipe pairs on
+    the screen, the score, the spawn timer and the position within the seeded pipe course (which is the whole state
+    of its random generator).
+    The ring also logs the jump frames of its timeline, so a restored world can still be saved as a replay.
+    restore rewinds the timeline (discarding every newer snapshot), while copy_to leaves the ring untouched, so a
+    search can branch any number of times from the same snapshot into other worlds
+    """
+
+    def __init__(self, capacity, window_width=WINDOW_WIDTH):
+        """
+        Constructor function of the SnapshotRing class
+        :param capacity: number of snapshots kept (the most recent ones)
+        :param window_width: width of the game window (which bounds the number of pipe pairs on the screen)
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        # Largest number of pipe pairs on the screen at once (pairs live from the right edge until they leave the left)
+        spacing = round(PIPE_SPAWN_INTERVAL * 1000 / FRAME_INTERVAL_MS) * -PIPE_X_SPEED
+        self.max_pipes = int((window_width + PIPE_WIDTH) / spacing) + 2
+        self._stride = len(_FIELDS) + _PIPE_FIELDS * self.max_pipes
+        self._records = array("d", bytes(array("d").itemsize * self._stride * capacity))
+        # Seed of the course of every snapshot (kept as references, seeds can exceed the precision of a double)
+        self._seeds = [None] * capacity
+        # Jump frames of the ring's timeline (the prefix up to a snapshot is the jump history of that snapshot)
+        self._jump_frames = array("l")
+        self.clear()
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """
+        Public method which discards every snapshot (e.g. at the start of a game session)
+        """
+        # Slot of the most recent snapshot and the number of snapshots held
+        self._head = -1
+        self.count = 0
+        del self._jump_frames[:]
+
+    def capture(self, world):
+        """
+        Public method which captures the current state of a world, overwriting the oldest snapshot once the ring is full
+        :param world: the GameWorld to capture
+        """
+        pipes = world.pipes
+        if len(pipes) > self.max_pipes:
+            raise ValueError("too many pipe pairs on the screen for this ring")
+        head = self._head + 1
+        if head == self.capacity:
+            head = 0
+        self._head = head
+        if self.count < self.capacity:
+            self.count += 1
+        track = world.track
+        records = self._records
+        base = head * self._stride
+        records[base + _FRAME] = world.frame
+        records[base + _BIRD_Y] = world.bird_y
+        records[base + _BIRD_Y_SPEED] = world.bird_y_speed
+        records[base + _SCORE] = world.score
+        records[base + _SPAWNED] = track.spawned
+        records[base + _SPAWN_TIMER] = track.spawn_timer
+        records[base + _GAME_OVER] = world.game_over
+        # Log the jumps made since the previous capture (only frames with a jump append to the log)
+        jump_frames = world.jump_frames
+        n_jumps = len(jump_frames)
+        if n_jumps != len(self._jump_frames):
+            del self._jump_frames[n_jumps:]
+            self._jump_frames.extend(jump_frames[len(self._jump_frames):])
+        records[base + _JUMPS] = n_jumps
+        records[base + _PIPES] = len(pipes)
+        offset = base + len(_FIELDS)
+        for pipe in pipes:
+            records[offset] = pipe.x
+            records[offset + 1] = pipe.gap_top
+            records[offset + 2] = pipe.scored
+            offset += _PIPE_FIELDS
+        self._seeds[head] = world.seed
+
+    def frame(self, age=0):
+        """
+        Public method which returns the frame at which a snapshot was captured
+        :param age: number of snapshots between the snapshot and the most recent one (0 for the most recent one)
+        :return: the frame index of the snapshot
+        """
+        return int(self._records[self._slot(age) * self._stride + _FRAME])
+
+    def restore(self, world, age=0):
+        """
+        Public method which rewinds a world to a snapshot and discards every newer snapshot, so the ring continues
+        the timeline from there
+        :param world: the GameWorld to restore
+        :param age: number of snapshots between the snapshot and the most recent one (0 for the most recent one)
+        """
+        slot = self._slot(age)
+        self._load(world, slot)
+        del self._jump_frames[len(world.jump_frames):]
+        self._head = slot
+        self.count -= age
+
+    def copy_to(self, world, age=0):
+        """
+        Public method which puts a world (the one captured, or another world of the same size) into the state of a
+        snapshot, including its jump history, without changing the ring
+        :param world: the GameWorld to restore
+        :param age: number of snapshots between the snapshot and the most recent one (0 for the most recent one)
+        """
+        self._load(world, self._slot(age))
+
+    def _load(self, world, slot):
+        """
+        This private method puts a world into the state of the snapshot held by a slot of the ring
+        :param world: the GameWorld to restore
+        :param slot: index into the ring
+        """
+        records = self._records
+        base = slot * self._stride
+        world.seed = self._seeds[slot]
+        world.frame = int(records[base + _FRAME])
+        world.bird_y = records[base + _BIRD_Y]
+        world.bird_y_speed = records[base + _BIRD_Y_SPEED]
+        world.score = int(records[base + _SCORE])
+        world.game_over = bool(records[base + _GAME_OVER])
+        world.jump_frames[:] = self._jump_frames[:int(records[base + _JUMPS])]
+        pipes = []
+        offset = base + len(_FIELDS)
+        for _ in range(int(records[base + _PIPES])):
+            gap_top = records[offset + 1]
+            pipe = PipePair(records[offset], int(gap_top), int(gap_top) + PIPE_SEPARATION_Y)
+            pipe.scored = bool(records[offset + 2])
+            pipes.append(pipe)
+            offset += _PIPE_FIELDS
+        world.track.restore(world.seed, int(records[base + _SPAWNED]), int(records[base + _SPAWN_TIMER]), pipes)
+
+    def _slot(self, age):
+        """
+        This private method returns the slot of the ring holding a snapshot
+        :param age: number of snapshots between the snapshot and the most recent one
+        :return: an index into the ring
+        """
+        if not 0 <= age < self.count:
+            raise IndexError("no snapshot {} frames back ({} held)".format(age, self.count))
+        return (self._head - age) % self.capacity
@@ -0,0 +1,528 @@
+# flappy_solver.py
+# Reachability solver which decides whether a pipe course can be survived and plans a jump schedule through it
+# ===================  IMPORTS  ===================+
+from collections import OrderedDict
+
+from flappy_world import (WINDOW_WIDTH, WINDOW_HEIGHT, FRAME_INTERVAL_MS, GRAVITY_Y_SPEED, JUMP_Y_SPEED,
+                          UPPER_WINDOW_BOUNDARY, DOWNWARD_ACCELERATION, FLOOR_OFFSET, BIRD_HITBOX, PIPE_WIDTH,
+                          PIPE_SEPARATION_Y, PIPE_X_SPEED, PIPE_SPAWN_INTERVAL, SEED_LIMIT, GameWorld, PipeCourse)
+from flappy_snapshot import SnapshotRing
+
+
+# =================  SOLVER CONSTANTS  =================+
+# Number of grid units per pixel: every y-coordinate and y-speed of the bird is a multiple of the acceleration
+_UNITS = round(1 / DOWNWARD_ACCELERATION)
+# Jump speed in grid units
+_JUMP = round(JUMP_Y_SPEED * _UNITS)
+
+
+# ==================  CLASS CODE  ==================+
+class CourseSolver:
+    """
+    This class decides which states of the bird can survive a sequence of pipe gaps, using the exact update rule of
+    the game on a grid of 1 / DOWNWARD_ACCELERATION pixel (on which every reachable y-coordinate and y-speed lies).
+    The reachable states of a frame are kept as one bitset of y-coordinates per y-speed. The bird is only ever at
+    a y-speed of its own making, so a state after a jump is fully described by its y-coordinate and the frame of the
+    jump. A course is solved pipe by pipe: a segment runs from the end of one pipe's collision window to the end of
+    the next, and the table of reachable states it produces is memoized by the states it starts from, the gap of
+    its pipe and its place relative to the pipe. Courses which share gaps (or a course solved twice) therefore cost
+    almost nothing after the first time.
+    The solver never bounces the bird off the upper boundary, so "survivable" answers are exact and "impossible"
+    answers only assume the player does not rely on hitting the ceiling
+    """
+
+    def __init__(self, window_width=WINDOW_WIDTH, window_height=WINDOW_HEIGHT, spawn_interval_frames=None,
+                 cache_size=256):
+        """
+        Constructor function of the CourseSolver class
+        :param window_width: width of the game window (pipes enter at its right edge, the bird is at its center)
+        :param window_height: height of the game window
+        :param spawn_interval_frames: number of frames between two pipe pairs (the game's interval if None)
+        :param cache_size: number of solved segments kept in memory
+        """
+        self.window_width = window_width
+        self.window_height = window_height
+        self.spacing = (round(PIPE_SPAWN_INTERVAL * 1000 / FRAME_INTERVAL_MS) if spawn_interval_frames is None
+                        else spawn_interval_frames)
+        self.bird_x = window_width / 2
+        # Frames after its spawn during which a pipe pair is checked against the bird's hitbox
+        self.window_start, self.window_end = self._collision_window()
+        if self.spacing <= self.window_end + 1 - self.window_start:
+            raise ValueError("pipe pairs closer than their collision window are not supported")
+        # Bitset of the y-coordinates (in grid units) which are neither above the upper boundary nor on the floor
+        self._open_mask = _bit_range(UPPER_WINDOW_BOUNDARY * _UNITS, (window_height - FLOOR_OFFSET) * _UNITS)
+        # Largest number of frames the bird can fall after a jump without leaving the open part of the window
+        self._longest_arc = self._arc_length()
+        self.cache_size = cache_size
+        # Private LRU dictionaries mapping (entry states, gap top, start offset) to a solved segment and
+        # (gap tops, start state) to a planned jump schedule
+        self._segments = OrderedDict()
+        self._plans = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _collision_window(self):
+        """
+        This private method finds the frames after its spawn in which a pipe pair shares the bird's x-range, moving
+        the pipe with the same floating-point steps as PipeTrack.move
+        :return: a tuple of the first and the last frame offset
+        """
+        bird_left = self.bird_x - BIRD_HITBOX[0]
+        bird_right = self.bird_x + BIRD_HITBOX[2]
+        x = self.window_width
+        offset = 0
+        first = None
+        while x + PIPE_WIDTH >= bird_left:
+            if first is None and x <= bird_right:
+                first = offset
+            x += PIPE_X_SPEED
+            offset += 1
+        return first, offset - 1
+
+    def _arc_length(self):
+        """
+        This private method returns the number of frames the bird takes to fall from a jump at the upper boundary
+        to the floor
+        """
+        y = UPPER_WINDOW_BOUNDARY * _UNITS
+        speed = _JUMP
+        frames = 0
+        while y <= (self.window_height - FLOOR_OFFSET) * _UNITS:
+            y += speed
+            speed += 1
+            frames += 1
+        return frames
+
+    def _gap_mask(self, gap_top):
+        """
+        This private method returns the bitset of the y-coordinates at which the bird's hitbox fits inside a gap
+        :param gap_top: y-coordinate of the top of the gap
+        """
+        low = (gap_top + BIRD_HITBOX[1]) * _UNITS + 1
+        high = (gap_top + PIPE_SEPARATION_Y - BIRD_HITBOX[3]) * _UNITS - 1
+        return _bit_range(low, high) & self._open_mask
+
+    def _mask(self, offset, gap_mask):
+        """
+        This private method returns the bitset of the safe y-coordinates at a frame
+        :param offset: the frame relative to the spawn of the segment's pipe pair
+        :param gap_mask: bitset of the y-coordinates inside the gap of that pipe pair
+        """
+        return gap_mask if self.window_start <= offset <= self.window_end else self._open_mask
+
+    def _segment(self, arcs, gap_top, start_offset):
+        """
+        This private method advances a set of states from a frame up to the end of the collision window of a pipe pair
+        :param arcs: tuple of (y-speed, bitset of y-coordinates) pairs of the states at the first frame
+        :param gap_top: y-coordinate of the top of the pipe pair's gap
+        :param start_offset: the first frame relative to the spawn of the pipe pair
+        :return: a tuple of the states after the window (in the same form as arcs) and the tuple of the bitsets of
+                 the y-coordinates the bird can jump from at every frame of the segment
+        """
+        key = (arcs, gap_top, start_offset)
+        segment = self._segments.get(key)
+        if segment is not None:
+            self.cache_hits += 1
+            self._segments.move_to_end(key)
+            return segment
+        self.cache_misses += 1
+        gap_mask = self._gap_mask(gap_top)
+        states = dict(arcs)
+        jumps = []
+        for offset in range(start_offset + 1, self.window_end + 2):
+            mask = self._mask(offset, gap_mask)
+            # The bird can jump from any state which is alive at the previous frame
+            jump_from = 0
+            for bits in states.values():
+                jump_from |= bits
+            jumps.append(jump_from)
+            advanced = {}
+            for speed, bits in states.items():
+                bits = _shift(bits, speed) & mask
+                if bits:
+                    advanced[speed + 1] = bits
+            bits = _shift(jump_from, _JUMP) & mask
+            if bits:
+                advanced[_JUMP + 1] = advanced.get(_JUMP + 1, 0) | bits
+            states = advanced
+            if not states:
+                break
+        segment = (tuple(sorted(states.items())), tuple(jumps))
+        self._segments[key] = segment
+        if len(self._segments) > self.cache_size:
+            self._segments.popitem(last=False)
+        return segment
+
+    def first_pipe(self, frame):
+        """
+        Public method which returns the index of the first pipe pair whose collision window has not ended at a frame
+        :param frame: the frame of the game session
+        """
+        return max(0, -(-(frame - self.window_end) // self.spacing))
+
+    def _start_arcs(self, gap_tops, frame, bird_y, bird_y_speed):
+        """
+        This private method converts a state of the bird into the form used by the segments
+        :return: a tuple of the start arcs (empty if the state is not safe) and the grid y-coordinate and y-speed
+        """
+        y = bird_y * _UNITS
+        speed = bird_y_speed * _UNITS
+        if y != int(y) or speed != int(speed):
+            raise ValueError("the state of the bird is not on the grid of the game's physics")
+        y = int(y)
+        speed = int(speed)
+        safe = self._safe_mask(frame, self.first_pipe(frame), [self._gap_mask(gap_top) for gap_top in gap_tops[:1]])
+        return (((speed, 1 << y),) if y >= 0 and safe >> y & 1 else ()), y, speed
+
+    def _safe_mask(self, frame, first_pipe, gap_masks):
+        """
+        This private method returns the bitset of the safe y-coordinates at a frame of a planned course
+        :param frame: the frame of the game session
+        :param first_pipe: index of the pipe pair of the first gap mask
+        :param gap_masks: the gap bitsets of consecutive pipe pairs
+        """
+        pipe = self.first_pipe(frame)
+        if pipe - first_pipe >= len(gap_masks):
+            return self._open_mask
+        return self._mask(frame - pipe * self.spacing, gap_masks[pipe - first_pipe])
+
+    def _solve(self, gap_tops, frame, bird_y, bird_y_speed):
+        """
+        This private method runs the segments of a sequence of pipe pairs from a state of the bird
+        :return: a tuple of the final states (empty if the bird cannot survive), the jump bitsets of every frame
+                 from the start frame on and the grid y-coordinate and y-speed of the start state
+        """
+        return _run(self._solve_steps(gap_tops, frame, bird_y, bird_y_speed))
+
+    def _solve_steps(self, gap_tops, frame, bird_y, bird_y_speed):
+        """
+        This private method is the generator form of _solve, which yields after every segment
+        :return: the result of _solve (as the value of the generator's StopIteration)
+        """
+        arcs, y, speed = self._start_arcs(gap_tops, frame, bird_y, bird_y_speed)
+        offset = frame - self.first_pipe(frame) * self.spacing
+        jumps = []
+        for gap_top in gap_tops:
+            if not arcs:
+                break
+            arcs, segment_jumps = self._segment(arcs, gap_top, offset)
+            jumps.extend(segment_jumps)
+            offset = self.window_end + 1 - self.spacing
+            yield
+        return arcs, jumps, y, speed
+
+    def survivable(self, gap_tops, frame=0, bird_y=None, bird_y_speed=GRAVITY_Y_SPEED):
+        """
+        Public method which decides whether the bird can fly through a sequence of pipe pairs
+        :param gap_tops: the gap tops of consecutive pipe pairs, starting with the first pipe pair whose collision
+                         window has not ended at the start frame
+        :param frame: the frame of the game session to start from
+        :param bird_y: y-coordinate of the bird at that frame (the middle of the window if None)
+        :param bird_y_speed: y-speed of the bird at that frame
+        :return: a boolean indicating whether the end of the last collision window can be reached
+        """
+        bird_y = self.window_height / 2 if bird_y is None else bird_y
+        return bool(self._solve(gap_tops, frame, bird_y, bird_y_speed)[0])
+
+    def plan(self, gap_tops, frame=0, bird_y=None, bird_y_speed=GRAVITY_Y_SPEED):
+        """
+        Public method which finds a jump schedule through a sequence of pipe pairs. It ends in the state closest to
+        the middle of the last gap and, going back from there, always takes the longest arc without a jump
+        :param gap_tops: the gap tops of consecutive pipe pairs (see survivable)
+        :param frame: the frame of the game session to start from
+        :param bird_y: y-coordinate of the bird at that frame (the middle of the window if None)
+        :param bird_y_speed: y-speed of the bird at that frame
+        :return: the increasing list of the frames at which the bird must jump, or None if the course is impossible
+        """
+        return _run(self.plan_steps(gap_tops, frame, bird_y, bird_y_speed))
+
+    def plan_steps(self, gap_tops, frame=0, bird_y=None, bird_y_speed=GRAVITY_Y_SPEED):
+        """
+        Public method which is the generator form of plan: it yields after every solved pipe pair and every jump
+        traced back, so a plan can be spread over several frames of the game loop
+        :return: a generator whose StopIteration value is the result of plan
+        """
+        bird_y = self.window_height / 2 if bird_y is None else bird_y
+        key = (tuple(gap_tops), frame, bird_y, bird_y_speed)
+        if key in self._plans:
+            self._plans.move_to_end(key)
+            schedule = self._plans[key]
+        else:
+            schedule = yield from self._plan_steps(gap_tops, frame, bird_y, bird_y_speed)
+            self._plans[key] = schedule
+            if len(self._plans) > self.cache_size:
+                self._plans.popitem(last=False)
+        return None if schedule is None else list(schedule)
+
+    def _plan_steps(self, gap_tops, frame, bird_y, bird_y_speed):
+        """
+        This private generator finds a jump schedule through a sequence of pipe pairs (see plan), yielding after
+        every solved pipe pair and every jump traced back
+        :return: a tuple of the frames at which the bird must jump, or None if the course is impossible (as the
+                 value of the generator's StopIteration)
+        """
+        arcs, jumps, start_y, start_speed = yield from self._solve_steps(gap_tops, frame, bird_y, bird_y_speed)
+        if not arcs:
+            return None
+        start_frame = frame
+        first_pipe = self.first_pipe(start_frame)
+        gap_masks = [self._gap_mask(gap_top) for gap_top in gap_tops]
+        # Pick the final state closest to the middle of the last gap (the faster falling one on a tie)
+        target = (gap_tops[-1] + PIPE_SEPARATION_Y // 2) * _UNITS if gap_tops else start_y
+        y, speed = min(((_nearest_bit(bits, target), speed) for speed, bits in arcs),
+                       key=lambda state: (abs(state[0] - target), -state[1]))
+        frame = start_frame + len(jumps)
+
+        def falls_safely(from_frame, y, speed, to_frame):
+            # Whether the bird falls from (from_frame, y, speed) to to_frame without a jump and without a collision
+            for frame_index in range(from_frame + 1, to_frame + 1):
+                y += speed
+                speed += 1
+                if y < 0 or not self._safe_mask(frame_index, first_pipe, gap_masks) >> y & 1:
+                    return False
+            return True
+
+        schedule = []
+        while True:
+            elapsed = frame - start_frame
+            if speed == start_speed + elapsed and y == start_y + _fall_distance(start_speed, elapsed):
+                # The bird is on the arc of the start state, which needs no further jumps
+                break
+            # The state was reached by falling since a jump, whose frame follows from the y-speed
+            jump_frame = frame - (speed - _JUMP)
+            y -= _fall_distance(_JUMP, frame - jump_frame)
+            if jump_frame < start_frame or y < 0 or not jumps[jump_frame - start_frame] >> y & 1:
+                raise RuntimeError("the reachable-state tables are inconsistent")
+            schedule.append(jump_frame)
+            frame = jump_frame
+            # Find the longest arc reaching the jump: the start arc, or else the one of the earliest jump
+            elapsed = frame - start_frame
+            if y == start_y + _fall_distance(start_speed, elapsed) and \
+                    falls_safely(start_frame, start_y, start_speed, frame):
+                speed = start_speed + elapsed
+                continue
+            for previous_jump in range(max(start_frame, frame - self._longest_arc), frame):
+                origin = y - _fall_distance(_JUMP, frame - previous_jump)
+                if origin >= 0 and jumps[previous_jump - start_frame] >> origin & 1 and \
+                        falls_safely(previous_jump, origin, _JUMP, frame):
+                    speed = _JUMP + frame - previous_jump
+                    break
+            else:
+                raise RuntimeError("the reachable-state tables are inconsistent")
+            yield
+        return tuple(reversed(schedule))
+
+    def plan_world(self, world, n_pipes):
+        """
+        Public method which plans a jump schedule for a GameWorld from its current state
+        :param world: the GameWorld (using the regular pipe spawning of its course)
+        :param n_pipes: number of pipe pairs to plan through
+        :return: the increasing list of the frames at which the bird must jump, or None if that is impossible
+        """
+        return self.plan(self.gap_tops(world, world.frame, n_pipes), world.frame, world.bird_y, world.bird_y_speed)
+
+    def gap_tops(self, world, frame, n_pipes):
+        """
+        Public method which lists the gap tops a plan of a GameWorld from a frame has to fly through
+        :param world: the GameWorld (using the regular pipe spawning of its course)
+        :param frame: the frame of the game session to plan from
+        :param n_pipes: number of pipe pairs to plan through
+        :return: the gap tops of n_pipes consecutive pipe pairs, starting with the first one at the frame
+        """
+        first_pipe = self.first_pipe(frame)
+        course = world.track.course
+        return [course.gap_top(index) for index in range(first_pipe, first_pipe + n_pipes)]
+
+
+class PerfectAutopilot:
+    """
+    This class flies a GameWorld along jump schedules planned by a CourseSolver. A schedule covers the next horizon
+    pipe pairs and is followed until the bird has flown through all but the last of them. As the bird's state at
+    that frame follows from the schedule, the next schedule is planned ahead of time from the predicted state, one
+    pipe pair per frame, so no single frame waits for a whole plan (only the first plan of a session, or a plan
+    after the prediction was broken, is made at once)
+    """
+
+    def __init__(self, solver=None, horizon=4):
+        """
+        Constructor function of the PerfectAutopilot class
+        :param solver: the CourseSolver to plan with (a new one if None)
+        :param horizon: number of pipe pairs covered by a schedule
+        """
+        self.solver = CourseSolver() if solver is None else solver
+        self.horizon = horizon
+        # Private set of the frames at which the current schedule jumps
+        self._jumps = set()
+        # Frames between which the current schedule is followed, and the session (world and seed) it belongs to
+        self._planned_from = None
+        self._replan_frame = None
+        self._session = None
+        # Private generator planning the next schedule ahead of time, the state it plans from and its result
+        self._next_plan = None
+        self._next_state = None
+        self._next_schedule = None
+        # Private scratch world and snapshot used to predict the state of the bird at the next replan frame
+        self._scratch = None
+        self._scratch_ring = SnapshotRing(1, self.solver.window_width)
+
+    def __call__(self, world):
+        """
+        Public method which decides whether the bird should jump in the current frame
+        :param world: the GameWorld being played
+        :return: a boolean indicating whether the bird should jump
+        """
+        session = (id(world), world.seed)
+        if self._session != session or not self._planned_from <= world.frame < self._replan_frame:
+            if self._session != session or not self._take_next_plan(world):
+                self._replan(world)
+            self._session = session
+        elif self._next_plan is not None:
+            # Plan one more pipe pair of the next schedule
+            try:
+                next(self._next_plan)
+            except StopIteration as stop:
+                self._next_plan = None
+                self._next_schedule = stop.value
+        return world.frame in self._jumps
+
+    def _replan(self, world):
+        """
+        This private method plans the schedule of the next horizon pipe pairs from the current state of the world
+        (or of fewer pipe pairs if the full horizon cannot be survived)
+        :param world: the GameWorld being played
+        """
+        solver = self.solver
+        schedule = None
+        horizon = self.horizon
+        while schedule is None and horizon:
+            schedule = solver.plan_world(world, horizon)
+            horizon -= 1 if schedule is None else 0
+        self._follow(world, schedule, horizon)
+
+    def _take_next_plan(self, world):
+        """
+        This private method switches to the schedule planned ahead of time, if the world is in the predicted state
+        :param world: the GameWorld being played
+        :return: a boolean indicating whether the schedule was taken
+        """
+        if self._next_state != (world.frame, world.bird_y, world.bird_y_speed):
+            return False
+        if self._next_plan is not None:
+            # The plan was not finished in time: finish it now
+            self._next_schedule = _run(self._next_plan)
+            self._next_plan = None
+        if self._next_schedule is None:
+            return False
+        self._follow(world, self._next_schedule, self.horizon)
+        return True
+
+    def _follow(self, world, schedule, horizon):
+        """
+        This private method starts following a schedule and starts planning the next one ahead of time
+        :param world: the GameWorld being played
+        :param schedule: list of the frames at which to jump (None if the bird cannot survive the next pipe pair)
+        :param horizon: number of pipe pairs covered by the schedule
+        """
+        solver = self.solver
+        self._jumps = set(schedule or ())
+        self._planned_from = world.frame
+        self._next_plan = self._next_state = self._next_schedule = None
+        if schedule is None:
+            # The bird cannot survive the next pipe pair any more: fall and try again next frame
+            self._replan_frame = world.frame + 1
+            return
+        # Keep the last pipe pair of the schedule as lookahead for the next plan
+        last_pipe = solver.first_pipe(world.frame) + max(0, horizon - 2)
+        self._replan_frame = max(world.frame + 1, last_pipe * solver.spacing + solver.window_end + 1)
+        if horizon == self.horizon:
+            self._next_plan = self._plan_ahead(world)
+
+    def _plan_ahead(self, world):
+        """
+        This private generator predicts the state of the bird at the replan frame by following the current schedule
+        in a scratch copy of the world, and then plans the next schedule from it one pipe pair at a time
+        :param world: the GameWorld being played
+        :return: the next schedule (as the value of the generator's StopIteration)
+        """
+        if self._scratch is None:
+            self._scratch = GameWorld(self.solver.window_width, self.solver.window_height, world.seed)
+        scratch = self._scratch
+        self._scratch_ring.capture(world)
+        self._scratch_ring.copy_to(scratch)
+        while scratch.frame < self._replan_frame and not scratch.step(scratch.frame in self._jumps):
+            pass
+        if scratch.game_over:
+            return None
+        self._next_state = (scratch.frame, scratch.bird_y, scratch.bird_y_speed)
+        yield
+        schedule = yield from self.solver.plan_steps(self.solver.gap_tops(scratch, scratch.frame, self.horizon),
+                                                     *self._next_state)
+        return schedule
+
+
+# ================  FUNCTION CODE  =================+
+def _run(steps):
+    """
+    This private function runs a generator to its end
+    :param steps: the generator
+    :return: the generator's return value
+    """
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def _bit_range(low, high):
+    """
+    This private function returns a bitset with the bits from low to high (inclusive) set
+    """
+    if high < low:
+        return 0
+    return ((1 << (high - low + 1)) - 1) << max(0, low)
+
+
+def _shift(bits, distance):
+    """
+    This private function moves every y-coordinate of a bitset by a distance
+    """
+    return bits << distance if distance >= 0 else bits >> -distance
+
+
+def _nearest_bit(bits, target):
+    """
+    This private function returns the set bit of a non-empty bitset closest to a target bit
+    """
+    below = (bits & ((1 << (target + 1)) - 1)).bit_length() - 1
+    above_bits = bits >> (target + 1)
+    above = (above_bits & -above_bits).bit_length() + target if above_bits else -1
+    if below < 0:
+        return above
+    if above < 0 or target - below <= above - target:
+        return below
+    return above
+
+
+def _fall_distance(speed, frames):
+    """
+    This private function returns the distance (in grid units) the bird falls in a number of frames from a y-speed
+    """
+    return speed * frames + frames * (frames - 1) // 2
+
+
+def survivable_seed(seed, n_pipes, solver=None):
+    """
+    This function returns the first seed of seed, seed + 1, ... (wrapping around within SEED_LIMIT) whose first
+    n_pipes pipe pairs can be survived, so that impossible courses are rejected before they are shown
+    :param seed: the preferred seed
+    :param n_pipes: number of pipe pairs to check
+    :param solver: the CourseSolver to check with (a new one if None)
+    :return: a seed
+    """
+    solver = CourseSolver() if solver is None else solver
+    while True:
+        course = PipeCourse(seed, solver.window_height)
+        if solver.survivable([course.gap_top(index) for index in range(n_pipes)]):
+            return seed
+        seed = (seed + 1) % SEED_LIMIT
@@ -0,0 +1,209 @@
+# flappy_tournament.py
+# Tournament runner which plays autopilot policies over many seeded pipe courses on every CPU core
+# ===================  IMPORTS  ===================+
+import argparse
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from flappy_profiler import percentile
+from flappy_world import GameWorld
+
+
+# ================  BUILT-IN POLICIES  ================+
+def never_jump(bird_y, bird_y_speed, gap):
+    """
+    This policy never jumps (a baseline which always falls onto the floor)
+    :param bird_y: y-coordinate of the bird
+    :param bird_y_speed: vertical speed of the bird
+    :param gap: (distance to the next pipe pair, gap top, gap bottom), or None if there is no pipe pair ahead
+    :return: a boolean indicating whether the bird should jump
+    """
+    return False
+
+
+def gap_follower(bird_y, bird_y_speed, gap):
+    """
+    This policy jumps whenever the bird is falling below a point just above the bottom of the next gap
+    :param bird_y: y-coordinate of the bird
+    :param bird_y_speed: vertical speed of the bird
+    :param gap: (distance to the next pipe pair, gap top, gap bottom), or None if there is no pipe pair ahead
+    :return: a boolean indicating whether the bird should jump
+    """
+    target_y = gap[2] - 35 if gap else 350
+    return bird_y > target_y and bird_y_speed > 0
+
+
+# Policies which can be referred to by name on the command line
+BUILT_IN_POLICIES = {"never_jump": never_jump, "gap_follower": gap_follower}
+
+
+# ================  FUNCTION CODE  =================+
+def gap_geometry(world):
+    """
+    This function describes the next gap the bird has to fly through
+    :param world: the GameWorld of the game
+    :return: (horizontal distance from the bird to the next pipe pair, gap top, gap bottom), or None
+    """
+    pipe = world.next_pipe()
+    if pipe is None:
+        return None
+    return pipe.x - world.bird_x, pipe.gap_top, pipe.gap_bottom
+
+
+def play_policy(policy, seed, max_frames):
+    """
+    This function plays a single headless game with a policy in control of the bird
+    :param policy: function mapping (bird y, bird y-speed, next gap geometry) to a jump decision
+    :param seed: seed of the pipe course
+    :param max_frames: number of frames after which the game is stopped
+    :return: a tuple of the score and the number of frames survived
+    """
+    world = GameWorld(seed=seed)
+    while world.frame < max_frames:
+        if world.step(bool(policy(world.bird_y, world.bird_y_speed, gap_geometry(world)))):
+            break
+    return world.score, world.frame
+
+
+def _play_chunk(task):
+    """
+    This private function plays a chunk of seeds with one policy (the unit of work sent to a worker process)
+    :param task: a tuple of (policy, list of seeds, maximum number of frames)
+    :return: a tuple of the list of scores and the list of frames survived
+    """
+    policy, seeds, max_frames = task
+    scores = []
+    frames = []
+    for seed in seeds:
+        score, survived = play_policy(policy, seed, max_frames)
+        scores.append(score)
+        frames.append(survived)
+    return scores, frames
+
+
+class PolicyResult:
+    """
+    This class stores the scores and survival frames of one policy over every seed of a tournament
+    """
+
+    def __init__(self, name, scores, frames):
+        """
+        Constructor function of the PolicyResult class
+        :param name: name of the policy
+        :param scores: list of the scores, one per seed
+        :param frames: list of the frames survived, one per seed
+        """
+        self.name = name
+        self.scores = scores
+        self.frames = frames
+
+    def summary(self):
+        """
+        Public method which summarises the score distribution and the survival-frame percentiles
+        :return: a dictionary of summary statistics
+        """
+        scores = sorted(self.scores)
+        frames = sorted(self.frames)
+        return {
+            "policy": self.name,
+            "games": len(scores),
+            "score_mean": sum(scores) / len(scores),
+            "score_p10": percentile(scores, 0.10),
+            "score_p50": percentile(scores, 0.50),
+            "score_p90": percentile(scores, 0.90),
+            "score_max": scores[-1],
+            "frames_p50": percentile(frames, 0.50),
+            "frames_p90": percentile(frames, 0.90),
+            "frames_p99": percentile(frames, 0.99),
+        }
+
+
+def run_tournament(policies, seeds, max_frames=20000, workers=None, chunk_size=32):
+    """
+    This function plays every policy over every seed, spreading chunks of seeds over a process pool
+    :param policies: dictionary mapping policy names to module-level (picklable) policy functions
+    :param seeds: list of pipe course seeds shared by all policies
+    :param max_frames: number of frames after which a game is stopped
+    :param workers: number of worker processes (every CPU core if None, no pool if 1)
+    :param chunk_size: number of seeds played per task sent to a worker
+    :return: a tuple of the list of PolicyResult objects and the number of frames simulated per second
+    """
+    tasks = []
+    owners = []
+    for name, policy in policies.items():
+        for start in range(0, len(seeds), chunk_size):
+            tasks.append((policy, seeds[start:start + chunk_size], max_frames))
+            owners.append(name)
+    start_time = time.perf_counter()
+    if workers == 1:
+        outcomes = map(_play_chunk, tasks)
+        results = _collect(policies, owners, outcomes)
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            results = _collect(policies, owners, executor.map(_play_chunk, tasks))
+    elapsed = time.perf_counter() - start_time
+    total_frames = sum(sum(result.frames) for result in results)
+    return results, total_frames / elapsed if elapsed else 0.0
+
+
+def _collect(policies, owners, outcomes):
+    """
+    This private function gathers the outcomes of the tasks into one PolicyResult per policy
+    :param policies: dictionary mapping policy names to policy functions
+    :param owners: list of the policy name of each task
+    :param outcomes: iterable of (scores, frames) tuples in task order
+    :return: a list of PolicyResult objects in the order of the policies
+    """
+    results = {name: PolicyResult(name, [], []) for name in policies}
+    for name, (scores, frames) in zip(owners, outcomes):
+        results[name].scores.extend(scores)
+        results[name].frames.extend(frames)
+    return list(results.values())
+
+
+def load_policy(spec):
+    """
+    This function resolves a policy from the command line
+    :param spec: the name of a built-in policy or a "module:function" reference
+    :return: the policy function
+    """
+    if spec in BUILT_IN_POLICIES:
+        return BUILT_IN_POLICIES[spec]
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError("policy {!r} is neither built in nor of the form module:function".format(spec))
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def main(argv=None):
+    """
+    This function runs a tournament from the command line and prints its leaderboard
+    :param argv: list of command-line arguments (sys.argv if None)
+    """
+    parser = argparse.ArgumentParser(description="Run a FloppyBird autopilot tournament.")
+    parser.add_argument("policies", nargs="*", default=["gap_follower", "never_jump"],
+                        help="built-in policy names or module:function references")
+    parser.add_argument("--seeds", type=int, default=1000, help="number of pipe courses (seeds 0..N-1)")
+    parser.add_argument("--max-frames", type=int, default=20000, help="frame limit of a single game")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=32, help="seeds per task sent to a worker")
+    args = parser.parse_args(argv)
+
+    policies = {spec: load_policy(spec) for spec in args.policies}
+    results, throughput = run_tournament(policies, list(range(args.seeds)), args.max_frames, args.workers,
+                                         args.chunk_size)
+    columns = ("policy", "games", "score_mean", "score_p10", "score_p50", "score_p90", "score_max",
+               "frames_p50", "frames_p90", "frames_p99")
+    print(" ".join("{:>12}".format(column) for column in columns))
+    for result in sorted(results, key=lambda result: -sum(result.scores)):
+        summary = result.summary()
+        print(" ".join("{:>12.2f}".format(summary[column]) if isinstance(summary[column], float)
+                       else "{:>12}".format(summary[column]) for column in columns))
+    print("{:.0f} frames/s".format(throughput))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
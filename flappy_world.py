@@ -0,0 +1,392 @@
+# flappy_world.py
+# Headless world model of FloppyBird (bird physics, pipe spawning, scoring and collisions) without tkinter
+# ===================  IMPORTS  ===================+
+import datetime
+import random
+from collections import deque
+
+
+# =================  GAME CONSTANTS  =================+
+# Width of the game window (and of the simulated world)
+WINDOW_WIDTH = 485
+# Height of the game window (and of the simulated world)
+WINDOW_HEIGHT = 640
+# Number of milliseconds between two consecutive frames of the game
+FRAME_INTERVAL_MS = 15
+
+# Downward speed the bird is reset to at the start of a game and whenever it bounces off the upper boundary
+GRAVITY_Y_SPEED = 3
+# Upward speed given to the bird by a jump (directly proportional to the jump height)
+JUMP_Y_SPEED = -5
+# The y-coordinate of the upper window boundary which the bird must not cross
+UPPER_WINDOW_BOUNDARY = 20
+# Deceleration added to the bird's vertical speed each frame, which visually simulates the weight of the bird
+DOWNWARD_ACCELERATION = 0.25
+# Distance from the bottom of the window below which the bird is considered to have hit the floor
+FLOOR_OFFSET = 31
+# Extents of the bird's hitbox around its center (left, top, right, bottom)
+BIRD_HITBOX = (18, 18, 22, 20)
+
+# Width of each pipe
+PIPE_WIDTH = 85
+# Vertical separation (gap) between the top and the bottom pipe of a pair
+PIPE_SEPARATION_Y = 120
+# Horizontal speed of the pipes
+PIPE_X_SPEED = -2.6
+# Number of seconds between the generation of two pipe pairs
+PIPE_SPAWN_INTERVAL = 2.5
+# Minimum distance of a gap from the top and bottom window boundaries
+PIPE_Y_OFFSET = 90
+
+# Number of pipe pairs generated at a time by PipeCourse.chunks
+COURSE_CHUNK_SIZE = 64
+# Number of distinct course seeds (seeds are non-negative 32-bit integers)
+SEED_LIMIT = 2 ** 32
+
+# Constants of the SplitMix64 generator (the increment of its state and the multipliers of its output mix)
+_SPLITMIX_GAMMA = 0x9E3779B97F4A7C15
+_SPLITMIX_MULTIPLIERS = (0xBF58476D1CE4E5B9, 0x94D049BB133111EB)
+_UINT64_MASK = (1 << 64) - 1
+
+
+# ================  FUNCTION CODE  =================+
+def new_seed():
+    """
+    This function draws a fresh seed for a random pipe course
+    :return: a non-negative 32-bit integer seed
+    """
+    return random.getrandbits(32)
+
+
+def daily_seed(day=None):
+    """
+    This function returns the seed of the "daily challenge" course shared by every player on a given day
+    :param day: a datetime.date (today in UTC if None, so every time zone shares the same course)
+    :return: a non-negative 32-bit integer seed
+    """
+    day = datetime.datetime.now(datetime.timezone.utc).date() if day is None else day
+    return _splitmix64(day.toordinal(), 0) >> 32
+
+
+def _splitmix64(seed, index):
+    """
+    This private function returns the output of a SplitMix64 generator seeded with seed after index + 1 steps,
+    without computing the outputs before it
+    :param seed: the seed of the generator
+    :param index: the index of the output
+    :return: a 64-bit unsigned integer
+    """
+    value = (seed + (index + 1) * _SPLITMIX_GAMMA) & _UINT64_MASK
+    value = ((value ^ (value >> 30)) * _SPLITMIX_MULTIPLIERS[0]) & _UINT64_MASK
+    value = ((value ^ (value >> 27)) * _SPLITMIX_MULTIPLIERS[1]) & _UINT64_MASK
+    return value ^ (value >> 31)
+
+
+# ==================  CLASS CODE  ==================+
+class PipePair:
+    """
+    This class stores the geometry of a single pipe pair (a top and a bottom pipe sharing one gap)
+    """
+    __slots__ = ("x", "gap_top", "gap_bottom", "scored")
+
+    def __init__(self, x, gap_top, gap_bottom):
+        """
+        Constructor function of the PipePair class
+        :param x: x-coordinate of the left edge of both pipes
+        :param gap_top: y-coordinate of the bottom edge of the top pipe
+        :param gap_bottom: y-coordinate of the top edge of the bottom pipe
+        """
+        self.x = x
+        self.gap_top = gap_top
+        self.gap_bottom = gap_bottom
+        # Boolean-type variable to indicate whether the player has already been scored for this pair
+        self.scored = False
+
+    def top_rect(self):
+        """
+        Public method which returns the (x1, y1, x2, y2) rectangle of the top pipe
+        """
+        return self.x, 0, self.x + PIPE_WIDTH, self.gap_top
+
+    def bottom_rect(self, window_height):
+        """
+        Public method which returns the (x1, y1, x2, y2) rectangle of the bottom pipe
+        :param window_height: height of the game window
+        """
+        return self.x, self.gap_bottom, self.x + PIPE_WIDTH, window_height
+
+
+class PipeCourse:
+    """
+    This class describes the endless pipe course of a seed. The gap of pair k is a hash of the seed and k, so any
+    pair can be looked up directly and the course can be streamed in chunks with constant memory, however long it is
+    """
+    __slots__ = ("seed", "min_gap_top", "max_gap_top")
+
+    def __init__(self, seed, window_height=WINDOW_HEIGHT):
+        """
+        Constructor function of the PipeCourse class
+        :param seed: seed of the course
+        :param window_height: height of the game window (which bounds the gaps)
+        """
+        self.seed = seed
+        # Smallest and biggest (exclusive) length of a top pipe from the top of the window
+        self.min_gap_top = PIPE_Y_OFFSET
+        self.max_gap_top = window_height - PIPE_Y_OFFSET - PIPE_SEPARATION_Y
+
+    def gap_top(self, index):
+        """
+        Public method which returns the length of the top pipe of a pair of the course
+        :param index: index of the pair (0 for the first pair of the course)
+        :return: the y-coordinate of the top of the pair's gap
+        """
+        # Map the 64-bit hash onto the range of lengths with a multiplication (an unbiased enough, division-free modulo)
+        span = self.max_gap_top - self.min_gap_top
+        return self.min_gap_top + ((_splitmix64(self.seed, index) * span) >> 64)
+
+    def gap(self, index):
+        """
+        Public method which returns the gap of a pair of the course
+        :param index: index of the pair (0 for the first pair of the course)
+        :return: a tuple of the y-coordinates of the top and the bottom of the gap
+        """
+        gap_top = self.gap_top(index)
+        return gap_top, gap_top + PIPE_SEPARATION_Y
+
+    def chunks(self, start=0, chunk_size=COURSE_CHUNK_SIZE):
+        """
+        Public method which streams the gaps of the course from a given pair onward, one chunk at a time
+        :param start: index of the first pair to generate
+        :param chunk_size: number of pairs per chunk
+        :return: an endless generator of lists of (gap top, gap bottom) tuples
+        """
+        while True:
+            yield [self.gap(index) for index in range(start, start + chunk_size)]
+            start += chunk_size
+
+
+class PipeTrack:
+    """
+    This class generates the pipe pairs of a course and keeps the pairs that are on the screen in an ordered
+    ring buffer (a deque, oldest pair first). It tracks the index of the next pair to score and of the nearest
+    pair the bird can collide with, so scoring, collision and culling only ever look at the front of the buffer
+    """
+
+    def __init__(self, window_width=WINDOW_WIDTH, window_height=WINDOW_HEIGHT):
+        """
+        Constructor function of the PipeTrack class
+        :param window_width: width of the game window (new pairs are generated at its right edge)
+        :param window_height: height of the game window
+        """
+        self.window_width = window_width
+        self.window_height = window_height
+        # Number of frames between the generation of two pipe pairs
+        self.spawn_interval_frames = round(PIPE_SPAWN_INTERVAL * 1000 / FRAME_INTERVAL_MS)
+        # The course from which the gaps of the pipe pairs are taken
+        self.course = PipeCourse(0, self.window_height)
+        # Ring buffer of the PipePair objects on the screen, ordered from the oldest (left-most) to the newest
+        self.pipes = deque()
+        self.reset(0)
+
+    def reset(self, seed):
+        """
+        Public method which removes every pipe pair and restarts the course from the given seed
+        :param seed: seed of the random pipe course
+        """
+        self.course = PipeCourse(seed, self.window_height)
+        self.pipes.clear()
+        # Index within the course of the next pipe pair to generate
+        self.spawned = 0
+        # Number of frames left until the next pipe pair is generated
+        self.spawn_timer = 0
+        # Index of the first pair that has not been scored yet (all pairs before it are scored)
+        self._next_index = 0
+        # Index of the first pair whose right edge has not been passed by the bird's hitbox
+        self._nearest_index = 0
+
+    def restore(self, seed, spawned, spawn_timer, pipes):
+        """
+        Public method which puts the track back into a previously captured state
+        :param seed: seed of the course
+        :param spawned: index within the course of the next pipe pair to generate
+        :param spawn_timer: number of frames left until the next pipe pair is generated
+        :param pipes: iterable of the PipePair objects on the screen, oldest first
+        """
+        if seed != self.course.seed:
+            self.course = PipeCourse(seed, self.window_height)
+        self.pipes.clear()
+        self.pipes.extend(pipes)
+        self.spawned = spawned
+        self.spawn_timer = spawn_timer
+        # The scored pairs are always at the front of the buffer, and nearest() catches up from the first pair
+        self._next_index = sum(1 for pipe in self.pipes if pipe.scored)
+        self._nearest_index = 0
+
+    def spawn(self):
+        """
+        Public method which generates a new pipe pair at the right edge of the window once the spawn interval passes
+        """
+        if self.spawn_timer <= 0:
+            gap_top = self.course.gap_top(self.spawned)
+            self.spawned += 1
+            self.pipes.append(PipePair(self.window_width, gap_top, gap_top + PIPE_SEPARATION_Y))
+            self.spawn_timer = self.spawn_interval_frames
+        self.spawn_timer -= 1
+
+    def cull(self):
+        """
+        Public method which drops the pipe pairs that have left the window from the front of the buffer
+        """
+        pipes = self.pipes
+        while pipes and pipes[0].x + PIPE_WIDTH < 0:
+            pipes.popleft()
+            self._next_index = max(0, self._next_index - 1)
+            self._nearest_index = max(0, self._nearest_index - 1)
+
+    def score(self, bird_x):
+        """
+        Public method which marks the pairs the bird has flown past as scored
+        :param bird_x: x-coordinate of the center of the bird
+        :return: the number of pairs scored by this call
+        """
+        pipes = self.pipes
+        scored = 0
+        while self._next_index < len(pipes) and pipes[self._next_index].x < bird_x:
+            pipes[self._next_index].scored = True
+            self._next_index += 1
+            scored += 1
+        return scored
+
+    def nearest(self, bird_left):
+        """
+        Public method which returns the index of the nearest pair whose right edge the bird has not yet passed
+        :param bird_left: x-coordinate of the left edge of the bird's hitbox
+        :return: an index into pipes (equal to len(pipes) if there is no such pair)
+        """
+        pipes = self.pipes
+        while self._nearest_index < len(pipes) and pipes[self._nearest_index].x + PIPE_WIDTH < bird_left:
+            self._nearest_index += 1
+        return self._nearest_index
+
+    def next_pipe(self, bird_left):
+        """
+        Public method which returns the pipe pair the bird has to fly through next
+        :param bird_left: x-coordinate of the left edge of the bird's hitbox
+        :return: the nearest PipePair whose right edge has not yet been passed by the bird, or None
+        """
+        index = self.nearest(bird_left)
+        return self.pipes[index] if index < len(self.pipes) else None
+
+    def move(self):
+        """
+        Public method which moves all of the pipes towards the bird
+        """
+        for pipe in self.pipes:
+            pipe.x += PIPE_X_SPEED
+
+
+class GameWorld:
+    """
+    This class holds the complete state of a single game session and advances it one frame at a time.
+    It applies the same gravity, jump, pipe spawn, scoring and collision rules as the tkinter game,
+    but keeps all of the state in plain Python attributes so it can run without a display
+    """
+
+    def __init__(self, window_width=WINDOW_WIDTH, window_height=WINDOW_HEIGHT, seed=None):
+        """
+        Constructor function of the GameWorld class
+        :param window_width: width of the simulated game window
+        :param window_height: height of the simulated game window
+        :param seed: seed of the random pipe course (a new seed is drawn if None)
+        """
+        self.window_width = window_width
+        self.window_height = window_height
+        # The pipe pairs of the course which are currently on the screen
+        self.track = PipeTrack(self.window_width, self.window_height)
+        # Ring buffer of the PipePair objects on the screen, ordered from the oldest (left-most) to the newest
+        self.pipes = self.track.pipes
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """
+        Public method which puts the world back into the state at the start of a new game session
+        :param seed: seed of the random pipe course of the new session (a new seed is drawn if None)
+        """
+        self.seed = new_seed() if seed is None else seed
+        self.track.reset(self.seed)
+        # The bird is horizontally fixed at the center of the window
+        self.bird_x = self.window_width / 2
+        self.bird_y = self.window_height / 2
+        self.bird_y_speed = GRAVITY_Y_SPEED
+        self.score = 0
+        self.frame = 0
+        self.game_over = False
+        # List of the frame indices at which the bird jumped (enough to replay the session together with the seed)
+        self.jump_frames = []
+
+    def jump(self):
+        """
+        Public method which makes the bird jump upward (at the start of the next frame)
+        """
+        if self.game_over:
+            return
+        self.bird_y_speed = JUMP_Y_SPEED
+        if not self.jump_frames or self.jump_frames[-1] != self.frame:
+            self.jump_frames.append(self.frame)
+
+    def next_pipe(self):
+        """
+        Public method which returns the pipe pair the bird has to fly through next (or None)
+        """
+        return self.track.next_pipe(self.bird_x - BIRD_HITBOX[0])
+
+    def step(self, jump=False):
+        """
+        Public method which advances the world by a single frame
+        :param jump: whether the bird should jump at the start of this frame
+        :return: a boolean indicating whether the game is over
+        """
+        if self.game_over:
+            return True
+        if jump:
+            self.jump()
+        self.track.spawn()
+        collision = self._detect_overlaps()
+        self._bird_fall()
+        self.track.move()
+        self.frame += 1
+        if collision:
+            self.game_over = True
+        return self.game_over
+
+    def _detect_overlaps(self):
+        """
+        This private method removes pipes that have left the window, scores passed pipes and detects collisions
+        :return: a boolean indicating whether the bird has collided with a pipe or the floor
+        """
+        track = self.track
+        track.cull()
+        self.score += track.score(self.bird_x)
+        # Check whether the bird has hit the floor
+        if self.bird_y > self.window_height - FLOOR_OFFSET:
+            return True
+        # Check the bird's hitbox against the nearest pipe pairs which share its x-range
+        bird_left = self.bird_x - BIRD_HITBOX[0]
+        bird_right = self.bird_x + BIRD_HITBOX[2]
+        pipes = track.pipes
+        index = track.nearest(bird_left)
+        while index < len(pipes) and pipes[index].x <= bird_right:
+            pipe = pipes[index]
+            if self.bird_y - BIRD_HITBOX[1] <= pipe.gap_top or self.bird_y + BIRD_HITBOX[3] >= pipe.gap_bottom:
+                return True
+            index += 1
+        return False
+
+    def _bird_fall(self):
+        """
+        This private method makes the bird move downward (fall), bouncing it back down off the upper boundary
+        """
+        if self.bird_y < UPPER_WINDOW_BOUNDARY:
+            self.bird_y_speed = GRAVITY_Y_SPEED
+        self.bird_y += self.bird_y_speed
+        self.bird_y_speed += DOWNWARD_ACCELERATION
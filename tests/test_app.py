@@ -0,0 +1,122 @@
+# test_app.py
+# Tests of the Tk game loop driven frame by frame (skipped where no display is available)
+# ===================  IMPORTS  ===================+
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+import flappyBird_v1
+from flappy_assets import SpriteCache
+from flappy_clock import FrameClock
+from flappy_world import FRAME_INTERVAL_MS
+
+
+# ================  FUNCTION CODE  =================+
+@pytest.fixture
+def make_app():
+    """
+    This fixture creates MainApplications whose frames are run by _run_frames instead of the Tk main loop
+    :return: a function taking the MainApplication's keyword arguments and returning the application
+    """
+    apps = []
+
+    def make(**options):
+        try:
+            app = flappyBird_v1.MainApplication(**options)
+        except tk.TclError:
+            pytest.skip("no display")
+        apps.append(app)
+        # Run the game loop on a simulated timeline: every scheduled frame is due one step after the previous one
+        app.now = 0.0
+        app.scheduled = []
+        app._clock = FrameClock(timer=lambda: app.now)
+        app.root.after = lambda delay, callback, *args: app.scheduled.append(callback)
+        # Count the plans the autopilot has to make at once (rather than ahead of time, spread over frames)
+        if app._autopilot:
+            app.plans_at_once = 0
+            replan = app._autopilot._replan
+
+            def counted_replan(world):
+                app.plans_at_once += 1
+                replan(world)
+            app._autopilot._replan = counted_replan
+        return app
+
+    yield make
+    for app in apps:
+        app.root.destroy()
+
+
+def _press(app, keysym="space"):
+    """
+    This function sends a key press to the game
+    :param app: the MainApplication
+    :param keysym: name of the pressed key
+    """
+    event = tk.Event()
+    event.keysym = keysym
+    event.num = "??"
+    app._user_input_handler(event)
+
+
+def _run_frames(app, n_frames):
+    """
+    This function runs the frames scheduled by the game loop
+    :param app: the MainApplication
+    :param n_frames: largest number of frames to run
+    """
+    for _ in range(n_frames):
+        if not app.scheduled:
+            return
+        app.now += FRAME_INTERVAL_MS / 1000
+        app.scheduled.pop()()
+
+
+def test_autopilot_flies_the_start_sequence(make_app):
+    app = make_app(autopilot=True)
+    for seed in range(8):
+        # Start screen (the autopilot makes its first plan here), start press, then the game loop
+        app._seed = seed
+        app._restart_game()
+        assert app.plans_at_once == 1
+        _press(app)
+        _run_frames(app, 1500)
+        assert not app._world.game_over and app._world.frame >= 1500
+        # Every later schedule was planned ahead of time
+        assert app.plans_at_once == 1
+        app.plans_at_once = 0
+        app.scheduled.clear()
+
+
+def test_autopilot_continues_after_a_rewind(make_app):
+    app = make_app(autopilot=True, seed=3, rewind_seconds=2)
+    app._initialise_game_layout()
+    _press(app)
+    _run_frames(app, 500)
+    frame = app._world.frame
+    _press(app, "BackSpace")
+    assert app._world.frame == frame - app._REWIND_STEP_FRAMES
+    _run_frames(app, 1000)
+    assert not app._world.game_over
+    # The first plan of the session and the plan from the restored state
+    assert app.plans_at_once == 2
+
+
+def test_rewinding_before_the_first_frame_keeps_the_session_ranked(make_app):
+    app = make_app(rewind_seconds=1)
+    app._initialise_game_layout()
+    _press(app, "BackSpace")
+    assert not app._rewound
+    _press(app)
+    _run_frames(app, 30)
+    _press(app, "BackSpace")
+    assert app._rewound and app._world.frame == 0
+
+
+def test_sprite_cache_warms_up_on_the_default_root(make_app):
+    app = make_app()
+    sprites = SpriteCache()
+    sprites.warm_up(flappyBird_v1.Bird.tilt_variants())
+    app.root.update_idletasks()
+    # Every pre-rotated variant is ready (and shared with the game's own cache)
+    assert all(sprites.photo(*variant) for variant in flappyBird_v1.Bird.tilt_variants())
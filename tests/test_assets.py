@@ -0,0 +1,106 @@
+# test_assets.py
+# Tests of the PNG codec, the sprite transforms and the process-wide sprite variant cache
+# ===================  IMPORTS  ===================+
+import base64
+import random
+import struct
+import zlib
+
+import pytest
+
+from flappy_assets import (BIRD_SPRITE, RGBAImage, bird_tilt, bird_tilts, decode_png, encode_png, ghost_image,
+                           load_image, rotate_image, scale_image, variant_data)
+
+
+# ================  FUNCTION CODE  =================+
+def _random_image(width, height, seed=0):
+    """
+    This function creates an image of random pixels
+    :return: the RGBAImage
+    """
+    rng = random.Random(seed)
+    return RGBAImage(width, height, bytearray(rng.randrange(256) for _ in range(width * height * 4)))
+
+
+def _opaque_pixels(image):
+    """
+    This function lists the coordinates of the non-transparent pixels of an image
+    :return: a sorted list of (x, y) tuples
+    """
+    return sorted((index % image.width, index // image.width) for index in range(image.width * image.height)
+                  if image.pixels[index * 4 + 3])
+
+
+def _filtered_png(image, filter_types):
+    """
+    This function encodes an image as a PNG whose scanlines use the given filters (the game's encoder does not filter)
+    :param image: the RGBAImage to encode
+    :param filter_types: PNG filter type (0 to 4) of every scanline, cycled
+    :return: bytes of the PNG file
+    """
+    stride = image.width * 4
+    raw = bytearray()
+    previous = bytearray(stride)
+    for y in range(image.height):
+        line = image.pixels[y * stride:(y + 1) * stride]
+        filter_type = filter_types[y % len(filter_types)]
+        raw.append(filter_type)
+        for i in range(stride):
+            left = line[i - 4] if i >= 4 else 0
+            up = previous[i]
+            up_left = previous[i - 4] if i >= 4 else 0
+            estimate = left + up - up_left
+            paeth = min((abs(estimate - left), 0, left), (abs(estimate - up), 1, up),
+                        (abs(estimate - up_left), 2, up_left))[2]
+            predictor = (0, left, up, (left + up) >> 1, paeth)[filter_type]
+            raw.append((line[i] - predictor) & 0xFF)
+        previous = line
+    png = encode_png(image)
+    # Swap the unfiltered image data of the encoded PNG for the filtered one
+    header_end = 8 + 12 + 13
+    idat = zlib.compress(bytes(raw))
+    return (png[:header_end] + struct.pack(">I", len(idat)) + b"IDAT" + idat
+            + struct.pack(">I", zlib.crc32(b"IDAT" + idat)) + png[-12:])
+
+
+def test_png_round_trip():
+    image = _random_image(13, 7)
+    decoded = decode_png(encode_png(image))
+    assert (decoded.width, decoded.height, decoded.pixels) == (13, 7, image.pixels)
+    sprite = load_image(BIRD_SPRITE)
+    assert decode_png(encode_png(sprite)).pixels == sprite.pixels
+
+
+@pytest.mark.parametrize("filter_types", [[0], [1], [2], [3], [4], [4, 3, 2, 1, 0]])
+def test_png_filters_are_reversed(filter_types):
+    image = _random_image(9, 6, seed=len(filter_types) * 10 + filter_types[0])
+    assert decode_png(_filtered_png(image, filter_types)).pixels == image.pixels
+
+
+def test_rotate_image_turns_clockwise_about_the_center():
+    image = RGBAImage(8, 8)
+    for x, y in ((1, 2), (5, 6)):
+        image.pixels[(y * 8 + x) * 4:(y * 8 + x + 1) * 4] = b"\xff\x00\x00\xff"
+    assert _opaque_pixels(rotate_image(image, 90)) == [(1, 5), (5, 1)]
+    assert _opaque_pixels(rotate_image(image, 180)) == [(2, 1), (6, 5)]
+    assert rotate_image(image, 360).pixels == image.pixels
+    assert rotate_image(RGBAImage(8, 8), 45).pixels == RGBAImage(8, 8).pixels
+
+
+def test_scale_and_ghost_images():
+    image = _random_image(3, 2)
+    scaled = scale_image(image, 2)
+    assert (scaled.width, scaled.height) == (6, 4)
+    assert scaled.pixels[(3 * 6 + 5) * 4:(3 * 6 + 6) * 4] == image.pixels[(1 * 3 + 2) * 4:(1 * 3 + 3) * 4]
+    image.pixels[3::4] = b"\xff" * 6
+    # Every other pixel of a checkerboard is cleared
+    ghost = ghost_image(image)
+    assert [ghost.pixels[index * 4 + 3] for index in range(6)] == [0, 255, 0, 255, 0, 255]
+    assert ghost.pixels[0::4] == image.pixels[0::4]
+
+
+def test_variants_are_computed_once_per_process():
+    assert variant_data(BIRD_SPRITE, 30) is variant_data(BIRD_SPRITE, 30)
+    rotated = decode_png(base64.b64decode(variant_data(BIRD_SPRITE, 30)))
+    assert rotated.pixels == rotate_image(load_image(BIRD_SPRITE), 30).pixels
+    assert bird_tilt(100) == max(bird_tilts()) and bird_tilt(-100) == min(bird_tilts()) and bird_tilt(0) == 0
@@ -0,0 +1,51 @@
+# test_batch.py
+# Tests of the NumPy-vectorized population simulator against the headless world model
+# ===================  IMPORTS  ===================+
+import random
+
+import numpy as np
+
+from flappy_batch import BatchWorld
+from flappy_world import GameWorld
+
+
+# ================  FUNCTION CODE  =================+
+def _jump_sequences(n_birds, n_frames, seed):
+    """
+    This function draws random jump decisions (about one jump every six frames) for a population of birds
+    :return: a list of n_birds lists of n_frames booleans
+    """
+    rng = random.Random(seed)
+    return [[rng.random() < 0.16 for _ in range(n_frames)] for _ in range(n_birds)]
+
+
+def test_batch_world_matches_game_world_per_bird():
+    n_birds, n_frames = 24, 1500
+    sequences = _jump_sequences(n_birds, n_frames, 1)
+    batch = BatchWorld(n_birds, seed=42)
+    worlds = [GameWorld(seed=42) for _ in range(n_birds)]
+    for frame in range(n_frames):
+        # Half of the birds are steered through the gaps (so that some of them score), the others jump at random
+        gap = batch.next_gap()
+        jumps = np.array([sequences[index][frame] if index % 2 else
+                          batch.bird_y[index] > (gap.gap_bottom - 35 if gap else 330) and batch.bird_y_speed[index] > 0
+                          for index in range(n_birds)])
+        for index, world in enumerate(worlds):
+            world.step(bool(jumps[index]))
+        if batch.step(jumps):
+            break
+    for index, world in enumerate(worlds):
+        assert world.game_over == (not batch.alive[index])
+        assert world.frame == batch.frames_alive[index]
+        assert world.score == batch.scores[index]
+        assert world.bird_y == batch.bird_y[index]
+    assert batch.scores.max() > 0 and not batch.alive.all()
+
+
+def test_run_until_every_bird_has_collided():
+    batch = BatchWorld(5, seed=7)
+    scores = batch.run(lambda world: np.zeros(world.n_birds, dtype=bool))
+    assert batch.game_over and not scores.any()
+    assert (batch.frames_alive == batch.frame).all()
+    batch.reset(7)
+    assert batch.alive.all() and batch.frame == 0 and not batch.frames_alive.any()
@@ -0,0 +1,62 @@
+# test_clock.py
+# Tests of the fixed-timestep frame clock on a simulated timer
+# ===================  IMPORTS  ===================+
+from flappy_clock import FrameClock
+
+
+# ================  FUNCTION CODE  =================+
+def _clock(max_catch_up=5):
+    """
+    This function creates a FrameClock of 250 ms steps (exact in binary, so the deadlines do not drift) reading
+    a simulated timer
+    :param max_catch_up: maximum number of steps simulated in one callback
+    :return: a tuple of the FrameClock and a list holding the simulated time in seconds
+    """
+    now = [1.0]
+    clock = FrameClock(step_ms=250, max_catch_up=max_catch_up, timer=lambda: now[0])
+    clock.start()
+    return clock, now
+
+
+def test_steps_are_due_on_a_fixed_timeline():
+    clock, now = _clock()
+    assert clock.advance() == 1
+    # An early callback does not make the game run faster
+    assert clock.advance() == 0
+    now[0] += 0.125
+    assert clock.advance() == 0
+    now[0] += 0.125
+    assert clock.advance() == 1
+
+
+def test_late_callback_catches_up():
+    clock, now = _clock()
+    clock.advance()
+    now[0] += 0.875
+    assert clock.advance() == 3
+    # The deadline stays on the absolute timeline: the next step is due 125 ms later, not 250 ms
+    assert clock.delay_ms() == 125
+    now[0] += 0.125
+    assert clock.advance() == 1 and clock.skipped_steps == 0
+
+
+def test_backlog_beyond_max_catch_up_is_skipped():
+    clock, now = _clock(max_catch_up=4)
+    clock.advance()
+    now[0] += 2.5
+    assert clock.advance() == 4
+    assert clock.skipped_steps == 6
+    # The skipped backlog is dropped: the next step is one full step away
+    assert clock.delay_ms() == 250
+    clock.start()
+    assert clock.skipped_steps == 0
+
+
+def test_delay_is_never_negative():
+    clock, now = _clock()
+    assert clock.delay_ms() == 0
+    clock.advance()
+    now[0] += 0.0625
+    assert clock.delay_ms() == 188
+    now[0] += 5
+    assert clock.delay_ms() == 0
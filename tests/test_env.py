@@ -0,0 +1,41 @@
+# test_env.py
+# Tests of the Gym-style environment and its vectorized wrapper
+# ===================  IMPORTS  ===================+
+import numpy as np
+
+from flappy_env import VectorEnv
+
+
+# ================  FUNCTION CODE  =================+
+def _run(vector, n_steps=300):
+    """
+    This function steps a VectorEnv with a fixed policy and copies the results of every step
+    :param vector: the VectorEnv to step
+    :param n_steps: number of steps
+    :return: the final observations, rewards and dones and a list of the (rewards, dones) of every step
+    """
+    observations = vector.reset(7)
+    history = []
+    for step in range(n_steps):
+        _, rewards, dones, _ = vector.step(observations[:, 1] > 0 if step % 3 else np.zeros(vector.n_envs, bool))
+        history.append((rewards.copy(), dones.copy()))
+    return observations, rewards, dones, history
+
+
+def test_workers_match_in_process_envs():
+    with VectorEnv(5) as in_process, VectorEnv(5, workers=2) as workers:
+        expected = _run(in_process)
+        result = _run(workers)
+    np.testing.assert_array_equal(expected[0], result[0])
+    for (expected_rewards, expected_dones), (rewards, dones) in zip(expected[3], result[3]):
+        np.testing.assert_array_equal(expected_rewards, rewards)
+        np.testing.assert_array_equal(expected_dones, dones)
+
+
+def test_arrays_stay_valid_after_close():
+    with VectorEnv(4, workers=2) as vector:
+        observations, rewards, dones, _ = _run(vector, 50)
+        last_observations = observations.copy()
+    # The arrays returned by reset and step must not point into the released shared memory
+    np.testing.assert_array_equal(observations, last_observations)
+    assert np.isfinite(observations.sum() + rewards.sum()) and dones.shape == (4,)
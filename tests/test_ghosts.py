@@ -0,0 +1,49 @@
+# test_ghosts.py
+# Tests of ghost racing against recorded sessions
+# ===================  IMPORTS  ===================+
+from flappy_ghosts import GhostRace, load_ghost_replays
+from flappy_replay import Replay, play_replay, save_replay
+from flappy_world import GameWorld
+
+
+# ================  FUNCTION CODE  =================+
+def _record(seed, threshold):
+    """
+    This function records a session flown by a simple threshold policy
+    :param seed: seed of the pipe course
+    :param threshold: y-coordinate below which the bird jumps
+    :return: the Replay of the session
+    """
+    world = GameWorld(seed=seed)
+    while not world.step(world.bird_y > threshold and world.bird_y_speed > 0):
+        pass
+    return Replay.from_world(world)
+
+
+def test_ghosts_follow_their_replays():
+    replays = [_record(5, threshold) for threshold in (300, 350, 400, 450)]
+    race = GhostRace(replays)
+    while not race.step():
+        pass
+    for index, replay in enumerate(replays):
+        world = play_replay(replay)
+        assert race.world.bird_y[index] == world.bird_y
+    assert race.world.frame == max(replay.frames for replay in replays)
+
+
+def test_corrupt_files_are_skipped(tmp_path):
+    save_replay(_record(5, 300), str(tmp_path / "good.flpr"))
+    save_replay(_record(5, 400), str(tmp_path / "good.flpr"))
+    # A save interrupted halfway through the third record of the file, and a file holding a truncated record
+    with (tmp_path / "good.flpr").open("ab") as replay_file:
+        replay_file.write(_record(5, 350).to_bytes()[:30])
+    (tmp_path / "bad.flpr").write_bytes(_record(5, 450).to_bytes()[:20])
+    seed, replays = load_ghost_replays([str(tmp_path)])
+    assert seed == 5 and len(replays) == 2
+
+
+def test_missing_paths_are_skipped(tmp_path, caplog):
+    save_replay(_record(5, 300), str(tmp_path / "good.flpr"))
+    seed, replays = load_ghost_replays([str(tmp_path / "missing.flpr"), str(tmp_path / "good.flpr")])
+    assert seed == 5 and len(replays) == 1
+    assert "missing.flpr" in caplog.text
@@ -0,0 +1,52 @@
+# test_input.py
+# Tests of the frame-stamped input queue and its latency histograms
+# ===================  IMPORTS  ===================+
+import pytest
+
+from flappy_input import InputQueue, LatencyHistogram
+
+
+# ================  FUNCTION CODE  =================+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram(bucket_ms=1, max_ms=20)
+    assert histogram.percentile(0.5) == 0.0
+    for milliseconds in range(10):
+        histogram.record(milliseconds + 0.5)
+    # Upper edges of the buckets holding the nearest-rank latencies
+    assert [histogram.percentile(fraction) for fraction in (0.1, 0.25, 0.5, 0.9)] == [1, 3, 5, 9]
+    # The top percentile never exceeds the largest recorded latency
+    assert histogram.percentile(1) == 9.5
+    histogram.record(250)
+    summary = histogram.summary()
+    assert summary["count"] == 11 and summary["max_ms"] == 250 and summary["buckets"]["20+"] == 1
+    histogram.reset()
+    assert histogram.summary()["count"] == 0 and histogram.percentile(0.99) == 0.0
+
+
+def test_inputs_are_applied_by_the_next_frame():
+    now = [0.0]
+    inputs = InputQueue(timer=lambda: now[0])
+    assert not inputs.consume()
+    inputs.push()
+    now[0] += 0.004
+    inputs.push()
+    now[0] += 0.002
+    # Both presses of the frame make a single jump, each waiting from its own arrival
+    assert inputs.consume() and not inputs.consume()
+    assert inputs.wait_histogram.count == 2 and inputs.wait_histogram.max_seen_ms == pytest.approx(6)
+    now[0] += 0.003
+    inputs.motion_drawn()
+    assert inputs.motion_histogram.count == 2 and inputs.motion_histogram.max_seen_ms == pytest.approx(9)
+    # Nothing is left in flight for the next frame
+    inputs.motion_drawn()
+    assert inputs.motion_histogram.count == 2
+
+
+def test_cleared_inputs_are_dropped():
+    now = [0.0]
+    inputs = InputQueue(timer=lambda: now[0])
+    inputs.push()
+    inputs.clear()
+    assert not inputs.consume()
+    inputs.motion_drawn()
+    assert inputs.wait_histogram.count == inputs.motion_histogram.count == 0
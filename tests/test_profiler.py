@@ -0,0 +1,68 @@
+# test_profiler.py
+# Tests of the frame profiler and the nearest-rank percentile shared by every reported percentile
+# ===================  IMPORTS  ===================+
+import csv
+import json
+
+import pytest
+
+from flappy_profiler import FrameProfiler, nearest_rank, percentile
+
+
+# ================  FUNCTION CODE  =================+
+def _profile(frame_ms, requested_ms=15, late_ms=0):
+    """
+    This function profiles frames of known durations on a simulated timer
+    :param frame_ms: duration of every frame in milliseconds (split evenly between its two phases)
+    :param requested_ms: delay requested between two frames
+    :param late_ms: lateness of every callback after the first one
+    :return: the FrameProfiler
+    """
+    now = [0.0]
+    profiler = FrameProfiler(("step", "draw"), timer=lambda: now[0])
+    for milliseconds in frame_ms:
+        profiler.begin_frame()
+        for _ in profiler.phases:
+            now[0] += milliseconds / 2000
+            profiler.mark()
+        profiler.end_frame(1, requested_ms)
+        now[0] += (requested_ms + late_ms) / 1000
+    return profiler
+
+
+def test_nearest_rank_percentiles():
+    values = list(range(1, 11))
+    assert [percentile(values, fraction) for fraction in (0, 0.1, 0.3, 0.5, 0.9, 0.91, 1)] == [1, 1, 3, 5, 9, 10, 10]
+    assert percentile([7], 0.99) == 7
+    assert [nearest_rank(100, fraction) for fraction in (0.5, 0.99, 0.995)] == [50, 99, 100]
+
+
+def test_summary_percentiles_are_nearest_rank():
+    summary = _profile(range(100, 0, -1)).summary()
+    assert summary["frames"] == 100
+    # p99 of 100 frames is the 99th smallest frame, not the slowest one
+    assert summary["frame_p99_ms"] == pytest.approx(99)
+    assert summary["frame_mean_ms"] == pytest.approx(50.5)
+    assert summary["phases_mean_ms"]["step"] == pytest.approx(25.25)
+    assert summary["late_frames"] == 0
+
+
+def test_late_callbacks_are_counted():
+    profiler = _profile([2] * 10, late_ms=FrameProfiler.LATE_THRESHOLD_MS + 1)
+    assert profiler.late_frames == 9
+    assert profiler.summary()["interval_mean_ms"] == pytest.approx(2 + 15 + FrameProfiler.LATE_THRESHOLD_MS + 1)
+
+
+def test_export_json_and_csv(tmp_path):
+    profiler = _profile([4, 6, 8])
+    profiler.record_latency("startup", 120.0)
+    profiler.export(str(tmp_path / "profile.json"))
+    profiler.export(str(tmp_path / "profile.csv"))
+    with open(str(tmp_path / "profile.json")) as json_file:
+        exported = json.load(json_file)
+    assert exported["summary"]["latencies_ms"] == {"startup": 120.0}
+    assert [row["total_ms"] for row in exported["frames"]] == pytest.approx([4, 6, 8])
+    with open(str(tmp_path / "profile.csv"), newline="") as csv_file:
+        rows = list(csv.DictReader(csv_file))
+    assert [row["frame"] for row in rows] == ["0", "1", "2"]
+    assert [float(row["draw_ms"]) for row in rows] == pytest.approx([2, 3, 4])
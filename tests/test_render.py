@@ -0,0 +1,40 @@
+# test_render.py
+# Tests of the offscreen NumPy renderer
+# ===================  IMPORTS  ===================+
+import numpy as np
+import pytest
+
+from flappy_render import FrameRenderer
+from flappy_world import GameWorld
+
+
+# ================  FUNCTION CODE  =================+
+@pytest.mark.parametrize("downscale, grayscale", [(1, False), (2, True), (3, False)])
+def test_incremental_render_matches_a_full_redraw(downscale, grayscale):
+    world = GameWorld(seed=11)
+    renderer = FrameRenderer(downscale=downscale, grayscale=grayscale)
+    reference = FrameRenderer(downscale=downscale, grayscale=grayscale)
+    frame = renderer.render(world)
+    assert frame.shape == ((-(-640 // downscale), -(-485 // downscale)) if grayscale else
+                           (-(-640 // downscale), -(-485 // downscale), 3))
+    while not world.game_over and world.frame < 700:
+        # Jump through the first gaps, then fall so the bird tilts down and leaves the frame through the floor
+        pipe = world.next_pipe()
+        world.step(world.frame < 500 and world.bird_y_speed > 0 and
+                   world.bird_y > (pipe.gap_bottom - 35 if pipe else 330))
+        assert renderer.render(world) is frame
+        reference.invalidate()
+        np.testing.assert_array_equal(frame, reference.render(world))
+    assert world.score > 0
+
+
+def test_invalidate_redraws_a_modified_buffer():
+    world = GameWorld(seed=11)
+    renderer = FrameRenderer()
+    for _ in range(200):
+        world.step()
+    expected = renderer.render(world).copy()
+    renderer.frame[:] = 0
+    renderer.invalidate()
+    np.testing.assert_array_equal(renderer.render(world), expected)
+    np.testing.assert_array_equal(FrameRenderer().render(world), expected)
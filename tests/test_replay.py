@@ -0,0 +1,58 @@
+# test_replay.py
+# Tests of the binary replay format and the headless replay verifier
+# ===================  IMPORTS  ===================+
+import struct
+
+import pytest
+
+from flappy_replay import Replay, ReplayError, iter_replays, save_replay, verify_replay
+from flappy_world import GameWorld
+
+
+# ================  FUNCTION CODE  =================+
+def _session(seed=21):
+    """
+    This function plays a session which passes a few pipe pairs, then stops jumping so the bird falls
+    :param seed: seed of the pipe course
+    :return: the GameWorld at the end of the session
+    """
+    world = GameWorld(seed=seed)
+    while not world.game_over:
+        pipe = world.next_pipe()
+        world.step(world.frame < 600 and world.bird_y_speed > 0 and
+                   world.bird_y > (pipe.gap_bottom - 35 if pipe else 330))
+    return world
+
+
+def test_encode_decode_round_trip():
+    replay = Replay(2 ** 32 - 1, [0, 1, 127, 128, 16384, 100000], 7, 100001)
+    decoded, end = Replay.from_buffer(b"junk" + replay.to_bytes(), 4)
+    assert end == 4 + len(replay.to_bytes())
+    assert (decoded.seed, decoded.jump_frames, decoded.score, decoded.frames, decoded.physics) == \
+           (replay.seed, replay.jump_frames, replay.score, replay.frames, replay.physics)
+
+
+def test_saved_sessions_verify(tmp_path):
+    path = str(tmp_path / "sessions.flpr")
+    worlds = [_session(seed) for seed in (21, 22, 23)]
+    for world in worlds:
+        save_replay(Replay.from_world(world), path)
+    replays = list(iter_replays(path))
+    assert [replay.score for replay in replays] == [world.score for world in worlds]
+    assert all(verify_replay(replay) is None for replay in replays)
+    assert any(replay.score > 0 for replay in replays)
+
+
+def test_tampered_replays_fail_to_verify():
+    replay = Replay.from_world(_session())
+    replay.score += 1
+    assert verify_replay(replay) is not None
+    replay.score -= 1
+    replay.physics = struct.pack("<f", 1.0) + replay.physics[4:]
+    assert verify_replay(replay) == "recorded with different physics constants"
+
+
+def test_truncated_record_raises():
+    record = Replay.from_world(_session()).to_bytes()
+    with pytest.raises(ReplayError):
+        Replay.from_buffer(record[:-1])
@@ -0,0 +1,53 @@
+# test_scores.py
+# Tests of the persistent SQLite leaderboard
+# ===================  IMPORTS  ===================+
+from flappy_scores import ScoreStore
+
+
+# ================  FUNCTION CODE  =================+
+def _cached(store, score):
+    """
+    This function lists what the game reads from the in-memory cache of a store
+    :param store: the ScoreStore
+    :param score: the score whose percentile is read
+    :return: a tuple of the leaderboard, ann's best score, the number of sessions and the percentile of the score
+    """
+    return store.top(), store.best_score("ann"), store.sessions, store.percentile(score)
+
+
+def test_writer_survives_a_failed_batch(tmp_path):
+    path = str(tmp_path / "scores.db")
+    with ScoreStore(path, flush_interval=0.01) as store:
+        # A seed beyond SQLite's 64-bit integers makes the first batch fail
+        store.record("ann", 50, 10, 2 ** 70)
+        store.flush()
+        assert store.failed_sessions == 1
+        # The lost session is dropped from the cache again
+        assert _cached(store, 60) == ([], 0, 0, 0.0)
+        store.record("ann", 5, 20, 1)
+        assert store.history("ann") == [(5, 20, 1, store.history("ann")[0][3])]
+        cached = _cached(store, 6)
+    with ScoreStore(path) as reloaded:
+        assert _cached(reloaded, 6) == cached == ([("ann", 5)], 5, 1, 1.0)
+
+
+def test_cache_matches_database(tmp_path):
+    path = str(tmp_path / "scores.db")
+    with ScoreStore(path, top_size=3) as store:
+        for score in (4, 9, 1, 9, 6):
+            store.record("ann" if score % 2 else "bob", score)
+        top = store.top()
+        percentile = store.percentile(6)
+    with ScoreStore(path, top_size=3) as reloaded:
+        assert reloaded.top() == top == [("ann", 9), ("ann", 9), ("bob", 6)]
+        assert reloaded.percentile(6) == percentile == 0.4
+        assert reloaded.best_score("bob") == 6
+
+
+def test_leaderboard_percentile(tmp_path):
+    with ScoreStore(str(tmp_path / "scores.db")) as store:
+        assert store.percentile(3) == 0.0
+        for score in (1, 2, 2, 5):
+            store.record("ann", score)
+        # Fraction of the sessions with a strictly lower score
+        assert [store.percentile(score) for score in (1, 2, 3, 6)] == [0.0, 0.25, 0.75, 1.0]
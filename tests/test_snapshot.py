@@ -0,0 +1,75 @@
+# test_snapshot.py
+# Tests of the snapshot ring buffer
+# ===================  IMPORTS  ===================+
+from flappy_replay import Replay, verify_replay
+from flappy_snapshot import SnapshotRing
+from flappy_world import GameWorld
+
+
+# ================  FUNCTION CODE  =================+
+def _policy(world):
+    """
+    This function flies the bird through the gaps of a course (well enough to pass a few pipe pairs)
+    :param world: the GameWorld to fly
+    :return: a boolean indicating whether the bird should jump
+    """
+    pipe = world.next_pipe()
+    return world.bird_y_speed > 0 and world.bird_y > (pipe.gap_bottom - 35 if pipe else 330)
+
+
+def _state(world):
+    """
+    This function lists the state of a world which a snapshot has to reproduce
+    :param world: the GameWorld
+    :return: a tuple of the world's state
+    """
+    return (world.seed, world.frame, world.bird_y, world.bird_y_speed, world.score, world.game_over,
+            world.track.spawned, world.track.spawn_timer, list(world.jump_frames),
+            [(pipe.x, pipe.gap_top, pipe.gap_bottom, pipe.scored) for pipe in world.pipes])
+
+
+def _play(n_frames, ring=None):
+    """
+    This function plays the first frames of a session with _policy, capturing every frame into a ring
+    :param n_frames: number of frames to play
+    :param ring: the SnapshotRing capturing the session (None to capture nothing)
+    :return: the GameWorld and the list of its states before every frame
+    """
+    world = GameWorld(seed=11)
+    states = []
+    for _ in range(n_frames):
+        if ring is not None:
+            ring.capture(world)
+        states.append(_state(world))
+        world.step(_policy(world))
+    return world, states
+
+
+def test_restore_then_replay_verifies():
+    ring = SnapshotRing(200)
+    world, states = _play(1000, ring)
+    ring.restore(world, 120)
+    assert _state(world) == states[world.frame]
+    assert len(ring) == 80
+    # Fly on for a few seconds after the rewind, then let the bird fall
+    for _ in range(300):
+        world.step(_policy(world))
+    while not world.step():
+        pass
+    assert verify_replay(Replay.from_world(world)) is None
+
+
+def test_copy_to_branches_without_changing_the_ring():
+    ring = SnapshotRing(100)
+    _, states = _play(800, ring)
+    for threshold in (250, 350, 450):
+        # Branch into an unrelated world with its own jump history
+        branch = GameWorld(seed=3)
+        for _ in range(50):
+            branch.step(True)
+        ring.copy_to(branch, 60)
+        assert _state(branch) == states[ring.frame(60)]
+        while not branch.step(branch.bird_y > threshold):
+            pass
+        assert verify_replay(Replay.from_world(branch)) is None
+    assert len(ring) == 100
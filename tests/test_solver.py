@@ -0,0 +1,59 @@
+# test_solver.py
+# Tests of the course reachability solver and the perfect-play autopilot
+# ===================  IMPORTS  ===================+
+from flappy_solver import CourseSolver, PerfectAutopilot
+from flappy_world import GameWorld, PipeCourse
+
+
+# ================  FUNCTION CODE  =================+
+def _fly(world, schedule, until_frame):
+    """
+    This function flies a world along a jump schedule
+    :param world: the GameWorld to fly
+    :param schedule: list of the frames at which to jump
+    :param until_frame: frame at which to stop
+    """
+    jumps = set(schedule)
+    while world.frame < until_frame and not world.step(world.frame in jumps):
+        pass
+
+
+def test_planned_schedules_survive_in_game_world():
+    solver = CourseSolver()
+    for seed in range(5):
+        world = GameWorld(seed=seed)
+        n_pipes = 6
+        schedule = solver.plan_world(world, n_pipes)
+        assert schedule is not None
+        end_frame = (n_pipes - 1) * solver.spacing + solver.window_end + 1
+        _fly(world, schedule, end_frame)
+        assert not world.game_over and world.score == n_pipes
+
+
+def test_plan_from_mid_game_state():
+    solver = CourseSolver()
+    world = GameWorld(seed=8)
+    _fly(world, solver.plan_world(world, 3), 400)
+    schedule = solver.plan_world(world, 4)
+    assert schedule and schedule[0] >= world.frame
+    _fly(world, schedule, solver.first_pipe(400) * solver.spacing + 3 * solver.spacing + solver.window_end + 1)
+    assert not world.game_over
+
+
+def test_impossible_course_is_detected():
+    solver = CourseSolver()
+    course = PipeCourse(0, solver.window_height)
+    top, bottom = course.min_gap_top, course.max_gap_top - 1
+    # A gap at the very top right after one at the very bottom cannot be reached with this spacing
+    tight = CourseSolver(spawn_interval_frames=solver.window_end - solver.window_start + 10)
+    assert not tight.survivable([bottom, top, bottom, top])
+    assert tight.plan([bottom, top, bottom, top]) is None
+    assert solver.survivable([bottom, top, bottom, top])
+
+
+def test_autopilot_plans_ahead_and_survives():
+    autopilot = PerfectAutopilot()
+    world = GameWorld(seed=4)
+    while world.frame < 3000 and not world.step(autopilot(world)):
+        pass
+    assert not world.game_over and world.score >= 15
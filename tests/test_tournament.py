@@ -0,0 +1,39 @@
+# test_tournament.py
+# Tests of the multi-process autopilot tournament runner
+# ===================  IMPORTS  ===================+
+import pytest
+
+from flappy_tournament import (BUILT_IN_POLICIES, PolicyResult, gap_follower, load_policy, never_jump, play_policy,
+                               run_tournament)
+
+
+# ================  FUNCTION CODE  =================+
+def test_process_pool_matches_a_single_process():
+    seeds = list(range(12))
+    serial, _ = run_tournament(BUILT_IN_POLICIES, seeds, max_frames=3000, workers=1, chunk_size=5)
+    pooled, throughput = run_tournament(BUILT_IN_POLICIES, seeds, max_frames=3000, workers=2, chunk_size=5)
+    assert [(result.name, result.scores, result.frames) for result in pooled] == \
+           [(result.name, result.scores, result.frames) for result in serial]
+    assert throughput > 0
+
+
+def test_policies_play_deterministic_games():
+    assert play_policy(never_jump, 4, 3000)[0] == 0
+    score, frames = play_policy(gap_follower, 4, 3000)
+    assert score > 0 and (score, frames) == play_policy(gap_follower, 4, 3000)
+    # The frame limit stops a game which is still going
+    assert play_policy(gap_follower, 4, 200)[1] == 200
+
+
+def test_summary_uses_nearest_rank_percentiles():
+    summary = PolicyResult("policy", list(range(10, 0, -1)), list(range(100, 0, -1))).summary()
+    assert (summary["games"], summary["score_mean"], summary["score_max"]) == (10, 5.5, 10)
+    assert (summary["score_p10"], summary["score_p50"], summary["score_p90"]) == (1, 5, 9)
+    assert (summary["frames_p50"], summary["frames_p90"], summary["frames_p99"]) == (50, 90, 99)
+
+
+def test_load_policy():
+    assert load_policy("never_jump") is never_jump
+    assert load_policy("flappy_tournament:gap_follower") is gap_follower
+    with pytest.raises(ValueError):
+        load_policy("no_such_policy")
@@ -0,0 +1,158 @@
+# test_world.py
+# Tests of the headless world model (bird physics, pipe pairs, scoring and collisions)
+# ===================  IMPORTS  ===================+
+import datetime
+import itertools
+import random
+
+import pytest
+
+from flappy_world import (DOWNWARD_ACCELERATION, FLOOR_OFFSET, GRAVITY_Y_SPEED, JUMP_Y_SPEED, PIPE_SEPARATION_Y,
+                          PIPE_WIDTH, PIPE_X_SPEED, SEED_LIMIT, UPPER_WINDOW_BOUNDARY, GameWorld, PipeCourse, PipePair,
+                          PipeTrack, daily_seed)
+
+
+# ================  FUNCTION CODE  =================+
+def _policy(world):
+    """
+    This function flies the bird through the gaps of a course (well enough to pass a few pipe pairs)
+    :param world: the GameWorld to fly
+    :return: a boolean indicating whether the bird should jump
+    """
+    pipe = world.next_pipe()
+    return world.bird_y_speed > 0 and world.bird_y > (pipe.gap_bottom - 35 if pipe else 330)
+
+
+def test_bird_falls_and_jumps():
+    world = GameWorld(seed=1)
+    start_y = world.bird_y
+    world.step()
+    assert (world.bird_y, world.bird_y_speed) == (start_y + GRAVITY_Y_SPEED, GRAVITY_Y_SPEED + DOWNWARD_ACCELERATION)
+    world.step(jump=True)
+    assert world.bird_y == start_y + GRAVITY_Y_SPEED + JUMP_Y_SPEED
+    assert world.bird_y_speed == JUMP_Y_SPEED + DOWNWARD_ACCELERATION
+    assert world.jump_frames == [1]
+
+
+def test_bird_bounces_off_the_upper_boundary():
+    world = GameWorld(seed=1)
+    world.bird_y = UPPER_WINDOW_BOUNDARY - 1
+    world.bird_y_speed = JUMP_Y_SPEED
+    world.step()
+    assert world.bird_y == UPPER_WINDOW_BOUNDARY - 1 + GRAVITY_Y_SPEED
+
+
+def test_floor_ends_the_session():
+    world = GameWorld(seed=1)
+    while not world.step():
+        pass
+    # The bird was below the floor when the collision was detected (before its last fall)
+    checked_y = world.bird_y - (world.bird_y_speed - DOWNWARD_ACCELERATION)
+    assert world.window_height - FLOOR_OFFSET < checked_y <= world.window_height - FLOOR_OFFSET + world.bird_y_speed
+    assert world.score == 0
+    # A finished session does not advance any more
+    frame = world.frame
+    assert world.step(jump=True) and world.frame == frame and world.jump_frames == []
+
+
+def test_pipe_pairs_are_scored_and_hit():
+    world = GameWorld(seed=3)
+    while not world.step(_policy(world)) and world.score < 3:
+        pass
+    assert world.score == 3 and not world.game_over
+    assert sum(pipe.scored for pipe in world.pipes) <= 3
+    # Stop flying: the bird falls into the bottom pipe of the next pair or onto the floor
+    while not world.step():
+        pass
+    assert world.score >= 3
+
+
+def test_same_seed_and_inputs_replay_identically():
+    rng = random.Random(2)
+    jumps = [rng.random() < 0.16 for _ in range(800)]
+    first, second = GameWorld(seed=9), GameWorld(seed=9)
+    for jump in jumps:
+        first.step(jump)
+        second.step(jump)
+    assert (first.frame, first.score, first.bird_y, first.jump_frames) == \
+           (second.frame, second.score, second.bird_y, second.jump_frames)
+
+
+def _track(*xs):
+    """
+    This function creates a PipeTrack holding pipe pairs at the given x-coordinates (oldest first)
+    :return: the PipeTrack
+    """
+    track = PipeTrack()
+    track.restore(0, len(xs), 1, [PipePair(x, 200, 200 + PIPE_SEPARATION_Y) for x in xs])
+    return track
+
+
+def test_track_spawns_a_pair_every_interval():
+    track = PipeTrack()
+    track.reset(5)
+    for _ in range(track.spawn_interval_frames * 3):
+        track.spawn()
+        track.move()
+    assert track.spawned == len(track.pipes) == 3
+    assert [pipe.gap_top for pipe in track.pipes] == [track.course.gap_top(index) for index in range(3)]
+    # The newest pair was generated at the right edge and has moved once per frame since then
+    assert track.pipes[-1].x == pytest.approx(track.window_width + track.spawn_interval_frames * PIPE_X_SPEED)
+
+
+def test_track_scores_pairs_in_order():
+    track = _track(10, 100, 300)
+    assert track.score(150) == 2
+    assert track.score(150) == 0
+    assert [pipe.scored for pipe in track.pipes] == [True, True, False]
+    assert track.score(400) == 1
+
+
+def test_track_finds_the_nearest_pair():
+    track = _track(10, 100, 300)
+    assert track.nearest(50) == 0
+    assert track.next_pipe(10 + PIPE_WIDTH + 1) is track.pipes[1]
+    assert track.nearest(500) == 3 and track.next_pipe(500) is None
+
+
+def test_track_culls_pairs_off_the_screen():
+    track = _track(-PIPE_WIDTH - 5, -PIPE_WIDTH + 5, 200)
+    track.score(100)
+    track.nearest(100)
+    track.cull()
+    assert [pipe.x for pipe in track.pipes] == [-PIPE_WIDTH + 5, 200]
+    # The indices follow the front of the buffer: nothing is scored twice and the nearest pair is unchanged
+    assert track.score(100) == 0
+    assert track.next_pipe(100) is track.pipes[1]
+    assert track.score(250) == 1
+
+
+def test_course_chunks_match_random_access():
+    course = PipeCourse(12345)
+    streamed = list(itertools.chain.from_iterable(itertools.islice(course.chunks(start=100, chunk_size=7), 30)))
+    assert streamed == [course.gap(index) for index in range(100, 310)]
+    assert all(course.min_gap_top <= top < course.max_gap_top and bottom == top + PIPE_SEPARATION_Y
+               for top, bottom in streamed)
+    # The gaps spread over the whole range rather than repeating a few values
+    assert len(set(top for top, _ in streamed)) > 100
+
+
+def test_course_depends_only_on_the_seed():
+    assert [PipeCourse(8).gap_top(index) for index in range(50)] == \
+           [PipeCourse(8).gap_top(index) for index in range(50)]
+    assert [PipeCourse(8).gap_top(index) for index in range(50)] != \
+           [PipeCourse(9).gap_top(index) for index in range(50)]
+    world = GameWorld(seed=8)
+    while world.track.spawned < 3:
+        world.step(_policy(world))
+    # The pairs on the screen are the last ones generated from the course (earlier ones were culled)
+    first = world.track.spawned - len(world.pipes)
+    assert [pipe.gap_top for pipe in world.pipes] == [PipeCourse(8).gap_top(index) for index in range(first, 3)]
+
+
+def test_daily_seed_is_shared_by_a_day():
+    day = datetime.date(2024, 2, 29)
+    assert daily_seed(day) == daily_seed(datetime.date(2024, 2, 29))
+    assert daily_seed(day) != daily_seed(day + datetime.timedelta(days=1))
+    assert all(0 <= daily_seed(day + datetime.timedelta(days=offset)) < SEED_LIMIT for offset in range(100))
+    assert daily_seed() == daily_seed(datetime.datetime.now(datetime.timezone.utc).date())